@@ -0,0 +1,993 @@
+"""
+AI-powered FixiFox features.
+
+Every entry point that calls Groq or Gemini lives here, behind the response
+cache, so the Streamlit UI, scripts and other front ends can share them.
+Groq models are picked per call by ``model_router.route`` (cost, latency
+SLO, input size and live error rates) unless the caller pins one.
+app.py imports this module only once the main app is rendered; the login
+page never loads it (or the provider SDKs behind ``clients``).
+"""
+import json
+import logging
+import re
+import time
+
+from response_cache import cached_response
+from instrumentation import instrument
+from clients import get_gemini_model, get_groq_client, gemini_generate_content, groq_chat_completion
+from flow_diagram import python_to_mermaid
+from security_rules import focus_excerpt, scan_code
+from chunking import is_large_input, map_chunks, map_line, numbered, split_source
+from model_router import route
+from streaming import HEDGING, TextStream, stream_gemini, stream_groq_with_fallback
+
+logger = logging.getLogger("fixifox.ai_features")
+
+# Responses starting with one of these are error messages and must never be cached
+LLM_ERROR_PREFIXES = (
+    "Error", "❌", "⚠️", "Could not", "Unable to", "The explanation is taking",
+    "The code is too large", "The Gemini model", "The AI assistant timed out",
+    "Your code is too large", "The selected AI model is unavailable", "AI assistant error",
+)
+
+def is_cacheable_response(result):
+    return isinstance(result, str) and bool(result.strip()) and not result.startswith(LLM_ERROR_PREFIXES)
+
+def map_reduce_sections(code, language, func, stream=False, headings=True):
+    """
+    Process a large input chunk by chunk in parallel and merge the results in source order.
+    
+    Args:
+        code (str): The full input.
+        language (str): Programming language (None to auto-detect).
+        func (callable): Called with each chunk's text; returns the result for that
+            chunk, or None to leave the chunk out of the merged output.
+        stream (bool): Return a TextStream yielding each section as soon as it is ready.
+        headings (bool): Put a "Lines a–b" heading above every section.
+    
+    Returns:
+        str: Merged result (a TextStream of it when ``stream`` is True).
+    """
+    failures = []
+    
+    def sections():
+        for chunk, result in map_chunks(split_source(code, language), lambda c: func(c.text)):
+            if result is None:
+                continue
+            if not is_cacheable_response(result):
+                failures.append(chunk.label)
+            yield f"## 📄 {chunk.label}\n\n{result}\n\n" if headings else f"{result}\n\n"
+    
+    def finalize(text):
+        if failures:
+            return f"⚠️ Some parts could not be processed ({', '.join(failures)}).\n\n{text}"
+        return text.strip() if not headings else text
+    
+    merged = TextStream(sections(), postprocess=finalize,
+                        on_error=lambda e: f"Error while processing the large input: {e}")
+    return merged if stream else merged.result()
+
+@instrument("explain", ok_if=is_cacheable_response)
+@cached_response("explain", cache_if=is_cacheable_response, near_duplicates=True)
+def explain_code_with_gemini(
+    code: str, 
+    is_error: bool = False,
+    programming_language: str = None,
+    detail_level: str = "beginner",
+    highlight_important_parts: bool = True,
+    include_examples: bool = True,
+    include_diagrams: bool = False,
+    model_name: str = 'gemini-2.0-flash',
+    stream: bool = False
+):
+    """
+    Explains code or error messages in a beginner-friendly way using Google's Gemini model.
+    
+    Args:
+        code (str): The code or error message to explain.
+        is_error (bool, optional): Whether the input is an error message. Defaults to False.
+        programming_language (str, optional): The programming language of the code. 
+            This helps the model provide more accurate explanations. Defaults to None (auto-detect).
+        detail_level (str, optional): Level of explanation detail - "beginner", "intermediate", or "advanced".
+            Defaults to "beginner".
+        highlight_important_parts (bool, optional): Whether to highlight important parts of the code.
+            Defaults to True.
+        include_examples (bool, optional): Whether to include simple examples. Defaults to True.
+        include_diagrams (bool, optional): Whether to request ascii/markdown diagrams for visual learners.
+            Defaults to False.
+        model_name (str, optional): The Gemini model to use. Defaults to 'gemini-2.0-flash'.
+        stream (bool, optional): Return a TextStream that yields tokens as they arrive
+            instead of waiting for the full response. Defaults to False.
+    
+    Returns:
+        str: Beginner-friendly explanation or error message
+             (a TextStream of it when ``stream`` is True).
+    """
+    # Large files are explained chunk by chunk in parallel instead of hitting the token limit
+    if not is_error and is_large_input(code):
+        return map_reduce_sections(
+            code, programming_language,
+            lambda chunk_code: explain_code_with_gemini(
+                chunk_code, False, programming_language, detail_level,
+                highlight_important_parts, include_examples, include_diagrams, model_name
+            ),
+            stream=stream
+        )
+    
+    # Configure the model
+    try:
+        get_gemini_model(model_name)
+    except Exception as model_error:
+        return f"Error initializing Gemini model: {model_error}. Please check your API key and model name."
+    
+    # Set language detection part
+    language_part = ""
+    if programming_language:
+        language_part = f"This is {programming_language} code."
+    else:
+        language_part = "Please identify what programming language this is before explaining it."
+    
+    # Configure detail level
+    detail_configs = {
+        "beginner": {
+            "style": "Use simple language as if explaining to someone with no programming experience. Define all technical terms.",
+            "format": "Break down the explanation into small, easy-to-understand sections.",
+            "depth": "Focus on the basic purpose of each line, avoiding complex concepts unless necessary."
+        },
+        "intermediate": {
+            "style": "Use straightforward explanations assuming basic programming knowledge.",
+            "format": "Organize the explanation by logical components or functions.",
+            "depth": "Include explanations of common patterns and programming concepts."
+        },
+        "advanced": {
+            "style": "Use technical language assuming substantial programming experience.",
+            "format": "Focus on non-obvious aspects and design decisions.",
+            "depth": "Include performance considerations and alternative approaches."
+        }
+    }
+    
+    detail_config = detail_configs.get(detail_level, detail_configs["beginner"])
+    
+    # Configure highlighting
+    highlight_part = ""
+    if highlight_important_parts:
+        highlight_part = """
+        Highlight important parts of the code by:
+        1. **Bolding key variables, functions, and control structures**
+        2. Explaining critical lines with 💡 emoji at the start
+        3. Flagging potential issues with ⚠️ emoji
+        4. Using bullet points for step-by-step explanations
+        """
+    
+    # Configure examples
+    examples_part = ""
+    if include_examples:
+        examples_part = """
+        Include 1-2 simple, concrete examples showing how the code works with specific inputs and outputs.
+        For errors, show a corrected version of the code.
+        """
+    
+    # Configure diagrams
+    diagram_part = ""
+    if include_diagrams:
+        diagram_part = """
+        Include a simple ASCII or markdown diagram to visually explain the code flow or data structures
+        when it would help understanding.
+        """
+    
+    # Create prompt based on whether it's code or an error
+    if is_error:
+        prompt = f"""Explain the following error message in a very beginner-friendly way:
+        
+        ERROR:
+        ```
+        {code}
+        ```
+        
+        {language_part}
+        
+        EXPLANATION GUIDELINES:
+        - Start with a simple explanation of what went wrong in plain English
+        - Explain exactly which part of the code caused the error
+        - Suggest 2-3 specific ways to fix the error
+        - {detail_config['style']}
+        - {detail_config['format']}
+        - {detail_config['depth']}
+        {highlight_part}
+        {examples_part}
+        {diagram_part}
+        
+        Conclude with a one-sentence summary of what the programmer should remember to avoid this error in the future.
+        """
+    else:
+        prompt = f"""Explain the following code in a very beginner-friendly way:
+        
+        CODE:
+        ```
+        {code}
+        ```
+        
+        {language_part}
+        
+        EXPLANATION GUIDELINES:
+        - Start with a simple overview of what this code does in 1-2 sentences
+        - Then walk through the code step-by-step
+        - Explain the purpose of each major section
+        - {detail_config['style']}
+        - {detail_config['format']}
+        - {detail_config['depth']}
+        {highlight_part}
+        {examples_part}
+        {diagram_part}
+        
+        Conclude with a bullet list summary of key concepts demonstrated in this code.
+        """
+    
+    # Configure model parameters
+    safety_settings = [
+        {
+            "category": "HARM_CATEGORY_HARASSMENT",
+            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+        },
+        {
+            "category": "HARM_CATEGORY_HATE_SPEECH",
+            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+        },
+        {
+            "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+        },
+        {
+            "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+            "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+        }
+    ]
+    
+    generation_config = {
+        "temperature": 0.2,  # Lower for more accurate explanations
+        "top_p": 0.95,
+        "top_k": 40,
+        "max_output_tokens": 2048,
+    }
+    
+    def finalize(explanation):
+        # Add syntax highlighting markers if not present but requested
+        if highlight_important_parts and "**" not in explanation:
+            # Find code-like patterns and add bold formatting
+            code_pattern = r'\b([a-zA-Z_][a-zA-Z0-9_]*\(|\bif\b|\bfor\b|\bwhile\b|\bdef\b|\bclass\b|\breturn\b|\bimport\b)'
+            explanation = re.sub(code_pattern, r'**\1**', explanation)
+        return explanation
+    
+    if stream:
+        return TextStream(
+            stream_gemini(model_name, prompt, generation_config, safety_settings),
+            postprocess=finalize,
+            on_error=lambda e: f"Could not generate an explanation: {str(e)}. Please try again with a simpler code snippet."
+        )
+    
+    # Rate limiting, retry-after and backoff are handled by the shared scheduler
+    start_time = time.time()
+    try:
+        response = gemini_generate_content(
+            model_name,
+            prompt,
+            generation_config=generation_config,
+            safety_settings=safety_settings
+        )
+        
+        # Check if we have content
+        if hasattr(response, 'text') and response.text:
+            # Process the response to enhance formatting
+            return finalize(response.text)
+        return "Unable to generate explanation after multiple attempts. Please try again later or with a different code sample."
+    
+    except Exception as retry_error:
+        error_message = str(retry_error).lower()
+        if time.time() - start_time > 30:
+            return "The explanation is taking too long to generate. Your code might be very complex. Try sharing a smaller portion of the code."
+        elif "token" in error_message:
+            return "The code is too large to explain in one go. Please share a smaller snippet or break it into logical parts."
+        elif "model" in error_message:
+            return f"The Gemini model '{model_name}' is currently unavailable. Try again later or try using 'gemini-1.5-pro' instead."
+        else:
+            return f"Could not generate an explanation: {str(retry_error)}. Please try again with a simpler code snippet."
+
+@instrument("generate", ok_if=is_cacheable_response)
+@cached_response("generate", model="auto", code_arg="text", cache_if=is_cacheable_response)
+def generate_code_from_text(
+    text: str,
+    language: str = None,
+    model: str = None,
+    temperature: float = 0.1,
+    max_tokens: int = 1024,
+    include_comments: bool = False,
+    optimize_for: str = "readability",
+    context_aware: bool = True,
+    fallback_models: list = None,
+    stream: bool = False
+) -> str:
+    """
+    Generates production-ready code from natural language descriptions using Groq's AI models.
+    Returns only the generated code as a string, or an error message.
+    ``model`` pins the first model to try; by default the router decides.
+    With ``stream=True`` a TextStream of tokens is returned instead; its
+    result is the extracted code.
+    """
+    import re
+
+    if not text or not isinstance(text, str):
+        return "❌ Invalid input: Text description must be a non-empty string."
+
+    temperature = max(0.0, min(1.0, temperature))
+    max_tokens = max(100, min(max_tokens, 8192))
+
+    if fallback_models:
+        fallback_models = list(fallback_models)
+        if model and model not in fallback_models:
+            fallback_models.insert(0, model)
+    else:
+        fallback_models = route("generate", text, max_tokens, preferred=model)
+
+    optimization_presets = {
+        "readability": (
+            "Prioritize clean, well-documented code with:\n"
+            "- Meaningful variable names\n"
+            "- Proper indentation\n"
+            "- Section comments\n"
+            "- Clear structure"
+        ),
+        "efficiency": (
+            "Optimize for performance with:\n"
+            "- Efficient algorithms\n"
+            "- Minimal computational complexity\n"
+            "- Memory optimization\n"
+            "- Parallelization where possible"
+        ),
+        "brevity": (
+            "Create concise code with:\n"
+            "- Minimal boilerplate\n"
+            "- Language idioms\n"
+            "- Compact syntax\n"
+            "- Removed redundancy"
+        )
+    }
+    optimize_for = optimize_for if optimize_for in optimization_presets else "readability"
+
+    prompt_sections = [
+        f"CODE GENERATION TASK: {text}",
+        f"TARGET LANGUAGE: {language or 'Auto-select'}",
+        f"OPTIMIZATION GOAL: {optimization_presets[optimize_for]}",
+        "ADDITIONAL REQUIREMENTS:",
+        f"- {'Include' if include_comments else 'Exclude'} detailed comments",
+        "- Generate production-ready code",
+        "- Use modern best practices",
+        "- Include error handling",
+        "- Output in markdown code blocks"
+    ]
+    if context_aware:
+        prompt_sections.insert(1, "CONTEXT: Generate robust code that handles edge cases and validates inputs")
+    prompt = "\n".join(prompt_sections)
+
+    def extract_code(content):
+        code_blocks = re.findall(r"```(?:[a-zA-Z]+)?\n([\s\S]+?)\n```", content, re.MULTILINE)
+        if code_blocks:
+            return code_blocks[0].strip()
+        return content.strip()
+
+    if stream or HEDGING:
+        # Hedging races a second model when the first is slow to start instead of waiting for it to fail
+        generated = TextStream(
+            stream_groq_with_fallback(
+                fallback_models, [{"role": "user", "content": prompt}],
+                temperature=temperature, max_tokens=max_tokens
+            ),
+            postprocess=extract_code,
+            on_error=lambda e: f"❌ All model attempts failed. Tried: {fallback_models}"
+        )
+        return generated if stream else generated.result()
+
+    models_tried = []
+
+    for current_model in fallback_models:
+        models_tried.append(current_model)
+        try:
+            completion = groq_chat_completion(
+                model=current_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            # Extract code block
+            return extract_code(completion.choices[0].message.content)
+        except Exception:
+            continue
+
+    return f"❌ All model attempts failed. Tried: {models_tried}"
+
+@instrument("flow_diagram", ok_if=is_cacheable_response)
+@cached_response("flow_diagram", model="auto", cache_if=is_cacheable_response)
+def generate_code_flow(code: str, beginner_annotations: bool = False) -> str:
+    """
+    Generate a beginner-friendly Mermaid flow diagram from code.
+
+    Python code is turned into a diagram locally from its AST in milliseconds.
+    The LLM is only used when beginner annotations are requested or when the
+    code cannot be parsed as Python (other languages, broken snippets).
+
+    Args:
+        code (str): Source code as input
+        beginner_annotations (bool): Ask the LLM for an annotated, beginner-friendly diagram
+
+    Returns:
+        str: Mermaid flow diagram (no extra text)
+    """
+    if not beginner_annotations:
+        try:
+            return python_to_mermaid(code)
+        except (SyntaxError, ValueError, RecursionError):
+            pass  # Not valid Python: let the model draw it
+
+    # Craft the prompt
+    prompt = f"""
+    You are an expert programmer who specializes in creating BEGINNER-FRIENDLY explanations.
+
+    Please generate a simple, easy-to-understand flow diagram for this Python code:
+
+    ```python
+    {code}
+    ```
+
+    Important requirements:
+    1. Make the diagram EXTREMELY beginner-friendly with clear labels
+    2. Include comments explaining what each step does
+    3. Use simple language - avoid technical jargon
+    4. Break complex operations into smaller steps
+    5. Provide the diagram ONLY in Mermaid syntax
+    6. Do not include any explanatory text outside the Mermaid code
+
+    Return ONLY the Mermaid diagram code.
+    """
+
+    error = None
+    for model in route("flow_diagram", prompt, 4096):
+        try:
+            # Call Groq model
+            response = groq_chat_completion(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.4,
+                max_completion_tokens=4096,
+                top_p=0.95,
+                stream=False
+            )
+
+            # Extract and clean Mermaid diagram
+            content = response.choices[0].message.content.strip()
+            mermaid_code = re.findall(r'```(?:mermaid)?\s*(.*?)```', content, re.DOTALL)
+
+            return mermaid_code[0].strip() if mermaid_code else content
+
+        except Exception as e:
+            error = e
+
+    return f"Error generating flow diagram: {str(error)}"
+
+
+SECURE_CODE_REPORT = "✅ NO SECURITY ISSUES DETECTED\n\nThe code appears to be secure. No vulnerabilities were identified in the analysis."
+
+# Inputs longer than this are narrowed down to the regions flagged by the static scanner
+SECURITY_FOCUS_MIN_LINES = 150
+
+def format_security_report(issues):
+    """
+    Format security issues (JSON report schema) into the readable report shown in the UI.
+    
+    Args:
+        issues (list): Issue dicts with type, severity, description, explanation, fix
+            and optionally line and source.
+        
+    Returns:
+        str: Markdown report
+    """
+    if not issues:
+        return SECURE_CODE_REPORT
+    
+    # Format the issues into a readable report
+    formatted_report = "🔴 SECURITY VULNERABILITIES DETECTED\n\n"
+    for i, issue in enumerate(issues, 1):
+        location = f", Line {issue.get('line')}" if issue.get('line') else ""
+        formatted_report += f"ISSUE #{i}: {issue.get('type')} (Severity: {issue.get('severity')}{location})\n"
+        formatted_report += f"Description: {issue.get('description')}\n"
+        formatted_report += f"Explanation: {issue.get('explanation')}\n"
+        if issue.get('source'):
+            formatted_report += f"Detected by: {issue.get('source')}\n"
+        formatted_report += "\nRecommended Fix:\n```python\n{}\n```\n\n".format(issue.get('fix'))
+    
+    return formatted_report
+
+SECURITY_ISSUE_PATTERN = re.compile(
+    r"^ISSUE #\d+: (?P<type>.*?) \(Severity: (?P<severity>[^,)]*)(?:, Line (?P<line>\d+))?\)\n"
+    r"Description: (?P<description>.*?)\nExplanation: (?P<explanation>.*?)\n",
+    re.MULTILINE | re.DOTALL
+)
+
+def parse_security_report(report):
+    """
+    Recover the issues from a report built by ``format_security_report``
+    (for machine-readable output such as SARIF).
+
+    Returns:
+        list: Issue dicts with type, severity, line (int or None), description and explanation.
+    """
+    return [
+        {**match.groupdict(), "line": int(match.group("line")) if match.group("line") else None}
+        for match in SECURITY_ISSUE_PATTERN.finditer(report or "")
+    ]
+
+def merge_security_issues(static_issues, model_issues):
+    """
+    Combine static-scanner and model issues. A model issue on the same line as a
+    static finding replaces it, since the model's description and fix are richer.
+    """
+    model_lines = {issue.get("line") for issue in model_issues if isinstance(issue, dict) and issue.get("line")}
+    merged = [issue for issue in static_issues if issue["line"] not in model_lines]
+    merged.extend(issue for issue in model_issues if isinstance(issue, dict))
+    return merged
+
+def request_security_issues(code_section, findings):
+    """
+    Ask the model for security issues in ``code_section``.
+    
+    Args:
+        code_section (str): Prompt section containing the code (whole file, excerpt or chunk)
+        findings (list): Static findings relevant to this code, passed as hints
+        
+    Returns:
+        tuple: (issues, raw_text). ``raw_text`` is set when the model did not answer in JSON.
+    """
+    static_section = ""
+    if findings:
+        static_summary = "\n".join(f"    - Line {f.line}: {f.type} ({f.severity}) - {f.description}" for f in findings)
+        static_section = f"""
+    A static analyzer already flagged the following. Confirm or refine each one, and look for anything it missed:
+{static_summary}
+    """
+    
+    prompt = f"""
+    You are an expert in code security and vulnerability analysis specializing in Python.
+    
+    Analyze the following code for security vulnerabilities, including but not limited to:
+    - Injection vulnerabilities (SQL, command, etc.)
+    - Insecure cryptography
+    - Authentication issues
+    - Authorization flaws
+    - Data validation problems
+    - Hardcoded credentials
+    - Insecure file operations
+    - Race conditions
+    - Memory management issues
+    - Input validation
+    
+    {code_section}
+    {static_section}
+    For each vulnerability found:
+    1. Provide a clear description of the vulnerability
+    2. Explain why it's a security concern
+    3. Rate its severity (Critical, High, Medium, Low)
+    4. Provide a complete code example that fixes the issue
+    
+    If no security issues are found, explicitly state "NO SECURITY ISSUES DETECTED" and explain why the code appears secure.
+    
+    Format your response as JSON with the following structure:
+    {{
+        "status": "secure" or "vulnerable",
+        "issues": [
+            {{
+                "type": "vulnerability type",
+                "severity": "Critical/High/Medium/Low",
+                "line": line number (integer),
+                "description": "detailed description",
+                "explanation": "why this is a security concern",
+                "fix": "complete code fix"
+            }}
+        ]
+    }}
+    
+    If the code is secure, return an empty issues array.
+    """
+    
+    # Make API call to the routed models, falling back on failure
+    models = route("security_scan", prompt, 4000)
+    for model in models:
+        try:
+            response = groq_chat_completion(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=4000,
+                response_format={"type": "json_object"}  # Request JSON response
+            )
+            break
+        except Exception:
+            if model == models[-1]:
+                raise
+    
+    # Extract and parse the security report
+    security_report = response.choices[0].message.content.strip()
+    
+    try:
+        report_data = json.loads(security_report)
+        if report_data.get("status") == "secure":
+            return [], None
+        return [issue for issue in report_data.get("issues", []) if isinstance(issue, dict)], None
+    except json.JSONDecodeError:
+        # Fallback for non-JSON responses
+        if "NO SECURITY ISSUES DETECTED" in security_report:
+            return [], None
+        return [], security_report
+
+@instrument("security_scan", ok_if=is_cacheable_response)
+@cached_response("security_scan", model="auto", cache_if=is_cacheable_response)
+def run_security_scan(code, mode="focused"):
+    """
+    Run a comprehensive security scan on the provided code using AI.
+    
+    A local static pre-scanner (security_rules.py) always runs first. What is
+    sent to the model depends on ``mode``:
+        - "fast": nothing; the report contains only the static findings
+        - "focused" (default): small inputs are sent whole; larger inputs are
+          narrowed down to the flagged regions plus context
+        - "full": the whole input is always sent
+    Large inputs that are sent in full are scanned chunk by chunk in parallel,
+    with the line numbers of every issue mapped back to the original file.
+    
+    Args:
+        code (str): The source code to scan
+        mode (str): "fast", "focused" or "full"
+        
+    Returns:
+        str: A readable security report built from the structured report:
+            - status: "secure" or "vulnerable"
+            - issues: List of identified vulnerabilities (empty if none found)
+            - fixes: Suggested code fixes for each vulnerability
+            - explanation: Detailed explanation of each issue
+    """
+    findings = scan_code(code)
+    static_issues = [finding.to_issue() for finding in findings]
+    
+    if mode == "fast":
+        return format_security_report(static_issues)
+    
+    total_lines = len(code.splitlines())
+    
+    def scan_chunk(chunk):
+        chunk_findings = [f for f in findings if chunk.start_line <= f.line <= chunk.end_line]
+        issues, raw_text = request_security_issues(
+            f"""These are lines {chunk.start_line}-{chunk.end_line} of a {total_lines}-line file, with their line numbers:
+    
+    ```
+    {numbered(chunk)}
+    ```""",
+            chunk_findings
+        )
+        for issue in issues:
+            issue["line"] = map_line(issue.get("line"), chunk)
+        return issues, raw_text
+    
+    try:
+        if mode == "focused" and findings and total_lines > SECURITY_FOCUS_MIN_LINES:
+            model_issues, raw_text = request_security_issues(
+                f"""The file has {total_lines} lines. Only the regions flagged by static analysis are shown,
+    with their original line numbers:
+    
+    ```
+    {focus_excerpt(code, findings)}
+    ```""",
+                findings
+            )
+        elif is_large_input(code):
+            model_issues, raw_parts = [], []
+            for chunk, (issues, chunk_raw_text) in map_chunks(split_source(code), scan_chunk):
+                model_issues.extend(issues)
+                if chunk_raw_text:
+                    raw_parts.append(f"## 📄 {chunk.label}\n\n{chunk_raw_text}")
+            raw_text = "\n\n".join(raw_parts) or None
+        else:
+            model_issues, raw_text = request_security_issues(
+                f"""```python
+    {code}
+    ```""",
+                findings
+            )
+    except Exception as e:
+        if static_issues:
+            # The local findings are still worth showing when the model is unavailable
+            return f"⚠️ AI analysis unavailable ({e}). Showing static analysis results only.\n\n" + format_security_report(static_issues)
+        return f"❌ ERROR DURING SECURITY SCAN: {str(e)}\n\nPlease check your code format and try again."
+    
+    report = format_security_report(merge_security_issues(static_issues, model_issues))
+    if raw_text:
+        # Part of the model output was not JSON: show it verbatim after the structured findings
+        if not static_issues and not model_issues:
+            return raw_text
+        return report + raw_text
+    return report
+    
+    
+@instrument("fix", ok_if=is_cacheable_response)
+@cached_response("fix", model="auto", cache_if=is_cacheable_response)
+def get_fixed_code_with_groq(code, stream=False, model=None):
+    """
+    Get fixed and secure code using Groq API.
+    
+    Args:
+        code (str): The source code to fix
+        stream (bool): Return a TextStream of tokens instead of the final string
+        model (str, optional): Model to try first (Settings tab). Defaults to the router's choice.
+        
+    Returns:
+        str: The fixed and secure code or error message
+    """
+    # Large files are fixed chunk by chunk (top-level units) and stitched back together
+    if is_large_input(code):
+        return map_reduce_sections(
+            code, None, lambda chunk_code: get_fixed_code_with_groq(chunk_code, model=model),
+            stream=stream, headings=False
+        )
+    
+    prompt = f"""
+    You are an expert programmer proficient in multiple programming languages.
+    
+    I need you to fix and secure the following code:
+    
+    ```python
+    {code}
+    ```
+    
+    Please provide only the fixed and secure code without any explanations or comments.
+    Make sure to preserve the functionality and logic of the original code.
+    Use idiomatic Python patterns and best practices.
+    """
+    
+    def finalize(fixed_code):
+        fixed_code = fixed_code.strip()
+        # Clean up the response to extract just the code if it contains markdown
+        if "```" in fixed_code:
+            # Extract code between markdown code blocks
+            code_blocks = re.findall(r'```(?:\w+)?\n(.*?)```', fixed_code, re.DOTALL)
+            if code_blocks:
+                fixed_code = code_blocks[0].strip()
+        return fixed_code
+    
+    models = route("fix", prompt, 4000, preferred=model)
+    
+    if stream:
+        return TextStream(
+            stream_groq_with_fallback(models, [{"role": "user", "content": prompt}], temperature=0.2, max_tokens=4000),
+            postprocess=finalize,
+            on_error=lambda e: f"Error during code fixing: {e}"
+        )
+    
+    error = None
+    for current_model in models:
+        try:
+            response = groq_chat_completion(
+                model=current_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=4000
+            )
+            
+            return finalize(response.choices[0].message.content)
+        
+        except Exception as e:
+            error = e
+    
+    return f"Error during code fixing: {error}"
+
+@instrument("convert", ok_if=is_cacheable_response)
+@cached_response("convert", model="auto", cache_if=is_cacheable_response)
+def convert_code_language(code, source_language, target_language, stream=False):
+    """
+    Convert code from one programming language to another using Groq API.
+    
+    Args:
+        code (str): The source code to convert
+        source_language (str): The language of the source code
+        target_language (str): The target language to convert to
+        stream (bool): Return a TextStream of tokens instead of the final string
+        
+    Returns:
+        str: The converted code or error message
+    """
+    # Shared, pooled Groq client (one for every model in the loop)
+    try:
+        get_groq_client()
+    except ImportError:
+        return "Error: Groq package not installed. Install with 'pip install groq'"
+    
+    prompt = f"""
+    You are an expert programmer proficient in multiple programming languages.
+    
+    I need you to convert the following {source_language} code to {target_language}.
+    
+    ```{source_language.lower()}
+    {code}
+    ```
+    
+    Please provide only the converted {target_language} code without any explanations or comments.
+    Make sure to preserve the functionality and logic of the original code.
+    Use idiomatic {target_language} patterns and best practices.
+    
+    IMPORTANT: Return ONLY the code, no markdown code blocks, no explanations.
+    """
+    
+    # Cheapest healthy model for the input size first, the others as fallbacks
+    models = route("convert", prompt, 4000)
+    
+    def finalize(converted_code):
+        converted_code = converted_code.strip()
+        
+        # Clean up the response to extract just the code if it contains markdown
+        if "```" in converted_code:
+            # Extract code between markdown code blocks
+            code_blocks = re.findall(r'```(?:\w+)?\n(.*?)```', converted_code, re.DOTALL)
+            if code_blocks:
+                converted_code = code_blocks[0].strip()
+            else:
+                # If we can't find code blocks with language specification, try without it
+                code_blocks = re.findall(r'```\n?(.*?)```', converted_code, re.DOTALL)
+                if code_blocks:
+                    converted_code = code_blocks[0].strip()
+        
+        # Further cleanup: remove any remaining tags or headers
+        converted_code = re.sub(r'^#.*\n?', '', converted_code, flags=re.MULTILINE)
+        
+        # If the code still starts with language name or comments about the language, remove them
+        if converted_code.lower().startswith(target_language.lower()):
+            converted_code = re.sub(f'^{target_language.lower()}.*\n', '', converted_code, flags=re.IGNORECASE)
+        return converted_code
+    
+    if stream or HEDGING:
+        converted = TextStream(
+            stream_groq_with_fallback(models, [{"role": "user", "content": prompt}], temperature=0.2, max_tokens=4000),
+            postprocess=finalize,
+            on_error=lambda e: f"Error during code conversion: {e}"
+        )
+        return converted if stream else converted.result()
+    
+    # Try each model in sequence until one works
+    for model in models:
+        try:
+            # Attempt to use the current model
+            response = groq_chat_completion(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=4000,
+                stream=False
+            )
+            
+            # The answering model, latency and tokens are recorded by the instrumentation
+            return finalize(response.choices[0].message.content)
+            
+        except Exception as e:
+            logger.warning("Model %s failed with error: %s", model, e)
+            # If we're on the last model, return the error
+            if model == models[-1]:
+                return f"Error during code conversion: {e}"
+            # Otherwise continue to the next model
+            continue
+    
+    return "Error: All conversion attempts failed."
+
+@instrument("assistant", ok_if=is_cacheable_response)
+@cached_response("assistant", model="auto", cache_if=is_cacheable_response, near_duplicates=True)
+def get_ai_assistant_response(
+    code: str,
+    question: str,
+    expertise_level: str = "beginner",
+    model: str = None,
+    include_examples: bool = True,
+    language: str = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    stream: bool = False
+):
+    """
+    Provides AI-powered code assistance for debugging and explanation.
+
+    Args:
+        code (str): The code to analyze.
+        question (str): The user's question or issue.
+        expertise_level (str): "beginner", "intermediate", or "expert".
+        model (str): Groq model to try first. Defaults to the router's choice.
+        include_examples (bool): Whether to include examples.
+        language (str): Programming language (optional).
+        temperature (float): Model creativity.
+        max_tokens (int): Max tokens for response.
+        stream (bool): Return a TextStream of tokens instead of the final string.
+
+    Returns:
+        str: AI assistant's response or error message.
+    """
+    # Large files: ask about every chunk in parallel and keep only the relevant answers
+    if is_large_input(code):
+        def ask_chunk(chunk_code):
+            answer = get_ai_assistant_response(
+                chunk_code,
+                f"{question}\n\n(This is only one part of a larger file. If this part is not related to "
+                f"the question, reply with exactly: NOT RELEVANT)",
+                expertise_level, model, include_examples, language, temperature, max_tokens
+            )
+            return None if answer.strip().upper().startswith("NOT RELEVANT") else answer
+        return map_reduce_sections(code, language, ask_chunk, stream=stream)
+    
+    expertise_instructions = {
+        "beginner": (
+            "- Use simple explanations and define technical terms.\n"
+            "- Break down solutions step by step.\n"
+            "- Avoid jargon unless explained.\n"
+            "- Encourage and be friendly."
+        ),
+        "intermediate": (
+            "- Balance explanation and practical solutions.\n"
+            "- Suggest best practices and patterns."
+        ),
+        "expert": (
+            "- Focus on concise, efficient solutions.\n"
+            "- Discuss trade-offs and optimizations."
+        )
+    }
+    instructions = expertise_instructions.get(expertise_level, expertise_instructions["beginner"])
+    language_hint = f"The code is written in {language}." if language else "Please identify the programming language."
+    example_instruction = "Include 1-2 clear examples." if include_examples else ""
+
+    prompt = (
+        f"You are an expert AI code assistant.\n\n"
+        f"CODE:\n{code}\n\n"
+        f"QUESTION:\n{question}\n\n"
+        f"{language_hint}\n\n"
+        f"INSTRUCTIONS:\n"
+        f"- Tailor your help for a {expertise_level} programmer.\n"
+        f"- {example_instruction}\n"
+        f"- Identify the issue clearly.\n"
+        f"- Explain solutions simply.\n"
+        f"- Show corrected code if needed.\n"
+        f"{instructions}\n"
+    )
+
+    models = route("assistant", prompt, max_tokens, preferred=model)
+
+    def describe_error(e):
+        error_msg = str(e).lower()
+        if "timeout" in error_msg:
+            return "The AI assistant timed out. Try simplifying your code or question."
+        elif "token" in error_msg:
+            return "Your code is too large. Please provide a smaller snippet."
+        elif "model" in error_msg:
+            return "The selected AI model is unavailable. Try again later."
+        return f"AI assistant error: {e}"
+
+    if stream:
+        return TextStream(
+            stream_groq_with_fallback(models, [{"role": "user", "content": prompt}], temperature=temperature, max_tokens=max_tokens),
+            postprocess=str.strip,
+            on_error=describe_error
+        )
+
+    error = None
+    for current_model in models:
+        try:
+            response = groq_chat_completion(
+                model=current_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=False
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            error = e
+    return describe_error(error)
@@ -0,0 +1,151 @@
+"""
+Concurrent fan-out for FixiFox analyses.
+
+The "Analyze Everything" action in the Code Debugger runs Explain, Fix, Flow
+Diagram and Security Scan at the same time on a bounded thread pool, so the
+wall-clock time is roughly that of the slowest call instead of the sum.
+
+Results are yielded in completion order so the UI can render each panel as
+soon as it is ready. Every task has its own timeout and can be cancelled
+individually. Python threads cannot be killed, so a cancelled or timed-out
+call that is already running is abandoned: its result is discarded and its
+worker is freed when the provider call returns.
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_analysis_executor():
+    """Return the shared, bounded pool used for analysis fan-out."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("FIXIFOX_ANALYSIS_WORKERS", "8")),
+                    thread_name_prefix="fixifox-analysis",
+                )
+    return _executor
+
+
+@dataclass
+class AnalysisTask:
+    """One analysis to run: ``func(*args, **kwargs)`` with an optional timeout in seconds."""
+    name: str
+    func: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    timeout: Optional[float] = None
+
+
+@dataclass
+class AnalysisResult:
+    """
+    Outcome of one task.
+
+    ``status`` is one of "done", "error", "timeout" or "cancelled".
+    """
+    name: str
+    status: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+
+class AnalysisRun:
+    """
+    A set of tasks submitted together.
+
+    Args:
+        tasks (list[AnalysisTask]): Tasks to start immediately.
+        executor (Executor, optional): Pool to run on. Defaults to the shared pool.
+    """
+
+    def __init__(self, tasks, executor=None):
+        self.started_at = time.perf_counter()
+        executor = executor or get_analysis_executor()
+        self._lock = threading.Lock()
+        self._cancelled = set()
+        self._futures = {}
+        self._deadlines = {}
+        for task in tasks:
+            future = executor.submit(task.func, *task.args, **task.kwargs)
+            self._futures[future] = task
+            if task.timeout:
+                self._deadlines[future] = self.started_at + task.timeout
+
+    def cancel(self, name):
+        """Cancel a single task by name. Its result will not be reported."""
+        with self._lock:
+            self._cancelled.add(name)
+        for future, task in self._futures.items():
+            if task.name == name:
+                future.cancel()
+
+    def cancel_all(self):
+        """Cancel every task that has not finished yet."""
+        for task in self._futures.values():
+            self.cancel(task.name)
+
+    def _finish(self, future, status, value=None, error=None):
+        task = self._futures[future]
+        return AnalysisResult(
+            name=task.name,
+            status=status,
+            value=value,
+            error=error,
+            elapsed=time.perf_counter() - self.started_at,
+        )
+
+    def results(self):
+        """
+        Yield an ``AnalysisResult`` for every task, in completion order.
+
+        Tasks that exceed their timeout are reported as "timeout" at their
+        deadline; cancelled tasks are reported as "cancelled" right away.
+        """
+        pending = set(self._futures)
+        while pending:
+            with self._lock:
+                cancelled = set(self._cancelled)
+            for future in [f for f in pending if self._futures[f].name in cancelled]:
+                pending.discard(future)
+                future.cancel()
+                yield self._finish(future, "cancelled")
+
+            now = time.perf_counter()
+            for future in [f for f in pending if f in self._deadlines and self._deadlines[f] <= now and not f.done()]:
+                pending.discard(future)
+                future.cancel()
+                yield self._finish(future, "timeout")
+            if not pending:
+                break
+
+            deadlines = [self._deadlines[f] for f in pending if f in self._deadlines]
+            # Wake up periodically so cancellations from other threads are noticed
+            wait_for = min([d - time.perf_counter() for d in deadlines] + [0.25])
+            done, _ = wait(pending, timeout=max(wait_for, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                error = future.exception()
+                if error is not None:
+                    yield self._finish(future, "error", error=error)
+                else:
+                    yield self._finish(future, "done", value=future.result())
+
+    @property
+    def elapsed(self):
+        """Seconds since the run was started."""
+        return time.perf_counter() - self.started_at
+
+
+def run_analyses(tasks, executor=None):
+    """Start ``tasks`` concurrently and return the ``AnalysisRun`` handle."""
+    return AnalysisRun(tasks, executor=executor)
@@ -0,0 +1,336 @@
+"""
+Headless HTTP/JSON API for the FixiFox features.
+
+Serves the entry points of ai_features.py without Streamlit, so CI bots and
+editor plugins can call them directly:
+
+    POST /v1/explain   {"code", "is_error", "programming_language", "detail_level", ...}
+    POST /v1/fix       {"code", "model"}
+    POST /v1/scan      {"code", "mode": "fast" | "focused" | "full"}
+    POST /v1/diagram   {"code", "beginner_annotations"}
+    POST /v1/convert   {"code", "source_language", "target_language"}
+    POST /v1/generate  {"text", "language", "temperature", "max_tokens", ...}
+    POST /v1/assist    {"code", "question", "expertise_level", ...}
+    GET  /healthz      liveness probe
+    GET  /metrics      Prometheus text format (see metrics.py)
+
+A feature answers ``{"request_id": ..., "result": ...}`` (502 with
+``"error"`` when the model call failed). Missing, unknown or mistyped body
+fields are answered with 400. With ``"stream": true`` explain,
+fix, convert, generate and assist answer with chunked newline-delimited
+JSON instead: ``{"delta": ...}`` lines as tokens arrive, then one
+``{"done": true, "result": ...}`` (or ``"error"``) line.
+
+Every response carries an ``X-Request-ID`` header: the caller's, if it sent
+one, else a generated id. The same id is used in the request log
+(FIXIFOX_REQUEST_LOG), so a bot can match its calls to the log lines.
+
+Each connection is served by its own thread, and those threads spend most
+of their time waiting on the provider. At most FIXIFOX_API_MAX_CONCURRENCY
+features run at once (a stream holds its slot until it ends). Requests that
+get no slot within FIXIFOX_API_QUEUE_TIMEOUT seconds are answered with 503
+and ``Retry-After``. The rate limiter, cache, router and circuit breakers
+are shared with every other caller in the process.
+
+Run with ``python api.py [--host HOST] [--port PORT]``.
+
+Configuration (environment variables):
+    FIXIFOX_API_HOST              Interface to listen on (default 127.0.0.1)
+    FIXIFOX_API_PORT              Port to listen on (default 8080)
+    FIXIFOX_API_MAX_CONCURRENCY   Features running at once (default 16)
+    FIXIFOX_API_QUEUE_TIMEOUT     Seconds a request may wait for a slot (default 10)
+    FIXIFOX_API_TOKEN             If set, required as ``Authorization: Bearer <token>``
+    FIXIFOX_API_MAX_BODY          Largest accepted request body in bytes (default 1048576)
+"""
+import argparse
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+from instrumentation import request_id as use_request_id
+
+MAX_CONCURRENCY = int(os.environ.get("FIXIFOX_API_MAX_CONCURRENCY", "16"))
+QUEUE_TIMEOUT = float(os.environ.get("FIXIFOX_API_QUEUE_TIMEOUT", "10"))
+MAX_BODY = int(os.environ.get("FIXIFOX_API_MAX_BODY", str(2 ** 20)))
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+logger = logging.getLogger("fixifox.api")
+
+# Accepted JSON types of every body field; None is allowed where the feature defaults to it
+_TEXT = (str,)
+_OPTIONAL_TEXT = (str, type(None))
+_FLAG = (bool,)
+_NUMBER = (int, float)
+FIELD_TYPES = {
+    "code": _TEXT, "text": _TEXT, "question": _TEXT,
+    "source_language": _TEXT, "target_language": _TEXT,
+    "detail_level": _TEXT, "expertise_level": _TEXT, "optimize_for": _TEXT, "mode": _TEXT,
+    "programming_language": _OPTIONAL_TEXT, "language": _OPTIONAL_TEXT, "model": _OPTIONAL_TEXT,
+    "is_error": _FLAG, "highlight_important_parts": _FLAG, "include_examples": _FLAG,
+    "include_diagrams": _FLAG, "beginner_annotations": _FLAG, "include_comments": _FLAG,
+    "context_aware": _FLAG, "stream": _FLAG,
+    "temperature": _NUMBER, "max_tokens": (int,),
+}
+_TYPE_NAMES = {_TEXT: "a string", _OPTIONAL_TEXT: "a string or null", _FLAG: "a boolean",
+               _NUMBER: "a number", (int,): "an integer"}
+
+_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+_in_flight = [0]
+_in_flight_lock = threading.Lock()
+
+
+def _track(delta):
+    with _in_flight_lock:
+        _in_flight[0] += delta
+        metrics.set_gauge("api_in_flight", _in_flight[0])
+
+
+class Endpoint:
+    """
+    One feature exposed over HTTP.
+
+    Args:
+        function (str): Name of the entry point in ai_features.py.
+        required (tuple): Body fields that must be present.
+        optional (tuple): Body fields passed through when present.
+        streamable (bool): Whether the entry point accepts ``stream=True``.
+    """
+
+    def __init__(self, function, required, optional=(), streamable=False):
+        self.function = function
+        self.required = required
+        self.optional = optional
+        self.streamable = streamable
+
+    def arguments(self, body):
+        """Keyword arguments for the entry point, or raise ValueError naming the problem."""
+        missing = [name for name in self.required if body.get(name) in (None, "")]
+        if missing:
+            raise ValueError(f"missing field(s): {', '.join(missing)}")
+        unknown = set(body) - set(self.required) - set(self.optional) - {"stream"}
+        if unknown:
+            raise ValueError(f"unknown field(s): {', '.join(sorted(unknown))}")
+        for name, value in body.items():
+            types = FIELD_TYPES[name]
+            # JSON true/false are bools, which Python also counts as ints
+            if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+                raise ValueError(f"field {name} must be {_TYPE_NAMES[types]}")
+        return {name: body[name] for name in self.required + self.optional if name in body}
+
+
+ENDPOINTS = {
+    "/v1/explain": Endpoint(
+        "explain_code_with_gemini", ("code",),
+        ("is_error", "programming_language", "detail_level", "highlight_important_parts",
+         "include_examples", "include_diagrams"),
+        streamable=True,
+    ),
+    "/v1/fix": Endpoint("get_fixed_code_with_groq", ("code",), ("model",), streamable=True),
+    "/v1/scan": Endpoint("run_security_scan", ("code",), ("mode",)),
+    "/v1/diagram": Endpoint("generate_code_flow", ("code",), ("beginner_annotations",)),
+    "/v1/convert": Endpoint("convert_code_language", ("code", "source_language", "target_language"), streamable=True),
+    "/v1/generate": Endpoint(
+        "generate_code_from_text", ("text",),
+        ("language", "model", "temperature", "max_tokens", "include_comments", "optimize_for", "context_aware"),
+        streamable=True,
+    ),
+    "/v1/assist": Endpoint(
+        "get_ai_assistant_response", ("code", "question"),
+        ("expertise_level", "model", "include_examples", "language", "temperature", "max_tokens"),
+        streamable=True,
+    ),
+}
+
+
+class APIError(Exception):
+    """An error answered with ``status`` and ``{"error": message}``."""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class _APIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FixiFox"
+
+    def do_GET(self):
+        self.request_id = self._request_id()
+        path = self.path.split("?")[0]
+        if path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/metrics":
+            self._send(200, metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        self.request_id = self._request_id()
+        path = self.path.split("?")[0]
+        status = 500
+        try:
+            endpoint = ENDPOINTS.get(path)
+            if endpoint is None:
+                raise APIError(404, "not found")
+            self._authorize()
+            body = self._read_body()
+            try:
+                kwargs = endpoint.arguments(body)
+            except ValueError as e:
+                raise APIError(400, str(e))
+            stream = body.get("stream", False)
+            if stream and not endpoint.streamable:
+                raise APIError(400, f"{path} does not support streaming")
+            if stream:
+                kwargs["stream"] = True
+            status = self._run(endpoint, kwargs, stream)
+        except APIError as e:
+            status = e.status
+            if status in (401, 404):
+                # The body was not read, so the connection cannot be reused
+                self.close_connection = True
+            self._send_json(e.status, {"error": str(e)}, e.headers)
+        except Exception as e:
+            logger.exception("API request %s failed: %s", self.request_id, e)
+            self._send_json(500, {"error": "internal error"})
+        finally:
+            metrics.increment("api_requests", endpoint=path if path in ENDPOINTS else "other", status=str(status))
+
+    def _run(self, endpoint, kwargs, stream):
+        import ai_features
+
+        if not _slots.acquire(timeout=QUEUE_TIMEOUT):
+            raise APIError(503, "server busy, retry later", {"Retry-After": "1"})
+        _track(1)
+        try:
+            with use_request_id(self.request_id):
+                result = getattr(ai_features, endpoint.function)(**kwargs)
+                if stream:
+                    return self._stream(result)
+            if not ai_features.is_cacheable_response(result):
+                self._send_json(502, {"error": result})
+                return 502
+            self._send_json(200, {"result": result})
+            return 200
+        finally:
+            _track(-1)
+            _slots.release()
+
+    def _stream(self, result):
+        """Send ``result`` (a TextStream, or a string on a cache hit) as NDJSON."""
+        from ai_features import is_cacheable_response
+        from streaming import TextStream
+
+        if isinstance(result, str):
+            result = TextStream.from_text(result)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("X-Request-ID", self.request_id)
+        self.end_headers()
+        try:
+            for chunk in result:
+                self._write_chunk({"delta": chunk})
+            final = result.result()
+            if result.failed or not is_cacheable_response(final):
+                self._write_chunk({"done": True, "error": final})
+            else:
+                self._write_chunk({"done": True, "result": final})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away: stop reading from the provider
+            result.close()
+            self.close_connection = True
+        except Exception as e:
+            # Headers are already sent: report the failure in the stream itself
+            logger.exception("API request %s failed while streaming: %s", self.request_id, e)
+            self._write_chunk({"done": True, "error": "internal error"})
+            self.wfile.write(b"0\r\n\r\n")
+        return 200
+
+    def _write_chunk(self, payload):
+        data = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _request_id(self):
+        value = self.headers.get("X-Request-ID", "")
+        return value if _REQUEST_ID.match(value) else uuid.uuid4().hex[:12]
+
+    def _authorize(self):
+        token = os.environ.get("FIXIFOX_API_TOKEN")
+        if token and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+            raise APIError(401, "invalid or missing token", {"WWW-Authenticate": "Bearer"})
+
+    def _read_body(self):
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            raise APIError(400, "invalid Content-Length")
+        if length > MAX_BODY:
+            self.close_connection = True
+            raise APIError(413, f"body larger than {MAX_BODY} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            raise APIError(400, "body is not valid JSON")
+        if not isinstance(body, dict):
+            raise APIError(400, "body must be a JSON object")
+        return body
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, json.dumps({"request_id": self.request_id, **payload}).encode("utf-8"),
+                   "application/json", headers)
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Request-ID", self.request_id)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(host=None, port=None):
+    """Build the API server (call ``serve_forever`` on it)."""
+    host = host or os.environ.get("FIXIFOX_API_HOST", "127.0.0.1")
+    port = int(port or os.environ.get("FIXIFOX_API_PORT", "8080"))
+    server = ThreadingHTTPServer((host, port), _APIHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="FixiFox HTTP API")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port)
+    print(f"FixiFox API listening on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
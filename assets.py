@@ -0,0 +1,95 @@
+"""
+Stylesheets for the Streamlit UI.
+
+The CSS lives in ``assets/css`` instead of inline ``st.markdown`` blocks.
+Each bundle is read, minified and hashed once per process
+(``build_stylesheet`` is memoized), and app.py sends it to the browser
+once per session: ``injection_html`` builds a zero-height component whose
+script copies the CSS into a ``<style id=...>`` element of the page head.
+That element outlives the component, so later reruns send nothing. A slot
+id per bundle lets a different bundle (e.g. another theme) replace it.
+
+Set FIXIFOX_STYLE_MODE=inline to fall back to re-sending the minified CSS
+in a ``<style>`` tag on every rerun.
+"""
+import functools
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+
+CSS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "css")
+STYLE_MODE = os.environ.get("FIXIFOX_STYLE_MODE", "session")
+
+
+@dataclass(frozen=True)
+class Stylesheet:
+    css: str
+    digest: str
+    source_bytes: int
+
+
+def minify_css(css):
+    """
+    Strip comments and redundant whitespace from ``css``.
+
+    ``@import`` rules are hoisted to the front because they are only valid
+    before every other rule once several files are concatenated.
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    imports = re.findall(r"@import[^;]+;", css)
+    css = re.sub(r"@import[^;]+;", "", css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}")
+    return "".join(imports) + css.strip()
+
+
+@functools.lru_cache(maxsize=None)
+def build_stylesheet(*names):
+    """
+    Concatenate, minify and hash CSS files from ``assets/css`` (once per process).
+
+    Args:
+        *names: File names relative to ``assets/css``, in cascade order.
+
+    Returns:
+        Stylesheet
+    """
+    sources = []
+    for name in names:
+        with open(os.path.join(CSS_DIR, name), encoding="utf-8") as css_file:
+            sources.append(css_file.read())
+    source = "\n".join(sources)
+    css = minify_css(source)
+    return Stylesheet(
+        css=css,
+        digest=hashlib.sha256(css.encode("utf-8")).hexdigest()[:12],
+        source_bytes=len(source.encode("utf-8")),
+    )
+
+
+def injection_html(slot, sheet):
+    """HTML/JS for a component that installs ``sheet`` in the parent page's head."""
+    return f"""<script>
+const doc = window.parent.document;
+const id = "fixifox-style-{slot}";
+let style = doc.getElementById(id);
+if (!style) {{
+    style = doc.createElement("style");
+    style.id = id;
+    doc.head.appendChild(style);
+}}
+if (style.dataset.digest !== "{sheet.digest}") {{
+    style.textContent = {json.dumps(sheet.css)};
+    style.dataset.digest = "{sheet.digest}";
+}}
+</script>"""
+
+
+def theme_file(theme):
+    """Stylesheet name for a theme label from the Settings tab."""
+    slug = re.sub(r"[^a-z]+", "-", theme.lower().replace("(default)", "")).strip("-")
+    return f"themes/{slug}.css"
@@ -0,0 +1,383 @@
+"""
+Offline load test of the AI features against stub Groq and Gemini clients.
+
+Usage:
+    python benchmarks/bench_ai_features.py [--requests 50] [--concurrency 8]
+        [--features explain,fix,...] [--median 0.6] [--sigma 0.4]
+        [--token-delay 0.005] [--errors 0.05] [--rate-limits 0.01]
+        [--slow-model MODEL=SECONDS] [--responses recorded.json]
+        [--stream] [--cache] [--real-limits] [--seed 1]
+
+The client registry is replaced by one whose Groq client and Gemini models
+answer locally: every call sleeps for a log-normally distributed time to
+first token (``--median`` seconds, spread ``--sigma``; per model with
+``--slow-model``), streams its answer in small chunks ``--token-delay``
+seconds apart and fails with a 503 (``--errors``) or 429 (``--rate-limits``)
+at the given rates. Answers are replayed from built-in recordings, or from
+``--responses``: a JSON object mapping a feature name to the text to return.
+Everything above the SDK (rate limiter, retries, circuit breakers, router,
+hedging, cache, instrumentation) runs unchanged.
+
+Each feature is driven with ``--requests`` calls from ``--concurrency``
+threads; ``login`` runs ``app.login_user`` against a temporary user store.
+Inputs are unique per request and the near-duplicate cache is off unless
+``--cache`` is given, so by default every request reaches a provider. The
+rate limits are raised out of the way unless ``--real-limits`` is given.
+Reported per feature: errors, throughput and p50/p95/p99 latency (and time
+to first chunk with ``--stream``).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_CODE = '''def average(values):
+    total = 0
+    for value in values:
+        total += value
+    return total / len(values)
+
+
+def load_scores(path):
+    with open(path) as handle:
+        return [int(line) for line in handle]
+
+
+print(average(load_scores("scores.txt")))
+'''
+
+RECORDED = {
+    "explain": (
+        "## What this code does\n\n`average` adds up every value and divides by how many there are. "
+        "`load_scores` reads one integer per line from a file.\n\n## Watch out\n\n"
+        "Calling `average([])` divides by zero and raises `ZeroDivisionError`."
+    ),
+    "fix": (
+        "```python\ndef average(values):\n    if not values:\n        return 0\n    return sum(values) / len(values)\n```\n\n"
+        "The function now handles an empty list instead of dividing by zero."
+    ),
+    "convert": (
+        "```javascript\nfunction average(values) {\n  if (values.length === 0) return 0;\n"
+        "  return values.reduce((a, b) => a + b, 0) / values.length;\n}\n```"
+    ),
+    "generate": (
+        "```python\ndef is_palindrome(text: str) -> bool:\n    cleaned = [c.lower() for c in text if c.isalnum()]\n"
+        "    return cleaned == cleaned[::-1]\n```"
+    ),
+    "flow_diagram": (
+        "```mermaid\nflowchart TD\n    A[Start] --> B[Read scores from file]\n    B --> C{Any scores?}\n"
+        "    C -- yes --> D[Add them up and divide]\n    C -- no --> E[Division by zero!]\n    D --> F[Print average]\n```"
+    ),
+    "security_scan": json.dumps({
+        "status": "vulnerable",
+        "issues": [{
+            "type": "Path traversal",
+            "severity": "Medium",
+            "line": 9,
+            "description": "The file path is opened without validation.",
+            "explanation": "A user-controlled path could read arbitrary files.",
+            "fix": "Resolve the path and check it is inside the data directory before opening it.",
+        }],
+    }),
+    "assistant": (
+        "The crash comes from `len(values)` being 0 when the file is empty. "
+        "Check for an empty list first, for example `if not values: return 0`."
+    ),
+}
+
+STREAMABLE = {"explain", "fix", "convert", "generate", "assistant"}
+
+
+class StubAPIError(Exception):
+    """Provider error with an HTTP status, as the SDKs raise them."""
+
+    def __init__(self, status_code, message):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+
+
+class StubProvider:
+    """
+    Latency and failure model shared by the stub clients.
+
+    Args:
+        responses (dict): Feature name -> recorded answer.
+        median (float): Median seconds to first token.
+        sigma (float): Log-normal spread of the time to first token.
+        token_delay (float): Seconds between two streamed chunks.
+        error_rate (float): Share of calls failing with a 503.
+        rate_limit_rate (float): Share of calls failing with a 429.
+        slow_models (dict): Model -> median seconds to first token, overriding ``median``.
+        seed (int, optional): Seed for reproducible runs.
+    """
+
+    def __init__(self, responses, median, sigma, token_delay, error_rate, rate_limit_rate, slow_models, seed=None):
+        self.responses = responses
+        self.median = median
+        self.sigma = sigma
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.slow_models = slow_models
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.injected_errors = 0
+
+    def answer(self, model, prompt_chars):
+        """Wait out the time to first token, then return the text or raise an injected error."""
+        import instrumentation
+
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            delay = self._random.lognormvariate(0, self.sigma) * self.slow_models.get(model, self.median)
+            if roll < self.error_rate + self.rate_limit_rate:
+                self.injected_errors += 1
+        time.sleep(delay)
+        if roll < self.rate_limit_rate:
+            raise StubAPIError(429, "Rate limit reached, please try again later")
+        if roll < self.error_rate + self.rate_limit_rate:
+            raise StubAPIError(503, "Service unavailable")
+        request = instrumentation.current()
+        text = self.responses.get(request.feature if request else "assistant", RECORDED["assistant"])
+        return text, (prompt_chars // 4, len(text) // 4)
+
+    def chunks(self, text):
+        words = text.split(" ")
+        for index in range(0, len(words), 4):
+            if index:
+                time.sleep(self.token_delay)
+            yield " ".join(words[index:index + 4]) + (" " if index + 4 < len(words) else "")
+
+
+class StubCompletions:
+    def __init__(self, provider):
+        self.provider = provider
+
+    def create(self, model, messages, stream=False, **params):
+        text, (prompt_tokens, completion_tokens) = self.provider.answer(
+            model, sum(len(message["content"]) for message in messages)
+        )
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        if not stream:
+            message = SimpleNamespace(content=text)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+        def chunks():
+            for piece in self.provider.chunks(text):
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], x_groq=None)
+            yield SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=usage))
+
+        return chunks()
+
+
+class StubGroq:
+    """Stands in for ``groq.Groq``: only ``chat.completions.create`` is implemented."""
+
+    def __init__(self, provider):
+        self.chat = SimpleNamespace(completions=StubCompletions(provider))
+
+
+class StubGeminiModel:
+    """Stands in for ``genai.GenerativeModel``."""
+
+    def __init__(self, provider, model_name):
+        self.provider = provider
+        self.model_name = model_name
+
+    def generate_content(self, prompt, generation_config=None, safety_settings=None, stream=False, request_options=None):
+        text, (prompt_tokens, completion_tokens) = self.provider.answer(self.model_name, len(prompt))
+        usage = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=completion_tokens)
+        if not stream:
+            return SimpleNamespace(text=text, usage_metadata=usage)
+        return (SimpleNamespace(text=piece, usage_metadata=usage) for piece in self.provider.chunks(text))
+
+
+def install_stub_clients(provider):
+    """Replace the process-wide client registry with one serving the stubs."""
+    import clients
+
+    class StubRegistry(clients.ClientRegistry):
+        def groq(self):
+            if self._groq_client is None:
+                with self._lock:
+                    if self._groq_client is None:
+                        self._groq_client = StubGroq(provider)
+            return self._groq_client
+
+        def configure_gemini(self):
+            self._gemini_configured = True
+
+        def gemini_model(self, model_name):
+            with self._lock:
+                return self._gemini_models.setdefault(model_name, StubGeminiModel(provider, model_name))
+
+    with clients._registry_lock:
+        clients._registry = StubRegistry()
+
+
+def build_workloads(stream, cache):
+    """Feature name -> ``call(n)`` returning ``(result, ok)``."""
+    import ai_features
+
+    def code(n):
+        # A unique trailing comment defeats the exact-match cache (the near-duplicate tier is off)
+        return SAMPLE_CODE if cache else f"{SAMPLE_CODE}# benchmark request {n}\n"
+
+    def checked(result):
+        return result, ai_features.is_cacheable_response(result)
+
+    return {
+        "explain": lambda n: checked(ai_features.explain_code_with_gemini(code(n), programming_language="python", stream=stream)),
+        "fix": lambda n: checked(ai_features.get_fixed_code_with_groq(code(n), stream=stream)),
+        "security_scan": lambda n: checked(ai_features.run_security_scan(code(n))),
+        # Python diagrams are drawn locally; annotations make it a model call
+        "flow_diagram": lambda n: checked(ai_features.generate_code_flow(code(n), beginner_annotations=True)),
+        "convert": lambda n: checked(ai_features.convert_code_language(code(n), "Python", "JavaScript", stream=stream)),
+        "generate": lambda n: checked(ai_features.generate_code_from_text(
+            "Write a function that checks whether a string is a palindrome"
+            + ("" if cache else f" (benchmark request {n})"),
+            language="python", stream=stream,
+        )),
+        "assistant": lambda n: checked(ai_features.get_ai_assistant_response(
+            code(n), "Why does this crash when the file is empty?", stream=stream,
+        )),
+        "login": login_workload(),
+    }
+
+
+def seed_users(store, users, password):
+    """Create the schema of a fresh user store and ``users`` accounts sharing ``password``."""
+    from passwords import hash_password_sync
+
+    store.init_schema()
+    encoded = hash_password_sync(password)
+    for index in range(users):
+        store.create_user(f"bench{index}", f"bench{index}@example.com", encoded)
+
+
+def login_workload(users=20, password="Benchmark123"):
+    """``app.login_user`` against a temporary user store seeded with ``users`` accounts."""
+    seeded = threading.Event()
+    seed_lock = threading.Lock()
+
+    def call(n):
+        if not seeded.is_set():
+            # The first worker seeds while the others wait for it
+            with seed_lock:
+                if not seeded.is_set():
+                    from user_store import get_user_store
+
+                    seed_users(get_user_store(), users, password)
+                    seeded.set()
+        import app
+
+        # One in ten attempts uses a wrong password
+        success, message = app.login_user(f"bench{n % users}", password if n % 10 else "Wrong123")
+        return message, success == bool(n % 10)
+
+    return call
+
+
+def run_feature(call, requests, concurrency, stream):
+    lock = threading.Lock()
+    latencies, first_chunks, errors = [], [], [0]
+
+    def one(n):
+        started = time.perf_counter()
+        ok = True
+        try:
+            result, ok = call(n)
+            if stream and not isinstance(result, str):
+                for index, _ in enumerate(result):
+                    if index == 0:
+                        first_chunk = time.perf_counter() - started
+                        with lock:
+                            first_chunks.append(first_chunk)
+                ok = not result.failed
+        except Exception as e:
+            print(f"  request {n} raised {type(e).__name__}: {e}")
+            ok = False
+        with lock:
+            latencies.append(time.perf_counter() - started)
+            errors[0] += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return time.perf_counter() - started, sorted(latencies), sorted(first_chunks), errors[0]
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="requests per feature")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--features", default="explain,fix,security_scan,flow_diagram,convert,generate,assistant,login")
+    parser.add_argument("--median", type=float, default=0.6, help="median seconds to first token")
+    parser.add_argument("--sigma", type=float, default=0.4, help="log-normal spread of the time to first token")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="seconds between streamed chunks")
+    parser.add_argument("--errors", type=float, default=0.05, help="share of calls failing with a 503")
+    parser.add_argument("--rate-limits", type=float, default=0.01, help="share of calls failing with a 429")
+    parser.add_argument("--slow-model", action="append", default=[], metavar="MODEL=SECONDS",
+                        help="median time to first token of one model (repeatable)")
+    parser.add_argument("--responses", help="JSON file mapping feature names to recorded answers")
+    parser.add_argument("--stream", action="store_true", help="consume streamed results where supported")
+    parser.add_argument("--cache", action="store_true", help="repeat inputs and keep the near-duplicate cache")
+    parser.add_argument("--real-limits", action="store_true", help="keep the configured provider rate limits")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    # Read at import time by the modules below
+    workdir = tempfile.mkdtemp(prefix="fixifox-bench-")
+    os.environ["FIXIFOX_USER_DB"] = os.path.join(workdir, "users.db")
+    if not args.cache:
+        os.environ["FIXIFOX_SEMANTIC_CACHE"] = "0"
+    if not args.real_limits:
+        for provider in ("GROQ", "GEMINI"):
+            os.environ[f"FIXIFOX_{provider}_RPM"] = "1000000"
+            os.environ[f"FIXIFOX_{provider}_TPM"] = "1000000000"
+
+    responses = dict(RECORDED)
+    if args.responses:
+        with open(args.responses, encoding="utf-8") as handle:
+            responses.update(json.load(handle))
+    slow_models = {model: float(seconds) for model, seconds in (item.split("=", 1) for item in args.slow_model)}
+    provider = StubProvider(responses, args.median, args.sigma, args.token_delay, args.errors, args.rate_limits,
+                            slow_models, args.seed)
+    install_stub_clients(provider)
+    workloads = build_workloads(args.stream, args.cache)
+
+    print(f"{args.requests} requests per feature, concurrency {args.concurrency}, "
+          f"TTFT median {args.median}s, {args.errors:.0%} errors, {args.rate_limits:.0%} rate limits")
+    print(f"{'feature':<15}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ttft p50':>10}")
+    for feature in args.features.split(","):
+        stream = args.stream and feature in STREAMABLE
+        elapsed, latencies, first_chunks, errors = run_feature(workloads[feature], args.requests, args.concurrency, stream)
+        ttft = f"{statistics.median(first_chunks) * 1000:>10.0f}" if first_chunks else f"{'-':>10}"
+        print(f"{feature:<15}{errors:>8}{args.requests / elapsed:>9.1f}{percentile(latencies, 0.50) * 1000:>10.0f}"
+              f"{percentile(latencies, 0.95) * 1000:>10.0f}{percentile(latencies, 0.99) * 1000:>10.0f}{ttft}")
+    print(f"provider calls: {provider.calls}, injected errors: {provider.injected_errors}")
+
+    from circuit_breaker import breaker_states
+
+    opened = [state["model"] for state in breaker_states() if state["state"] != "closed"]
+    if opened:
+        print(f"circuit breakers not closed at the end: {', '.join(opened)}")
+
+
+if __name__ == "__main__":
+    main()
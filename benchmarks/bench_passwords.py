@@ -0,0 +1,76 @@
+"""
+Password KDF cost vs. login latency.
+
+Usage:
+    python benchmarks/bench_passwords.py [--burst 32] [--workers 4]
+
+For each candidate cost it reports the single-hash time and the p50/p99
+latency of a burst of ``--burst`` simultaneous verifications going through
+the bounded hashing pool (``--workers`` threads). Pick the highest cost
+whose p99 still meets the login latency target, then set
+FIXIFOX_SCRYPT_N / FIXIFOX_PBKDF2_ITERATIONS accordingly.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import passwords  # noqa: E402
+
+CANDIDATES = [
+    ("scrypt", 2 ** 13),
+    ("scrypt", 2 ** 14),
+    ("scrypt", 2 ** 15),
+    ("pbkdf2", 200000),
+    ("pbkdf2", 600000),
+]
+
+
+def measure(kdf, cost, burst, workers):
+    encoded = passwords.hash_password_sync("correct horse battery staple", kdf=kdf, cost=cost)
+
+    started = time.perf_counter()
+    passwords.verify_password_sync("correct horse battery staple", encoded)
+    single = time.perf_counter() - started
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    gate = threading.Barrier(burst)
+    latencies = []
+
+    def login():
+        gate.wait()
+        begun = time.perf_counter()
+        pool.submit(passwords.verify_password_sync, "correct horse battery staple", encoded).result()
+        latencies.append(time.perf_counter() - begun)
+
+    threads = [threading.Thread(target=login) for _ in range(burst)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.shutdown()
+
+    latencies.sort()
+    return single, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("FIXIFOX_HASH_WORKERS", "4")))
+    args = parser.parse_args()
+
+    print(f"burst of {args.burst} logins, {args.workers} hashing workers")
+    print(f"{'kdf':<8}{'cost':>10}{'single ms':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for kdf, cost in CANDIDATES:
+        single, p50, p99 = measure(kdf, cost, args.burst, args.workers)
+        print(f"{kdf:<8}{cost:>10}{single * 1000:>12.1f}{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Concurrent login/registration throughput: pooled WAL store vs. connect-per-call.
+
+Usage:
+    python benchmarks/bench_user_store.py [--threads 16] [--ops 200] [--users 500]
+
+Each thread performs ``--ops`` operations (90% logins, 10% registrations)
+against a fresh database in a temporary directory, once with the original
+connect/execute/close pattern on a rollback journal and once with
+``user_store.UserStore``. Password hashing is left out (a constant hash is
+used) so the numbers isolate the database layer.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from user_store import UserStore  # noqa: E402
+
+PASSWORD_HASH = "5e884898da28047151d0e56f8dc6292773603d0d6aabbdd62a11ef721d1542d8"
+
+
+class ConnectPerCallStore:
+    """The original access pattern: one connection per statement group."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def init_schema(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP
+        )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def create_user(self, username, email, password_hash):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+                         (username, email, password_hash))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def login(self, username):
+        conn = sqlite3.connect(self.db_path)
+        user = conn.execute("SELECT id FROM users WHERE username = ? AND password_hash = ?",
+                            (username, PASSWORD_HASH)).fetchone()
+        if user:
+            conn.execute("UPDATE users SET last_login = ? WHERE id = ?",
+                         (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), user[0]))
+            conn.commit()
+        conn.close()
+        return user is not None
+
+
+class PooledStore(UserStore):
+    def login(self, username):
+        user = self.get_credentials(username)
+        if user and user[1] == PASSWORD_HASH:
+            self.update_last_login(user[0], datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            return True
+        return False
+
+
+def run(store, threads, ops, users):
+    store.init_schema()
+    for i in range(users):
+        store.create_user(f"user{i}", f"user{i}@example.com", PASSWORD_HASH)
+
+    latencies = []
+    errors = []
+    counter = iter(range(users, users + threads * ops))
+    counter_lock = threading.Lock()
+    start_gate = threading.Barrier(threads)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = []
+        start_gate.wait()
+        for _ in range(ops):
+            started = time.perf_counter()
+            try:
+                if rng.random() < 0.1:
+                    with counter_lock:
+                        n = next(counter)
+                    store.create_user(f"user{n}", f"user{n}@example.com", PASSWORD_HASH)
+                else:
+                    store.login(f"user{rng.randrange(users)}")
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+            local.append(time.perf_counter() - started)
+        latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "ops_per_sec": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "connect-per-call": run(ConnectPerCallStore(os.path.join(tmp, "baseline.db")),
+                                    args.threads, args.ops, args.users),
+            "pooled WAL": run(PooledStore(os.path.join(tmp, "pooled.db"), pool_size=args.threads),
+                              args.threads, args.ops, args.users),
+        }
+
+    print(f"{args.threads} threads x {args.ops} ops (90% login / 10% register)")
+    print(f"{'store':<18}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['ops_per_sec']:>10.0f}{result['p50_ms']:>10.2f}"
+              f"{result['p99_ms']:>10.2f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Cold-start cost of the login page vs. the main app.
+
+Usage:
+    python benchmarks/measure_startup.py [--runs 5] [--importtime 15]
+
+Each measurement runs in a fresh interpreter:
+    login page  imports what app.py imports at module level
+    main app    additionally imports ai_features and builds the Groq and
+                Gemini clients (which imports the provider SDKs)
+It prints the median wall time of each phase and which provider SDKs are
+loaded after it. ``--importtime N`` also lists the N slowest imports of the
+main-app phase (from ``python -X importtime``).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SDK_MODULES = ("groq", "google.generativeai", "httpx")
+
+# Module-level imports of app.py (everything the login page needs)
+LOGIN_IMPORTS = """
+import streamlit, streamlit.components.v1, dotenv
+import response_cache, clients, analysis_pipeline, sandbox, user_store, sessions, assets, passwords, streaming
+"""
+
+MAIN_APP = """
+import ai_features
+from clients import get_client_registry
+get_client_registry().groq()
+get_client_registry().configure_gemini()
+"""
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+result = {}
+try:
+    exec(compile(%(login)r, "login", "exec"))
+    result["login"] = time.perf_counter() - started
+    result["login_sdks"] = [m for m in %(sdks)r if m in sys.modules]
+    exec(compile(%(main)r, "main", "exec"))
+    result["main"] = time.perf_counter() - started
+    result["main_sdks"] = [m for m in %(sdks)r if m in sys.modules]
+except ImportError as e:
+    result["error"] = str(e)
+print(json.dumps(result))
+"""
+
+
+def probe():
+    code = PROBE % {"login": LOGIN_IMPORTS, "main": MAIN_APP, "sdks": SDK_MODULES}
+    env = dict(os.environ, GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "benchmark"),
+               GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY", "benchmark"))
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(count):
+    code = LOGIN_IMPORTS + MAIN_APP
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if cumulative_us.strip().isdigit():
+            rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N")
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.runs)]
+    if "error" in results[0]:
+        print(f"Cannot measure: {results[0]['error']} (install requirements.txt first)")
+        return
+
+    login = statistics.median(r["login"] for r in results)
+    main_app = statistics.median(r["main"] for r in results)
+    print(f"{'phase':<12}{'median ms':>12}  provider SDKs loaded")
+    print(f"{'login page':<12}{login * 1000:>12.0f}  {', '.join(results[0]['login_sdks']) or 'none'}")
+    print(f"{'main app':<12}{main_app * 1000:>12.0f}  {', '.join(results[0]['main_sdks']) or 'none'}")
+
+    if args.importtime:
+        print("\nslowest imports (cumulative ms):")
+        for cumulative, name in slowest_imports(args.importtime):
+            print(f"{cumulative / 1000:>10.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+CSS and image bytes sent per interaction, before and after stylesheet caching.
+
+Usage:
+    python benchmarks/measure_ui_payload.py [--reruns 20]
+
+"Before" is the previous behaviour: every rerun re-sent the unminified CSS
+inline and re-read the logos from disk. "After" installs each minified
+bundle once per session (FIXIFOX_STYLE_MODE=session) and keeps the logos
+in memory; the inline mode (FIXIFOX_STYLE_MODE=inline) is listed too.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from assets import build_stylesheet, injection_html, theme_file  # noqa: E402
+
+PAGES = {
+    "login page": {
+        "bundles": {"base": ("components.css", "auth.css", "main.css", "responsive.css")},
+        "images": ["logo.png"],
+    },
+    "main app": {
+        "bundles": {
+            "base": ("components.css", "auth.css", "main.css", "responsive.css"),
+            "app": ("sidebar.css", "footer.css"),
+            "theme": (theme_file("Dark Premium (Default)"),),
+        },
+        "images": ["logo2.png"],
+    },
+}
+
+STYLE_TAG = len('<style></style>')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=20, help="interactions per session")
+    args = parser.parse_args()
+
+    print(f"{'page':<12}{'mode':<22}{'first run':>12}{'later runs':>12}{f'{args.reruns} runs':>12}{'disk reads':>12}")
+    for page, spec in PAGES.items():
+        sheets = {slot: build_stylesheet(*names) for slot, names in spec["bundles"].items()}
+        image_bytes = sum(os.path.getsize(os.path.join(ROOT, name)) for name in spec["images"])
+
+        before = sum(sheet.source_bytes + STYLE_TAG for sheet in sheets.values())
+        inline = sum(len(sheet.css) + STYLE_TAG for sheet in sheets.values())
+        session = sum(len(injection_html(slot, sheet)) for slot, sheet in sheets.items())
+
+        rows = [
+            ("before (inline raw)", before, before, image_bytes * args.reruns),
+            ("inline minified", inline, inline, image_bytes),
+            ("once per session", session, 0, image_bytes),
+        ]
+        for mode, first, later, disk in rows:
+            total = first + later * (args.reruns - 1)
+            print(f"{page:<12}{mode:<22}{first:>12,}{later:>12,}{total:>12,}{disk:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Chunked map-reduce processing for large source files.
+
+Large inputs are split along syntactic boundaries so every chunk is a
+complete unit the model can reason about:
+    - Python: top-level definitions/statements from the ``ast`` (decorators
+      and leading comments stay with their definition; oversized classes are
+      split between methods)
+    - brace languages (C, Java, JS, Go, ...): lines where the brace depth
+      returns to zero
+    - everything else: blank lines at indentation level zero
+
+``map_chunks`` then processes the chunks in parallel on a bounded pool and
+yields results in source order, and ``map_line`` converts chunk-relative line
+numbers back to file line numbers when the per-chunk results are merged.
+"""
+import ast
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import instrumentation
+
+# Inputs with more lines than this are processed chunk by chunk
+LARGE_INPUT_LINES = int(os.environ.get("FIXIFOX_CHUNK_THRESHOLD_LINES", "400"))
+# Target chunk size in lines
+CHUNK_LINES = int(os.environ.get("FIXIFOX_CHUNK_LINES", "200"))
+
+BRACE_LANGUAGES = {
+    "c", "c++", "cpp", "c#", "csharp", "java", "javascript", "js", "typescript", "ts",
+    "go", "rust", "kotlin", "swift", "dart", "php", "scala",
+}
+
+
+@dataclass
+class Chunk:
+    """A contiguous, 1-based inclusive line range of the original source."""
+    start_line: int
+    end_line: int
+    text: str
+
+    @property
+    def label(self):
+        return f"Lines {self.start_line}–{self.end_line}"
+
+    @property
+    def line_count(self):
+        return self.end_line - self.start_line + 1
+
+
+def is_large_input(code):
+    """True when ``code`` should be processed chunk by chunk."""
+    return code.count("\n") + 1 > LARGE_INPUT_LINES
+
+
+def _python_boundaries(code, lines):
+    """Start lines of top-level units, or None if the code does not parse."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+
+    starts = []
+    for node in tree.body:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        # Keep comments that directly precede a definition with it
+        while start > 1 and lines[start - 2].lstrip().startswith("#"):
+            start -= 1
+        starts.append(start)
+        # Oversized classes may also be cut between their methods
+        if isinstance(node, ast.ClassDef) and node.end_lineno - node.lineno + 1 > CHUNK_LINES:
+            for child in node.body[1:]:
+                starts.append(min([child.lineno] + [d.lineno for d in getattr(child, "decorator_list", [])]))
+    return sorted(set(starts))
+
+
+def _brace_boundaries(lines):
+    starts = [1]
+    depth = 0
+    in_block_comment = False
+    for number, line in enumerate(lines, 1):
+        index = 0
+        quote = None
+        while index < len(line):
+            char = line[index]
+            pair = line[index:index + 2]
+            if in_block_comment:
+                if pair == "*/":
+                    in_block_comment = False
+                    index += 1
+            elif quote:
+                if char == "\\":
+                    index += 1
+                elif char == quote:
+                    quote = None
+            elif pair == "//":
+                break
+            elif pair == "/*":
+                in_block_comment = True
+                index += 1
+            elif char in "\"'`":
+                quote = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth = max(depth - 1, 0)
+            index += 1
+        if depth == 0 and number < len(lines):
+            starts.append(number + 1)
+    return starts
+
+
+def _indent_boundaries(lines):
+    starts = [1]
+    for number, line in enumerate(lines[:-1], 1):
+        following = lines[number]
+        if not line.strip() and following.strip() and not following[0].isspace():
+            starts.append(number + 1)
+    return starts
+
+
+def split_source(code, language=None, max_lines=None):
+    """
+    Split ``code`` into chunks of roughly ``max_lines`` lines along syntactic boundaries.
+
+    Args:
+        code (str): Source code.
+        language (str, optional): Language name; Python is tried first when unknown.
+        max_lines (int, optional): Target chunk size. Defaults to CHUNK_LINES.
+
+    Returns:
+        list[Chunk]: Chunks covering every line of ``code`` in order.
+    """
+    max_lines = max_lines or CHUNK_LINES
+    lines = code.split("\n")
+    language = (language or "").lower()
+
+    boundaries = None
+    if not language or language == "python":
+        boundaries = _python_boundaries(code, lines)
+    if boundaries is None:
+        if language in BRACE_LANGUAGES or (not language and code.count("{") >= 2):
+            boundaries = _brace_boundaries(lines)
+        else:
+            boundaries = _indent_boundaries(lines)
+    boundaries = sorted({b for b in boundaries if 1 <= b <= len(lines)} | {1})
+
+    # Group consecutive units until the target size is reached. No chunk may
+    # exceed ``limit`` lines (so a chunk is never "large" itself); a single
+    # unit above the limit is cut at fixed intervals as a last resort.
+    limit = min(2 * max_lines, LARGE_INPUT_LINES)
+    chunks = []
+    current_start = None
+    for start, next_start in zip(boundaries, boundaries[1:] + [len(lines) + 1]):
+        if current_start is not None and next_start - current_start > limit:
+            chunks.append((current_start, start - 1))
+            current_start = None
+        if current_start is None:
+            current_start = start
+        if next_start - current_start > limit:
+            for cut in range(current_start, next_start, max_lines):
+                chunks.append((cut, min(cut + max_lines - 1, next_start - 1)))
+            current_start = None
+        elif next_start - current_start >= max_lines:
+            chunks.append((current_start, next_start - 1))
+            current_start = None
+    if current_start is not None:
+        if chunks and not "".join(lines[current_start - 1:]).strip():
+            # Trailing blank lines join the last chunk instead of becoming an empty one
+            chunks[-1] = (chunks[-1][0], len(lines))
+        else:
+            chunks.append((current_start, len(lines)))
+
+    return [Chunk(start, end, "\n".join(lines[start - 1:end])) for start, end in chunks]
+
+
+def map_line(line, chunk):
+    """
+    Map a line number reported for ``chunk`` to a line number in the file.
+
+    Numbers already inside the chunk's range are kept (the model was given
+    file line numbers); numbers within the chunk's length are treated as
+    chunk-relative and shifted.
+    """
+    try:
+        line = int(line)
+    except (TypeError, ValueError):
+        return None
+    if chunk.start_line <= line <= chunk.end_line:
+        return line
+    if 1 <= line <= chunk.line_count:
+        return line + chunk.start_line - 1
+    return None
+
+
+def numbered(chunk):
+    """Return the chunk text with file line numbers in front of every line."""
+    return "\n".join(
+        f"{number:>5} | {line}"
+        for number, line in enumerate(chunk.text.split("\n"), chunk.start_line)
+    )
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_chunk_executor():
+    """Shared pool for chunk processing (separate from the analysis fan-out pool)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("FIXIFOX_CHUNK_WORKERS", "4")),
+                    thread_name_prefix="fixifox-chunk",
+                )
+    return _executor
+
+
+def map_chunks(chunks, func):
+    """
+    Run ``func(chunk)`` for every chunk in parallel.
+
+    Yields:
+        tuple[Chunk, Any]: ``(chunk, result)`` in source order, each as soon
+        as it and all chunks before it are done. Exceptions are re-raised.
+    """
+    # Chunks run in the caller's context so their provider calls count towards its request
+    futures = [(chunk, instrumentation.submit(get_chunk_executor(), func, chunk)) for chunk in chunks]
+    try:
+        for chunk, future in futures:
+            yield chunk, future.result()
+    finally:
+        for _, future in futures:
+            future.cancel()
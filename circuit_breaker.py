@@ -0,0 +1,191 @@
+"""
+Circuit breakers per (provider, model).
+
+When a model is decommissioned or down, every request used to try it first
+and wait for the error. A breaker counts the failures of one model:
+    - closed: calls go through; it opens after ``FAILURE_THRESHOLD``
+      consecutive failures, or when more than ``ERROR_RATE_THRESHOLD`` of
+      the last ``WINDOW`` calls failed (with at least ``MIN_CALLS`` calls)
+    - open: calls fail instantly with ``CircuitOpenError`` and the router
+      leaves the model out; after ``COOLDOWN`` seconds it turns half-open
+    - half-open: a single probe call is let through; success closes the
+      breaker, failure opens it again for another cooldown
+Only transient errors (timeouts, 5xx, dropped connections) and unknown or
+decommissioned models count as failures (see ``rate_limiter.is_model_failure``).
+Rate limits mean the model is healthy, only busy, and client errors such as
+a bad request or an exceeded context length are caused by the request.
+
+Configuration (environment variables):
+    FIXIFOX_BREAKER_FAILURES     Consecutive failures that open a breaker (default 5)
+    FIXIFOX_BREAKER_ERROR_RATE   Error rate over the window that opens it (default 0.5)
+    FIXIFOX_BREAKER_COOLDOWN     Seconds before an open breaker probes again (default 30)
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import metrics
+
+FAILURE_THRESHOLD = int(os.environ.get("FIXIFOX_BREAKER_FAILURES", "5"))
+ERROR_RATE_THRESHOLD = float(os.environ.get("FIXIFOX_BREAKER_ERROR_RATE", "0.5"))
+COOLDOWN = float(os.environ.get("FIXIFOX_BREAKER_COOLDOWN", "30"))
+WINDOW = 20
+MIN_CALLS = 10
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose breaker is open."""
+
+    def __init__(self, provider, model, retry_in):
+        super().__init__(f"Model {model} ({provider}) is temporarily disabled after repeated failures; "
+                         f"retrying in {retry_in:.0f}s")
+        self.provider = provider
+        self.model = model
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Breaker for one (provider, model) pair.
+
+    Args:
+        provider (str): "groq" or "gemini".
+        model (str): Model id.
+        failure_threshold (int, optional): Consecutive failures that open it.
+        error_rate_threshold (float, optional): Windowed error rate that opens it.
+        cooldown (float, optional): Seconds spent open before a probe.
+    """
+
+    def __init__(self, provider, model, failure_threshold=None, error_rate_threshold=None, cooldown=None):
+        self.provider = provider
+        self.model = model
+        self.failure_threshold = failure_threshold or FAILURE_THRESHOLD
+        self.error_rate_threshold = error_rate_threshold or ERROR_RATE_THRESHOLD
+        self.cooldown = cooldown or COOLDOWN
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=WINDOW)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.last_error = None
+        self._probing = False
+
+    def _set_state(self, state):
+        self.state = state
+        metrics.set_gauge("circuit_breaker_open", int(state != CLOSED), provider=self.provider, model=self.model)
+
+    def available(self):
+        """True unless the breaker is open and its cooldown has not passed (no side effects)."""
+        with self._lock:
+            return self.state != OPEN or time.monotonic() - self.opened_at >= self.cooldown
+
+    def before_call(self):
+        """
+        Admit one call.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a probe in flight.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.cooldown - (time.monotonic() - self.opened_at)
+                if remaining > 0:
+                    metrics.increment("circuit_breaker_rejections", provider=self.provider, model=self.model)
+                    raise CircuitOpenError(self.provider, self.model, remaining)
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(self.provider, self.model, 0)
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            self._probing = False
+            if error is not None:
+                self.last_error = str(error)[:200]
+            failures = self._outcomes.count(False)
+            too_many = (
+                self.consecutive_failures >= self.failure_threshold
+                or (len(self._outcomes) >= MIN_CALLS and failures / len(self._outcomes) > self.error_rate_threshold)
+            )
+            if self.state == HALF_OPEN or (self.state == CLOSED and too_many):
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+                self._set_state(OPEN)
+                metrics.increment("circuit_breaker_trips", provider=self.provider, model=self.model)
+
+    def release(self):
+        """End a call that says nothing about the model's health (e.g. rate-limited)."""
+        with self._lock:
+            self._probing = False
+
+    def reset(self):
+        """Close the breaker and forget its history."""
+        with self._lock:
+            self._outcomes.clear()
+            self.consecutive_failures = 0
+            self._probing = False
+            self._set_state(CLOSED)
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "error_rate": self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0,
+                "times_opened": self.times_opened,
+                "retry_in": retry_in,
+                "last_error": self.last_error,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider, model):
+    """Return the process-wide breaker for ``(provider, model)``."""
+    key = (provider, model)
+    breaker = _breakers.get(key)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(key)
+            if breaker is None:
+                breaker = _breakers[key] = CircuitBreaker(provider, model)
+    return breaker
+
+
+def breaker_states():
+    """Snapshots of every breaker created so far, for the diagnostics page."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
+
+
+def reset_all():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        breaker.reset()
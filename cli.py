@@ -0,0 +1,316 @@
+"""
+Batch mode: run a FixiFox feature over every source file of a repository.
+
+Usage:
+    python cli.py scan PATH [--mode focused] [--sarif report.sarif]
+    python cli.py fix PATH
+    python cli.py explain PATH
+        [--ext .py,.js] [--no-gitignore] [--workers 4] [--max-bytes 200000]
+        [--output results.jsonl] [--checkpoint state.jsonl] [--fail-on-issues]
+
+Files are found by walking PATH. Hidden directories are skipped, files are
+filtered by extension, and paths ignored by the ``.gitignore`` files of the
+tree are left out. Every file is handled by a bounded worker pool calling
+the same entry point the UI uses (``run_security_scan``,
+``get_fixed_code_with_groq`` or ``explain_code_with_gemini``), so all
+workers share the process-wide rate limiter, cache, router and circuit
+breakers. Raising ``--workers`` above the provider budget only makes
+requests queue.
+
+Each result is appended to ``--output`` as one JSON line as soon as its
+file is done. It is also appended to the ``--checkpoint`` file together
+with the file's SHA-256. A later run with the same checkpoint skips files
+whose content and options are unchanged. This both resumes an interrupted
+run and makes re-runs over a mostly unchanged repository cheap. Failed files
+are not checkpointed and are retried. For ``scan``, ``--sarif`` writes a SARIF
+2.1.0 report of every checkpointed file, including ones skipped this run.
+
+Exit status: 1 if any file failed, 2 with ``--fail-on-issues`` if the
+scan reported issues, else 0.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+LANGUAGES = {
+    ".py": "Python", ".js": "JavaScript", ".jsx": "JavaScript", ".ts": "TypeScript", ".tsx": "TypeScript",
+    ".java": "Java", ".c": "C", ".h": "C", ".cpp": "C++", ".cc": "C++", ".hpp": "C++", ".cs": "C#",
+    ".go": "Go", ".rs": "Rust", ".rb": "Ruby", ".php": "PHP", ".kt": "Kotlin", ".swift": "Swift",
+    ".scala": "Scala", ".dart": "Dart", ".sh": "Shell", ".sql": "SQL",
+}
+
+SARIF_LEVELS = {"critical": "error", "high": "error", "medium": "warning", "low": "note"}
+
+
+class GitIgnore:
+    """
+    Patterns of one ``.gitignore`` file, matched against paths relative to its directory.
+
+    Supports comments, ``!`` negation, trailing ``/`` (directories only),
+    patterns anchored by a ``/``, and ``*``, ``?``, ``[...]`` and ``**``.
+    """
+
+    def __init__(self, lines):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            line = line.rstrip(" ")
+            negate = line.startswith("!")
+            if negate or line.startswith("\\"):
+                line = line[1:]
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            pattern = self._translate(line.lstrip("/"))
+            if not anchored:
+                pattern = f"(?:.*/)?{pattern}"
+            self.rules.append((re.compile(f"^{pattern}$"), negate, directory_only))
+
+    @staticmethod
+    def _translate(glob):
+        parts = []
+        index = 0
+        while index < len(glob):
+            if glob.startswith("**/", index):
+                parts.append("(?:.*/)?")
+                index += 3
+            elif glob.startswith("**", index):
+                parts.append(".*")
+                index += 2
+            elif glob[index] == "*":
+                parts.append("[^/]*")
+                index += 1
+            elif glob[index] == "?":
+                parts.append("[^/]")
+                index += 1
+            elif glob[index] == "[" and "]" in glob[index + 1:]:
+                end = glob.index("]", index + 1)
+                parts.append("[" + glob[index + 1:end].replace("!", "^", 1) + "]")
+                index = end + 1
+            else:
+                parts.append(re.escape(glob[index]))
+                index += 1
+        return "".join(parts)
+
+    def match(self, path, is_dir):
+        """True/False if a rule decides ``path``, None if no rule applies."""
+        decision = None
+        for pattern, negate, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if pattern.match(path):
+                decision = not negate
+        return decision
+
+
+def find_files(root, extensions, use_gitignore=True):
+    """
+    Source files under ``root``, as sorted paths relative to it (with ``/``).
+    """
+    found = []
+    ignores = []  # (directory relative to root, GitIgnore), outermost first
+
+    def ignored(path, is_dir):
+        decision = False
+        for base, gitignore in ignores:
+            if base and not path.startswith(base + "/"):
+                continue
+            match = gitignore.match(path[len(base) + 1:] if base else path, is_dir)
+            if match is not None:
+                decision = match
+        return decision
+
+    for directory, dirnames, filenames in os.walk(root):
+        relative = os.path.relpath(directory, root).replace(os.sep, "/")
+        relative = "" if relative == "." else relative
+        if use_gitignore and ".gitignore" in filenames:
+            with open(os.path.join(directory, ".gitignore"), encoding="utf-8", errors="replace") as handle:
+                ignores.append((relative, GitIgnore(handle)))
+
+        def join(name):
+            return f"{relative}/{name}" if relative else name
+
+        dirnames[:] = sorted(
+            name for name in dirnames
+            if not name.startswith(".") and not ignored(join(name), True)
+        )
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in extensions and not ignored(join(name), False):
+                found.append(join(name))
+    return sorted(found)
+
+
+def load_checkpoint(path):
+    """``{file: record}`` of the checkpoint file (later lines win), or {} if there is none."""
+    done = {}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A line cut off by an interrupted run
+                done[record["path"]] = record
+    return done
+
+
+def process_file(command, root, path, options):
+    """Run ``command`` on one file. Returns the result record."""
+    import ai_features
+
+    started = time.perf_counter()
+    record = {"path": path, "command": command, "options": options}
+    try:
+        with open(os.path.join(root, path), "rb") as handle:
+            data = handle.read()
+        record["sha256"] = hashlib.sha256(data).hexdigest()
+        code = data.decode("utf-8")
+        if command == "scan":
+            result = ai_features.run_security_scan(code, mode=options["mode"])
+        elif command == "fix":
+            result = ai_features.get_fixed_code_with_groq(code)
+        else:
+            language = LANGUAGES.get(os.path.splitext(path)[1].lower())
+            result = ai_features.explain_code_with_gemini(code, programming_language=language)
+        record["ok"] = ai_features.is_cacheable_response(result)
+        record["result"] = result
+        if command == "scan":
+            record["issues"] = ai_features.parse_security_report(result)
+    except Exception as e:
+        record["ok"] = False
+        record["result"] = f"Error: {e}"
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def write_sarif(path, records):
+    """Write the issues of the scan ``records`` as a SARIF 2.1.0 log."""
+    rules, results = {}, []
+    for record in records:
+        for issue in record.get("issues") or []:
+            rule_id = re.sub(r"[^a-z0-9]+", "-", (issue.get("type") or "issue").lower()).strip("-") or "issue"
+            rules.setdefault(rule_id, {"id": rule_id, "name": issue.get("type"),
+                                       "shortDescription": {"text": issue.get("type") or rule_id}})
+            location = {"artifactLocation": {"uri": record["path"]}}
+            if issue.get("line"):
+                location["region"] = {"startLine": issue["line"]}
+            results.append({
+                "ruleId": rule_id,
+                "level": SARIF_LEVELS.get((issue.get("severity") or "").strip().lower(), "warning"),
+                "message": {"text": " ".join(filter(None, (issue.get("description"), issue.get("explanation"))))},
+                "locations": [{"physicalLocation": location}],
+            })
+    log = {
+        "version": "2.1.0",
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "runs": [{
+            "tool": {"driver": {"name": "FixiFox", "rules": list(rules.values())}},
+            "results": results,
+        }],
+    }
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(log, handle, indent=2)
+    os.replace(temporary, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("scan", "fix", "explain"))
+    parser.add_argument("path", help="repository or directory to process")
+    parser.add_argument("--ext", default=",".join(sorted(LANGUAGES)), help="comma-separated file extensions")
+    parser.add_argument("--no-gitignore", action="store_true", help="also process files ignored by .gitignore")
+    parser.add_argument("--mode", choices=("fast", "focused", "full"), default="focused", help="security scan mode")
+    parser.add_argument("--workers", type=int, default=4, help="files processed at once")
+    parser.add_argument("--max-bytes", type=int, default=200000, help="skip larger files")
+    parser.add_argument("--output", help="JSONL results, appended (default fixifox-<command>.jsonl, - for stdout)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default fixifox-<command>.checkpoint.jsonl)")
+    parser.add_argument("--sarif", help="write a SARIF report (scan only)")
+    parser.add_argument("--fail-on-issues", action="store_true", help="exit with 2 if the scan found issues")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    root = os.path.abspath(args.path)
+    extensions = {ext if ext.startswith(".") else f".{ext}" for ext in args.ext.lower().split(",") if ext}
+    options = {"mode": args.mode} if args.command == "scan" else {}
+    output_path = args.output or f"fixifox-{args.command}.jsonl"
+    checkpoint_path = args.checkpoint or f"fixifox-{args.command}.checkpoint.jsonl"
+
+    done = load_checkpoint(checkpoint_path)
+    files = find_files(root, extensions, use_gitignore=not args.no_gitignore)
+    pending, skipped = [], 0
+    for path in files:
+        full_path = os.path.join(root, path)
+        if os.path.getsize(full_path) > args.max_bytes:
+            print(f"skip {path}: larger than {args.max_bytes} bytes", file=sys.stderr)
+            continue
+        previous = done.get(path)
+        if previous and previous.get("options") == options:
+            with open(full_path, "rb") as handle:
+                if hashlib.sha256(handle.read()).hexdigest() == previous.get("sha256"):
+                    skipped += 1
+                    continue
+        pending.append(path)
+    print(f"{len(pending)} file(s) to process, {skipped} unchanged", file=sys.stderr)
+
+    output = sys.stdout if output_path == "-" else open(output_path, "a", encoding="utf-8")
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+    failures = 0
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="fixifox-cli") as pool:
+            queued = iter(pending)
+            running = set()
+            finished = 0
+            while True:
+                # Keep at most ``workers`` files in flight, so huge trees are not queued up front
+                for path in queued:
+                    running.add(pool.submit(process_file, args.command, root, path, options))
+                    if len(running) >= args.workers:
+                        break
+                if not running:
+                    break
+                completed, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    record = future.result()
+                    finished += 1
+                    line = json.dumps(record)
+                    output.write(line + "\n")
+                    output.flush()
+                    if record["ok"]:
+                        checkpoint.write(line + "\n")
+                        checkpoint.flush()
+                        done[record["path"]] = record
+                    else:
+                        failures += 1
+                    status = "ok" if record["ok"] else "FAILED"
+                    print(f"[{finished}/{len(pending)}] {record['path']} {status} {record['seconds']}s", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("interrupted; re-run with the same checkpoint to resume", file=sys.stderr)
+        failures += 1
+    finally:
+        checkpoint.close()
+        if output is not sys.stdout:
+            output.close()
+
+    # Files deleted since an earlier run drop out of the report
+    records = [done[path] for path in files if path in done and done[path].get("command") == "scan"]
+    if args.sarif and args.command == "scan":
+        write_sarif(args.sarif, records)
+    if failures:
+        return 1
+    if args.fail_on_issues and any(record.get("issues") for record in records):
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
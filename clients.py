@@ -0,0 +1,252 @@
+"""
+Process-wide registry of Groq and Gemini clients.
+
+Creating a ``Groq()`` client per call pays for a new HTTP connection pool and
+TLS handshake every time. The registry builds each client once, lazily and
+thread-safely, on top of a shared keep-alive ``httpx`` pool, and hands the same
+instance to every FixiFox feature. The SDKs themselves are imported on
+first use, so pages that never call a model do not pay for loading them.
+``groq_chat_completion`` and ``gemini_generate_content`` route calls
+through the model's circuit breaker and the rate limiter, and report each
+attempt's latency and outcome to the model router and the current request's
+instrumentation record (including token usage). The token budget reserved
+for a call is settled against the reported usage when the call (or, for
+streams, the last chunk) completes.
+
+Configuration (environment variables):
+    FIXIFOX_HTTP_POOL_SIZE   Max pooled connections per provider (default 20)
+    FIXIFOX_GROQ_TIMEOUT     Groq request timeout in seconds (default 60)
+    FIXIFOX_GEMINI_TIMEOUT   Gemini request timeout in seconds (default 60)
+"""
+import os
+import threading
+import time
+
+import instrumentation
+import model_router
+from circuit_breaker import get_breaker
+from rate_limiter import RateLimitExceeded, call_with_retry, estimate_tokens, is_model_failure, settle
+
+
+class ClientRegistry:
+    """
+    Lazily-initialized, thread-safe holder for provider clients.
+
+    Args:
+        pool_size (int, optional): Maximum number of pooled HTTP connections.
+        groq_timeout (float, optional): Timeout for Groq requests in seconds.
+        gemini_timeout (float, optional): Timeout for Gemini requests in seconds.
+    """
+
+    def __init__(self, pool_size=None, groq_timeout=None, gemini_timeout=None):
+        self.pool_size = pool_size or int(os.environ.get("FIXIFOX_HTTP_POOL_SIZE", "20"))
+        self.timeouts = {
+            "groq": groq_timeout or float(os.environ.get("FIXIFOX_GROQ_TIMEOUT", "60")),
+            "gemini": gemini_timeout or float(os.environ.get("FIXIFOX_GEMINI_TIMEOUT", "60")),
+        }
+        self._lock = threading.Lock()
+        self._http_client = None
+        self._groq_client = None
+        self._gemini_configured = False
+        self._gemini_models = {}
+
+    def groq(self):
+        """Return the shared Groq client, creating it on first use."""
+        if self._groq_client is None:
+            with self._lock:
+                if self._groq_client is None:
+                    import httpx
+                    from groq import Groq
+
+                    self._http_client = httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=self.pool_size,
+                            max_keepalive_connections=self.pool_size,
+                            keepalive_expiry=60.0,
+                        ),
+                        timeout=self.timeouts["groq"],
+                    )
+                    self._groq_client = Groq(
+                        api_key=os.environ.get("GROQ_API_KEY"),
+                        timeout=self.timeouts["groq"],
+                        # Retries are scheduled by rate_limiter.call_with_retry
+                        max_retries=0,
+                        http_client=self._http_client,
+                    )
+        return self._groq_client
+
+    def configure_gemini(self):
+        """Call ``genai.configure`` once per process."""
+        if not self._gemini_configured:
+            with self._lock:
+                if not self._gemini_configured:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=os.environ.get("GOOGLE_API_KEY"))
+                    self._gemini_configured = True
+
+    def gemini_model(self, model_name):
+        """Return a cached ``GenerativeModel`` for ``model_name``."""
+        self.configure_gemini()
+        model = self._gemini_models.get(model_name)
+        if model is None:
+            with self._lock:
+                model = self._gemini_models.get(model_name)
+                if model is None:
+                    import google.generativeai as genai
+
+                    model = genai.GenerativeModel(model_name)
+                    self._gemini_models[model_name] = model
+        return model
+
+    def gemini_request_options(self):
+        """Per-request options (timeout) for Gemini ``generate_content`` calls."""
+        return {"timeout": self.timeouts["gemini"]}
+
+    def close(self):
+        """Release pooled connections. Clients are rebuilt on next use."""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._groq_client = None
+            self._gemini_models.clear()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry():
+    """Return the process-wide client registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
+
+
+def get_groq_client():
+    """Shortcut for ``get_client_registry().groq()``."""
+    return get_client_registry().groq()
+
+
+def get_gemini_model(model_name):
+    """Shortcut for ``get_client_registry().gemini_model(model_name)``."""
+    return get_client_registry().gemini_model(model_name)
+
+
+def _recorded(model, func, stream=False):
+    """
+    Run one provider attempt and report it to the model router. Streaming
+    calls return before the answer is complete, so only their outcome counts.
+    """
+    started = time.perf_counter()
+    try:
+        result = func()
+    except Exception:
+        model_router.record(model, ok=False)
+        instrumentation.note_attempt(model, ok=False)
+        raise
+    model_router.record(model, None if stream else time.perf_counter() - started)
+    instrumentation.note_attempt(model, ok=True)
+    usage = None if stream else instrumentation.usage_of(result)
+    if usage is not None:
+        instrumentation.note_usage(model, *usage)
+    return result
+
+
+def _guarded(provider, model, call):
+    """
+    Run ``call`` behind the model's circuit breaker. Only errors that say the
+    model is unhealthy count as its failures; an oversized or malformed
+    request from one user must not open the breaker for everyone.
+
+    Raises:
+        CircuitOpenError: Without calling the provider while the breaker is open.
+    """
+    breaker = get_breaker(provider, model)
+    breaker.before_call()
+    instrumentation.note_call(model)
+    try:
+        result = call()
+    except Exception as e:
+        if not isinstance(e, RateLimitExceeded) and is_model_failure(e):
+            breaker.record_failure(e)
+        else:
+            breaker.release()
+        raise
+    breaker.record_success()
+    return result
+
+
+class SettledStream:
+    """
+    A streamed provider response that settles its rate-limit reservation with
+    the usage reported in its chunks once it has been read to the end.
+
+    ``close`` releases the underlying HTTP response and may be called from
+    another thread while a reader is blocked on the next chunk.
+    """
+
+    def __init__(self, stream, provider, model, tokens):
+        self._stream = stream
+        self._settle = lambda usage: settle(provider, model, tokens, usage)
+
+    def __iter__(self):
+        usage = None
+        for chunk in self._stream:
+            # Groq reports usage on the last chunk; Gemini's is cumulative
+            usage = instrumentation.usage_of(chunk) or usage
+            yield chunk
+        self._settle(usage)
+
+    def close(self):
+        close = getattr(self._stream, "close", None) or getattr(getattr(self._stream, "response", None), "close", None)
+        if close is not None:
+            close()
+
+
+def _completed(provider, model, tokens, result, stream):
+    if stream:
+        return SettledStream(result, provider, model, tokens)
+    settle(provider, model, tokens, instrumentation.usage_of(result))
+    return result
+
+
+def groq_chat_completion(model, messages, **params):
+    """
+    ``chat.completions.create`` on the shared Groq client, scheduled by the
+    rate limiter (queued when over budget, retried on rate-limit/transient errors).
+    """
+    tokens = estimate_tokens(messages=messages, max_tokens=params.get("max_tokens") or params.get("max_completion_tokens"))
+    stream = params.get("stream", False)
+    return _completed("groq", model, tokens, _guarded("groq", model, lambda: call_with_retry(
+        "groq", model,
+        lambda: _recorded(
+            model,
+            lambda: get_groq_client().chat.completions.create(model=model, messages=messages, **params),
+            stream=stream,
+        ),
+        tokens=tokens,
+    )), stream)
+
+
+def gemini_generate_content(model_name, prompt, generation_config=None, **kwargs):
+    """
+    ``generate_content`` on the cached Gemini model, scheduled by the rate limiter.
+    The registry's request timeout is applied unless ``request_options`` is given.
+    """
+    kwargs.setdefault("request_options", get_client_registry().gemini_request_options())
+    tokens = estimate_tokens(prompt=prompt, max_tokens=(generation_config or {}).get("max_output_tokens"))
+    stream = kwargs.get("stream", False)
+    return _completed("gemini", model_name, tokens, _guarded("gemini", model_name, lambda: call_with_retry(
+        "gemini", model_name,
+        lambda: _recorded(
+            model_name,
+            lambda: get_gemini_model(model_name).generate_content(prompt, generation_config=generation_config, **kwargs),
+            stream=stream,
+        ),
+        tokens=tokens,
+    )), stream)
@@ -0,0 +1,178 @@
+"""
+In-memory time series behind the admin Diagnostics page.
+
+Everything is kept in fixed-size ring buffers (``deque(maxlen=...)``), so
+memory use is bounded and recording a point is O(1) under production load:
+    - one buffer per feature with ``(timestamp, latency, ok, cache_hit)`` of
+      its most recent requests, fed by instrumentation.py when a request ends;
+      percentiles are computed over a time window when the page asks
+    - one buffer per gauge (rate-limit queue depth, SQLite pool connections
+      in use, process memory), filled by a sampler thread every
+      FIXIFOX_DIAGNOSTICS_SAMPLE_SECONDS seconds while the app runs
+The buffers bound how far back the page can look: the defaults cover one
+hour of gauges (720 samples x 5 s) and the last 1000 requests per feature.
+
+Configuration (environment variables):
+    FIXIFOX_DIAGNOSTICS_REQUESTS         Requests kept per feature (default 1000)
+    FIXIFOX_DIAGNOSTICS_POINTS           Samples kept per gauge (default 720)
+    FIXIFOX_DIAGNOSTICS_SAMPLE_SECONDS   Seconds between gauge samples (default 5)
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import metrics
+
+REQUESTS_PER_FEATURE = int(os.environ.get("FIXIFOX_DIAGNOSTICS_REQUESTS", "1000"))
+POINTS_PER_GAUGE = int(os.environ.get("FIXIFOX_DIAGNOSTICS_POINTS", "720"))
+SAMPLE_SECONDS = float(os.environ.get("FIXIFOX_DIAGNOSTICS_SAMPLE_SECONDS", "5"))
+
+logger = logging.getLogger("fixifox.diagnostics")
+
+FEATURE_LABELS = {
+    "explain": "Explain",
+    "fix": "Fix",
+    "flow_diagram": "Diagram",
+    "security_scan": "Security Scan",
+    "convert": "Conversion",
+    "generate": "Generation",
+    "assistant": "Assistant",
+    "debug_run": "Debug: Run",
+    "debug_debug": "Debug: Debug",
+    "debug_analyze": "Debug: Analyze",
+    "debug_optimize": "Debug: Optimize",
+    "debug_explain": "Debug: Explain",
+}
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def process_memory_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+class TimeSeriesStore:
+    """
+    Ring buffers of request outcomes per feature and of sampled gauges.
+
+    Args:
+        requests_per_feature (int): Requests kept per feature.
+        points_per_gauge (int): Samples kept per gauge.
+    """
+
+    def __init__(self, requests_per_feature=REQUESTS_PER_FEATURE, points_per_gauge=POINTS_PER_GAUGE):
+        self.requests_per_feature = requests_per_feature
+        self.points_per_gauge = points_per_gauge
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._gauges = {}
+        self._sampler = None
+
+    @property
+    def gauge_retention_seconds(self):
+        """How far back the gauge buffers reach when sampled every SAMPLE_SECONDS."""
+        return self.points_per_gauge * SAMPLE_SECONDS
+
+    def record_request(self, feature, latency, ok=True, cache_hit=False):
+        with self._lock:
+            buffer = self._requests.get(feature)
+            if buffer is None:
+                buffer = self._requests[feature] = deque(maxlen=self.requests_per_feature)
+            buffer.append((time.time(), latency, ok, cache_hit))
+
+    def record_gauge(self, name, value, timestamp=None):
+        with self._lock:
+            buffer = self._gauges.get(name)
+            if buffer is None:
+                buffer = self._gauges[name] = deque(maxlen=self.points_per_gauge)
+            buffer.append((timestamp or time.time(), value))
+
+    def feature_summary(self, window_seconds=900):
+        """
+        Latency percentiles, error rate and cache hit ratio per feature over
+        the last ``window_seconds``.
+
+        Returns:
+            list[dict]: One row per feature with requests in the window.
+        """
+        since = time.time() - window_seconds
+        with self._lock:
+            buffers = {feature: list(buffer) for feature, buffer in self._requests.items()}
+        rows = []
+        for feature, points in sorted(buffers.items()):
+            points = [point for point in points if point[0] >= since]
+            if not points:
+                continue
+            latencies = sorted(point[1] for point in points)
+            rows.append({
+                "feature": FEATURE_LABELS.get(feature, feature),
+                "requests": len(points),
+                "p50_s": round(_percentile(latencies, 0.50), 3),
+                "p95_s": round(_percentile(latencies, 0.95), 3),
+                "p99_s": round(_percentile(latencies, 0.99), 3),
+                "error_rate": round(sum(not point[2] for point in points) / len(points), 3),
+                "cache_hit_ratio": round(sum(point[3] for point in points) / len(points), 3),
+            })
+        return rows
+
+    def gauge_series(self, window_seconds=3600):
+        """``{gauge: [(timestamp, value), ...]}`` for the last ``window_seconds``."""
+        since = time.time() - window_seconds
+        with self._lock:
+            return {name: [point for point in buffer if point[0] >= since] for name, buffer in self._gauges.items()}
+
+    def sample(self):
+        """Take one sample of every gauge."""
+        from user_store import get_user_store
+
+        now = time.time()
+        snapshot = metrics.get_metrics().snapshot()
+        queued = sum(g["value"] for g in snapshot["gauges"] if g["name"] == "rate_limit_queue_depth")
+        self.record_gauge("rate_limit_queue_depth", queued, now)
+        pool = get_user_store().pool
+        self.record_gauge("db_pool_in_use", pool.in_use, now)
+        self.record_gauge("process_memory_mb", round(process_memory_mb(), 1), now)
+
+    def start_sampler(self, interval=SAMPLE_SECONDS):
+        """Start the background sampler once per process."""
+        with self._lock:
+            if self._sampler is not None:
+                return
+            self._sampler = threading.Thread(target=self._run, args=(interval,), name="fixifox-diagnostics", daemon=True)
+        self._sampler.start()
+
+    def _run(self, interval):
+        while True:
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("Diagnostics sampling failed")
+            time.sleep(interval)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_timeseries():
+    """Return the process-wide time series store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TimeSeriesStore()
+    return _store
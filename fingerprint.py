@@ -0,0 +1,144 @@
+"""
+Code fingerprints for near-duplicate cache lookups.
+
+Exact cache keys miss the same snippet pasted with other whitespace,
+comments or variable names. ``fingerprint`` turns code into a digest of its
+canonical token stream:
+    - Python that parses: the AST is walked (comments and formatting are
+      gone, docstrings are dropped) and every identifier defined in the code
+      is renamed to ``v0``, ``v1``, ... in order of first appearance, so
+      ``def add(a, b)`` and ``def plus(x, y)`` produce the same tokens.
+      Builtins, imported modules and attribute names are kept.
+    - Anything else: comments are stripped with a few language-agnostic
+      patterns, the text is tokenized, and names introduced by a
+      declaration keyword (``let x``, ``int count``, ``function f``) are
+      renamed the same way. Every other identifier is kept, so calling
+      ``Math.ceil`` instead of ``Math.floor`` is a different snippet.
+Two snippets share a fingerprint only if their canonical token streams are
+identical. Operators, literals and calls are part of the stream, so a
+one-token fix (``<=`` -> ``<``, ``/`` -> ``//``) changes the fingerprint.
+"""
+import ast
+import builtins
+import hashlib
+import re
+
+_BUILTINS = frozenset(dir(builtins))
+
+_COMMENT_PATTERNS = (
+    re.compile(r"/\*.*?\*/", re.S),       # C-style block comments
+    re.compile(r"//[^\n]*"),              # C++/Java/JS/Go line comments
+    re.compile(r"(?m)^\s*#(?!include|define|if|endif|pragma)[^\n]*"),  # shell/Ruby/Python comments
+    re.compile(r"(?m)--[^\n]*$"),         # SQL/Lua/Haskell comments
+)
+_TOKEN = re.compile(r"""[A-Za-z_]\w*|\d+(?:\.\d+)?|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|\S""")
+_KEYWORDS = frozenset("""
+    if else elif for while do switch case default break continue return function def class struct
+    interface enum public private protected static final const let var val new delete import from
+    package using namespace try catch except finally throw throws raise async await yield fn func
+    go defer select type impl trait mut pub use mod match int long short float double char bool
+    boolean void string String auto true false null nil None True False this self super extends
+    implements in is not and or lambda print println printf echo begin end then local
+""".split())
+# Keywords after which the next identifier is a name the snippet declares
+_DECLARATIONS = frozenset("""
+    def class struct interface enum function fn func let var val const type trait impl mod
+    int long short float double char bool boolean void string String auto
+""".split())
+
+
+class _PythonNormalizer(ast.NodeVisitor):
+    """Emit a token per AST node, with locally defined identifiers canonicalized."""
+
+    def __init__(self, defined):
+        self.defined = defined
+        self.names = {}
+        self.tokens = []
+
+    def _name(self, name):
+        if name not in self.defined:
+            return name
+        if name not in self.names:
+            self.names[name] = f"v{len(self.names)}"
+        return self.names[name]
+
+    def generic_visit(self, node):
+        self.tokens.append(type(node).__name__)
+        for field in ("name", "id", "arg", "attr"):
+            value = getattr(node, field, None)
+            if isinstance(value, str):
+                self.tokens.append(value if field == "attr" else self._name(value))
+        if isinstance(node, ast.Constant):
+            self.tokens.append(repr(node.value))
+        body = getattr(node, "body", None)
+        if isinstance(body, list) and body and isinstance(body[0], ast.Expr) \
+                and isinstance(getattr(body[0], "value", None), ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            node.body = body[1:]  # docstring
+        super().generic_visit(node)
+
+
+def _defined_names(tree):
+    """Identifiers the snippet itself binds (assignments, defs, arguments, loop targets)."""
+    defined = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defined.add(node.name)
+        elif isinstance(node, ast.arg):
+            defined.add(node.arg)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            defined.add(node.id)
+    return defined - _BUILTINS
+
+
+def python_tokens(code):
+    """
+    Normalized token stream of Python source.
+
+    Raises:
+        SyntaxError: If ``code`` is not valid Python.
+    """
+    tree = ast.parse(code)
+    normalizer = _PythonNormalizer(_defined_names(tree))
+    normalizer.visit(tree)
+    if normalizer.tokens == ["Module"]:
+        return []  # nothing but comments and docstrings
+    return normalizer.tokens
+
+
+def generic_tokens(code):
+    """Normalized token stream of source in any language."""
+    for pattern in _COMMENT_PATTERNS:
+        code = pattern.sub(" ", code)
+    raw = _TOKEN.findall(code)
+    defined = {
+        token for previous, token in zip(raw, raw[1:])
+        if previous in _DECLARATIONS and (token[0].isalpha() or token[0] == "_") and token not in _KEYWORDS
+    }
+    names = {}
+    tokens = []
+    for token in raw:
+        if token in defined:
+            token = names.setdefault(token, f"v{len(names)}")
+        tokens.append(token)
+    return tokens
+
+
+def normalized_tokens(code):
+    try:
+        return python_tokens(code)
+    except (SyntaxError, ValueError, RecursionError):
+        return generic_tokens(code)
+
+
+def fingerprint(code):
+    """
+    Digest of the canonical token stream of ``code``.
+
+    Returns:
+        str: Hex SHA-256 digest, or None for empty input.
+    """
+    tokens = normalized_tokens(code or "")
+    if not tokens:
+        return None
+    return hashlib.sha256("\x1f".join(tokens).encode("utf-8")).hexdigest()
@@ -0,0 +1,288 @@
+"""
+Local, deterministic Mermaid flowchart generator for Python code.
+
+Walks the ``ast`` of a snippet and emits Mermaid ``flowchart`` syntax in
+milliseconds, without calling an LLM. Every function (and method) gets its
+own subgraph so that files with thousands of lines stay readable; module
+level statements form the main flow. Runs of simple statements are merged
+into a single node to keep large diagrams compact.
+
+Supported constructs: functions/methods, classes, if/elif/else, for/while
+(with else, break and continue), try/except/else/finally, with, match,
+return, raise and calls (calls to functions defined in the same file are
+linked to that function's subgraph with a dotted edge).
+"""
+import ast
+
+MAX_LABEL_LENGTH = 60
+MAX_MERGED_STATEMENTS = 3
+
+_SIMPLE_TYPES = (
+    ast.Assign, ast.AugAssign, ast.AnnAssign, ast.Expr, ast.Import, ast.ImportFrom,
+    ast.Pass, ast.Delete, ast.Global, ast.Nonlocal, ast.Assert,
+)
+
+
+def _escape(text):
+    text = " ".join(text.split())
+    if len(text) > MAX_LABEL_LENGTH:
+        text = text[:MAX_LABEL_LENGTH - 3] + "..."
+    return (text.replace("&", "#amp;").replace('"', "#quot;")
+                .replace("<", "#lt;").replace(">", "#gt;"))
+
+
+def _source(node):
+    try:
+        return ast.unparse(node)
+    except Exception:
+        return type(node).__name__
+
+
+def _called_name(stmt):
+    """Name of the function called by an expression/assignment statement, if any."""
+    value = getattr(stmt, "value", None)
+    if isinstance(value, ast.Await):
+        value = value.value
+    if isinstance(value, ast.Call):
+        func = value.func
+        if isinstance(func, ast.Name):
+            return func.id
+        if isinstance(func, ast.Attribute):
+            return func.attr
+    return None
+
+
+class _FlowBuilder:
+    """Accumulates Mermaid nodes and edges while walking the AST."""
+
+    def __init__(self):
+        self.lines = ["flowchart TD"]
+        self.call_edges = []
+        self.function_entries = {}
+        self._counter = 0
+        self._indent = 1
+        self._loops = []  # stack of (head_id, break_exits)
+
+    # -- output helpers -------------------------------------------------
+    def _emit(self, line):
+        self.lines.append("    " * self._indent + line)
+
+    def _node(self, label, shape="process"):
+        self._counter += 1
+        node_id = f"n{self._counter}"
+        label = _escape(label)
+        if shape == "decision":
+            self._emit(f'{node_id}{{"{label}"}}')
+        elif shape == "terminal":
+            self._emit(f'{node_id}(["{label}"])')
+        else:
+            self._emit(f'{node_id}["{label}"]')
+        return node_id
+
+    def _connect(self, exits, target):
+        for source, label in exits:
+            if label:
+                self._emit(f'{source} -->|"{_escape(label)}"| {target}')
+            else:
+                self._emit(f"{source} --> {target}")
+
+    # -- structure ------------------------------------------------------
+    def module(self, tree):
+        defs = [n for n in tree.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+        # Register function entry ids first so calls can link to them
+        for node in defs:
+            self._register(node, prefix="")
+
+        body = [n for n in tree.body if n not in defs]
+        if body:
+            start = self._node("Start", "terminal")
+            exits = self._block(body, [(start, None)])
+            end = self._node("End", "terminal")
+            self._connect(exits, end)
+
+        for node in defs:
+            self._definition(node, prefix="")
+
+        for source, name in self.call_edges:
+            target = self.function_entries.get(name)
+            if target:
+                self._emit(f"{source} -.-> {target}")
+        return "\n".join(self.lines)
+
+    def _register(self, node, prefix):
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    self._register(child, prefix=f"{prefix}{node.name}.")
+        else:
+            self._counter += 1
+            entry = f"f{self._counter}"
+            self.function_entries.setdefault(node.name, entry)
+            self.function_entries[f"{prefix}{node.name}"] = entry
+            node._flow_entry = entry
+
+    def _definition(self, node, prefix):
+        self._counter += 1
+        subgraph_id = f"s{self._counter}"
+        if isinstance(node, ast.ClassDef):
+            self._emit(f'subgraph {subgraph_id}["class {_escape(node.name)}"]')
+            self._indent += 1
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    self._definition(child, prefix=f"{prefix}{node.name}.")
+            self._indent -= 1
+            self._emit("end")
+            return
+
+        keyword = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        title = f"{keyword} {prefix}{node.name}({_source(node.args)})"
+        self._emit(f'subgraph {subgraph_id}["{_escape(title)}"]')
+        self._indent += 1
+        self._emit("direction TB")
+        entry = node._flow_entry
+        self._emit(f'{entry}(["{_escape(node.name + "()")}"])')
+        body = [n for n in node.body if not isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+        # Skip the docstring
+        if body and isinstance(body[0], ast.Expr) and isinstance(getattr(body[0], "value", None), ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            body = body[1:]
+        exits = self._block(body, [(entry, None)])
+        if exits:
+            end = self._node("return None" if body else "pass", "terminal")
+            self._connect(exits, end)
+        self._indent -= 1
+        self._emit("end")
+
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self._register(child, prefix=f"{prefix}{node.name}.")
+                self._definition(child, prefix=f"{prefix}{node.name}.")
+
+    def _block(self, statements, entries):
+        """Wire ``statements`` after ``entries`` and return the dangling exits."""
+        pending = []
+        for stmt in statements:
+            if isinstance(stmt, _SIMPLE_TYPES) and not _called_name(stmt):
+                pending.append(stmt)
+                continue
+            if pending:
+                entries = self._simple(pending, entries)
+                pending = []
+            if not entries:
+                # Unreachable code after return/raise/break/continue
+                return entries
+            entries = self._statement(stmt, entries)
+        if pending and entries:
+            entries = self._simple(pending, entries)
+        return entries
+
+    def _simple(self, statements, entries):
+        labels = [_source(s) for s in statements[:MAX_MERGED_STATEMENTS]]
+        if len(statements) > MAX_MERGED_STATEMENTS:
+            labels.append(f"... {len(statements) - MAX_MERGED_STATEMENTS} more")
+        node = self._node("; ".join(labels))
+        self._connect(entries, node)
+        return [(node, None)]
+
+    def _statement(self, stmt, entries):
+        if isinstance(stmt, ast.If):
+            return self._if(stmt, entries)
+        if isinstance(stmt, (ast.For, ast.AsyncFor, ast.While)):
+            return self._loop(stmt, entries)
+        if isinstance(stmt, (ast.Try, getattr(ast, "TryStar", ast.Try))):
+            return self._try(stmt, entries)
+        if isinstance(stmt, (ast.With, ast.AsyncWith)):
+            node = self._node("with " + ", ".join(_source(item) for item in stmt.items))
+            self._connect(entries, node)
+            return self._block(stmt.body, [(node, None)])
+        if isinstance(stmt, ast.Match):
+            return self._match(stmt, entries)
+        if isinstance(stmt, ast.Return):
+            node = self._node("return " + _source(stmt.value) if stmt.value else "return", "terminal")
+            self._connect(entries, node)
+            called = _called_name(stmt)
+            if called:
+                self.call_edges.append((node, called))
+            return []
+        if isinstance(stmt, ast.Raise):
+            node = self._node("raise " + _source(stmt.exc) if stmt.exc else "raise", "terminal")
+            self._connect(entries, node)
+            return []
+        if isinstance(stmt, ast.Break) and self._loops:
+            self._loops[-1][1].extend(entries)
+            return []
+        if isinstance(stmt, ast.Continue) and self._loops:
+            self._connect(entries, self._loops[-1][0])
+            return []
+
+        # Calls (and anything not handled above) become a single node
+        node = self._node(_source(stmt))
+        self._connect(entries, node)
+        called = _called_name(stmt)
+        if called:
+            self.call_edges.append((node, called))
+        return [(node, None)]
+
+    def _if(self, stmt, entries):
+        node = self._node(f"if {_source(stmt.test)}?", "decision")
+        self._connect(entries, node)
+        exits = self._block(stmt.body, [(node, "Yes")])
+        if stmt.orelse:
+            exits += self._block(stmt.orelse, [(node, "No")])
+        else:
+            exits.append((node, "No"))
+        return exits
+
+    def _loop(self, stmt, entries):
+        if isinstance(stmt, ast.While):
+            label = f"while {_source(stmt.test)}?"
+        else:
+            label = f"for {_source(stmt.target)} in {_source(stmt.iter)}"
+        head = self._node(label, "decision")
+        self._connect(entries, head)
+        self._loops.append((head, []))
+        body_exits = self._block(stmt.body, [(head, "loop")])
+        _, break_exits = self._loops.pop()
+        self._connect(body_exits, head)
+        exits = [(head, "done")]
+        if stmt.orelse:
+            exits = self._block(stmt.orelse, exits)
+        return exits + break_exits
+
+    def _try(self, stmt, entries):
+        node = self._node("try", "process")
+        self._connect(entries, node)
+        exits = self._block(stmt.body, [(node, None)])
+        if stmt.orelse:
+            exits = self._block(stmt.orelse, exits)
+        for handler in stmt.handlers:
+            label = "except " + _source(handler.type) if handler.type else "except"
+            exits += self._block(handler.body, [(node, label)])
+        if stmt.finalbody:
+            exits = self._block(stmt.finalbody, exits)
+        return exits
+
+    def _match(self, stmt, entries):
+        node = self._node(f"match {_source(stmt.subject)}", "decision")
+        self._connect(entries, node)
+        exits = []
+        for case in stmt.cases:
+            exits += self._block(case.body, [(node, "case " + _source(case.pattern))])
+        return exits
+
+
+def python_to_mermaid(code):
+    """
+    Build a Mermaid flowchart for Python source code.
+
+    Args:
+        code (str): Python source code.
+
+    Returns:
+        str: Mermaid ``flowchart TD`` diagram.
+
+    Raises:
+        SyntaxError: If ``code`` is not valid Python.
+    """
+    tree = ast.parse(code)
+    return _FlowBuilder().module(tree)
@@ -0,0 +1,264 @@
+"""
+Per-request instrumentation of the AI features.
+
+``instrument("explain")`` wraps an entry point (as a decorator) or a block of
+code (as a context manager) in a ``RequestRecord``. The record is held in a
+context variable, so everything below it reports into it without extra
+arguments:
+    - clients.py: every provider call and attempt (model, latency, tokens)
+    - streaming.py: time to first token and token usage of streamed calls
+    - response_cache.py: exact and near-duplicate cache hits
+Work fanned out to thread pools (chunking, hedging) runs in a copy of the
+caller's context and reports into the same record. Nested instrumented
+calls (e.g. an entry point calling itself per chunk) add to the outer record.
+
+When the request ends (for streamed results: when the stream is consumed)
+the record is turned into metrics (``request_duration_seconds`` and
+``request_ttft_seconds`` histograms, request, token, cost, retry and
+fallback counters, all labelled by feature), added to the Diagnostics time
+series (diagnostics.py) and, if FIXIFOX_REQUEST_LOG is set, written as one
+JSON line per request ("-" for stderr, else a file path).
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+
+import metrics
+from diagnostics import get_timeseries
+
+logger = logging.getLogger("fixifox.requests")
+
+_current = contextvars.ContextVar("fixifox_request", default=None)
+_request_id = contextvars.ContextVar("fixifox_request_id", default=None)
+_lock = threading.Lock()
+
+
+def _configure_log():
+    target = os.environ.get("FIXIFOX_REQUEST_LOG")
+    if not target or logger.handlers:
+        return
+    handler = logging.StreamHandler() if target == "-" else logging.FileHandler(target, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+_configure_log()
+
+
+@dataclass
+class RequestRecord:
+    """Everything measured about one feature request."""
+    feature: str
+    request_id: str = field(default_factory=lambda: _request_id.get() or uuid.uuid4().hex[:12])
+    started_at: float = field(default_factory=time.time)
+    model: str = None
+    models_tried: list = field(default_factory=list)
+    calls: int = 0
+    attempts: int = 0
+    failed_attempts: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    cache: str = "miss"
+    ttft_seconds: float = None
+    latency_seconds: float = None
+    outcome: str = None
+
+    @property
+    def retries(self):
+        return max(0, self.attempts - self.calls)
+
+    @property
+    def fallbacks(self):
+        return max(0, len(self.models_tried) - 1)
+
+    def to_dict(self):
+        return {**asdict(self), "cost_usd": round(self.cost_usd, 8), "retries": self.retries, "fallbacks": self.fallbacks}
+
+
+def current():
+    """The record of the request being served, or None outside ``instrument``."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def request_id(value):
+    """Give records started inside the block the caller's request id (e.g. from an HTTP header)."""
+    token = _request_id.set(value)
+    try:
+        yield value
+    finally:
+        _request_id.reset(token)
+
+
+def note_call(model):
+    """A provider call to ``model`` is starting (retries of it are attempts, not calls)."""
+    record = _current.get()
+    if record is not None:
+        with _lock:
+            record.calls += 1
+            if model not in record.models_tried:
+                record.models_tried.append(model)
+
+
+def note_attempt(model, ok):
+    record = _current.get()
+    if record is not None:
+        with _lock:
+            record.attempts += 1
+            if ok:
+                record.model = model
+            else:
+                record.failed_attempts += 1
+
+
+def note_usage(model, prompt_tokens, completion_tokens):
+    """Add token usage reported by the provider (and its list-price cost)."""
+    record = _current.get()
+    if record is None:
+        return
+    from model_router import MODELS, expected_cost
+
+    spec = MODELS.get(model)
+    with _lock:
+        record.prompt_tokens += prompt_tokens or 0
+        record.completion_tokens += completion_tokens or 0
+        if spec is not None:
+            record.cost_usd += expected_cost(spec, prompt_tokens or 0, completion_tokens or 0)
+
+
+def note_cache(result):
+    """``result``: "hit" or "near_hit" (a miss is the default)."""
+    record = _current.get()
+    if record is not None:
+        record.cache = result
+
+
+def usage_of(response):
+    """
+    ``(prompt_tokens, completion_tokens)`` from a Groq completion (or final
+    stream chunk) or a Gemini response, else None.
+    """
+    usage = getattr(response, "usage", None) or getattr(getattr(response, "x_groq", None), "usage", None)
+    if usage is not None:
+        return getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return getattr(usage, "prompt_token_count", 0), getattr(usage, "candidates_token_count", 0)
+    return None
+
+
+def submit(executor, func, *args):
+    """``executor.submit`` that runs ``func`` in a copy of the caller's context."""
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+
+def _finish(record, started, outcome):
+    record.latency_seconds = round(time.perf_counter() - started, 4)
+    record.outcome = outcome
+    feature = record.feature
+    metrics.histogram("request_duration_seconds", record.latency_seconds, feature=feature)
+    if record.ttft_seconds is not None:
+        metrics.histogram("request_ttft_seconds", record.ttft_seconds, feature=feature)
+    metrics.increment("requests", feature=feature, outcome=outcome, cache=record.cache)
+    if record.model is not None:
+        metrics.increment("llm_tokens", record.prompt_tokens, feature=feature, model=record.model, kind="prompt")
+        metrics.increment("llm_tokens", record.completion_tokens, feature=feature, model=record.model, kind="completion")
+        metrics.increment("llm_cost_usd", record.cost_usd, feature=feature, model=record.model)
+    if record.retries:
+        metrics.increment("request_retries", record.retries, feature=feature)
+    if record.fallbacks:
+        metrics.increment("request_fallbacks", record.fallbacks, feature=feature)
+    if outcome != "cancelled":
+        get_timeseries().record_request(feature, record.latency_seconds, outcome == "ok", record.cache != "miss")
+    if logger.handlers:
+        logger.info(json.dumps(record.to_dict(), default=str))
+
+
+class instrument:
+    """
+    Measure a feature request.
+
+    Use as ``@instrument("explain", ok_if=is_cacheable_response)`` on an
+    entry point, or as ``with instrument("debug_run") as record:`` around a
+    block. ``ok_if`` decides from the return value whether the request
+    succeeded (entry points return error messages instead of raising).
+    """
+
+    def __init__(self, feature, ok_if=None):
+        self.feature = feature
+        self.ok_if = ok_if
+
+    def __enter__(self):
+        self._record = RequestRecord(self.feature)
+        self._started = time.perf_counter()
+        self._token = _current.set(self._record)
+        return self._record
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        _finish(self._record, self._started, "error" if exc_type is not None or self._record.outcome == "error" else "ok")
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is not None:
+                return func(*args, **kwargs)
+            record = RequestRecord(self.feature)
+            started = time.perf_counter()
+            token = _current.set(record)
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                _finish(record, started, "error")
+                raise
+            finally:
+                _current.reset(token)
+
+            from streaming import TextStream
+
+            if isinstance(result, TextStream):
+                return self._bind(record, started, result)
+            ok = self.ok_if is None or self.ok_if(result)
+            _finish(record, started, "ok" if ok else "error")
+            return result
+
+        return wrapper
+
+    def _bind(self, record, started, stream):
+        """Wrap ``stream`` so it is consumed inside ``record`` and finishes it at the end."""
+        from streaming import TextStream
+
+        def chunks():
+            iterator = iter(stream)
+            finished = False
+            try:
+                while True:
+                    token = _current.set(record)
+                    try:
+                        chunk = next(iterator)
+                    except StopIteration:
+                        break
+                    finally:
+                        _current.reset(token)
+                    if record.ttft_seconds is None:
+                        record.ttft_seconds = round(time.perf_counter() - started, 4)
+                    yield chunk
+                finished = True
+            finally:
+                ok = finished and not stream.failed and (self.ok_if is None or self.ok_if(stream.result()))
+                _finish(record, started, "ok" if ok else ("error" if finished else "cancelled"))
+
+        bound = TextStream(chunks(), postprocess=lambda text: stream.result())
+        bound.add_done_callback(lambda _: setattr(bound, "failed", stream.failed))
+        return bound
@@ -0,0 +1,218 @@
+"""
+In-process metrics registry for FixiFox.
+
+A small, thread-safe store of counters, gauges, summaries and histograms
+that any module can write to without caring how the numbers are displayed.
+Metric series are identified by a name plus optional labels, e.g.
+``increment("stream_renders", feature="explain")``.
+
+``prometheus_text`` renders every series in the Prometheus text exposition
+format; ``start_metrics_server`` serves it on ``/metrics`` from a background
+thread (app.py starts it when FIXIFOX_METRICS_PORT is set).
+"""
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the default histogram buckets, suited to LLM latencies
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _series_key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges, summaries (count/sum/min/max) and bucketed histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}
+        self._histograms = {}
+
+    def increment(self, name, value=1, **labels):
+        """Add ``value`` to a counter."""
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to ``value``."""
+        key = _series_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        """Record one observation (e.g. a latency in seconds) in a summary."""
+        key = _series_key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                self._summaries[key] = {"count": 1, "sum": value, "min": value, "max": value}
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["min"] = min(summary["min"], value)
+                summary["max"] = max(summary["max"], value)
+
+    def histogram(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """Record one observation in a cumulative histogram with the given bucket bounds."""
+        key = _series_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    "buckets": tuple(buckets), "counts": [0] * len(buckets), "count": 0, "sum": 0.0,
+                }
+            for index, bound in enumerate(histogram["buckets"]):
+                if value <= bound:
+                    histogram["counts"][index] += 1
+            histogram["count"] += 1
+            histogram["sum"] += value
+
+    def snapshot(self):
+        """
+        Copy of every series.
+
+        Returns:
+            dict: {"counters": [...], "gauges": [...], "summaries": [...],
+                  "histograms": [...]}, each entry holding the metric name, its
+                  labels and its value(s).
+        """
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self._counters.items()
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self._gauges.items()
+                ],
+                "summaries": [
+                    {"name": name, "labels": dict(labels), **summary}
+                    for (name, labels), summary in self._summaries.items()
+                ],
+                "histograms": [
+                    {"name": name, "labels": dict(labels), "buckets": histogram["buckets"],
+                     "counts": list(histogram["counts"]), "count": histogram["count"], "sum": histogram["sum"]}
+                    for (name, labels), histogram in self._histograms.items()
+                ],
+            }
+
+    def reset(self):
+        """Drop every series."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+            self._histograms.clear()
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry."""
+    return _registry
+
+
+def increment(name, value=1, **labels):
+    _registry.increment(name, value, **labels)
+
+
+def set_gauge(name, value, **labels):
+    _registry.set_gauge(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    _registry.observe(name, value, **labels)
+
+
+def histogram(name, value, buckets=LATENCY_BUCKETS, **labels):
+    _registry.histogram(name, value, buckets, **labels)
+
+
+def _metric_name(prefix, name):
+    return prefix + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _format_labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in sorted(labels.items())
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def prometheus_text(registry=None, prefix="fixifox_"):
+    """
+    Render every series in the Prometheus text exposition format.
+
+    Counters get a ``_total`` suffix; summaries are exported as ``_count``
+    and ``_sum`` (plus ``_min``/``_max`` gauges); histograms as cumulative
+    ``_bucket`` series with ``le`` labels.
+    """
+    snapshot = (registry or _registry).snapshot()
+    lines = []
+    typed = set()
+
+    def declare(name, kind):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for series in sorted(snapshot["counters"], key=lambda s: s["name"]):
+        name = _metric_name(prefix, series["name"]) + "_total"
+        declare(name, "counter")
+        lines.append(f"{name}{_format_labels(series['labels'])} {series['value']}")
+    for series in sorted(snapshot["gauges"], key=lambda s: s["name"]):
+        name = _metric_name(prefix, series["name"])
+        declare(name, "gauge")
+        lines.append(f"{name}{_format_labels(series['labels'])} {series['value']}")
+    for series in sorted(snapshot["summaries"], key=lambda s: s["name"]):
+        name = _metric_name(prefix, series["name"])
+        declare(name, "summary")
+        labels = _format_labels(series["labels"])
+        lines.append(f"{name}_count{labels} {series['count']}")
+        lines.append(f"{name}_sum{labels} {series['sum']}")
+        for bound in ("min", "max"):
+            declare(f"{name}_{bound}", "gauge")
+            lines.append(f"{name}_{bound}{labels} {series[bound]}")
+    for series in sorted(snapshot["histograms"], key=lambda s: s["name"]):
+        name = _metric_name(prefix, series["name"])
+        declare(name, "histogram")
+        for bound, count in zip(series["buckets"], series["counts"]):
+            lines.append(f"{name}_bucket{_format_labels(series['labels'], le=bound)} {count}")
+        lines.append(f"{name}_bucket{_format_labels(series['labels'], le='+Inf')} {series['count']}")
+        lines.append(f"{name}_count{_format_labels(series['labels'])} {series['count']}")
+        lines.append(f"{name}_sum{_format_labels(series['labels'])} {series['sum']}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Serve ``prometheus_text()`` on ``http://host:port/metrics`` from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="fixifox-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,228 @@
+"""
+Cost- and latency-aware model routing.
+
+Instead of hard-coded model lists in every entry point, each task asks
+``route(task, text)`` for an ordered list of models: the first is the one
+to call, the rest are fallbacks. Candidates come from the task's policy in
+``TASKS``; models whose circuit breaker is open are left out, and the rest
+are ordered by
+    1. health: models whose live p95 latency breaks the task's SLO, or
+       whose recent error rate is too high, go to the back;
+    2. size: short inputs prefer small, fast models and long inputs prefer
+       large ones;
+    3. expected cost of the call (input + output tokens at list price),
+       inflated by the model's error rate;
+    4. the policy's own preference order.
+
+Latency and errors are learnt from every provider call through ``record``
+(see clients.py), and time to first token from every streamed call through
+``record_first_token`` (see streaming.py), over a sliding window per model.
+"""
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+import metrics
+from circuit_breaker import get_breaker
+from rate_limiter import estimate_tokens
+
+# Inputs up to this many estimated tokens count as "small"
+SMALL_INPUT_TOKENS = int(os.environ.get("FIXIFOX_ROUTER_SMALL_INPUT_TOKENS", "400"))
+# Models failing more often than this (over the window) are demoted
+MAX_ERROR_RATE = float(os.environ.get("FIXIFOX_ROUTER_MAX_ERROR_RATE", "0.2"))
+WINDOW = 100
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A model the router may pick. Prices are USD per million tokens."""
+    id: str
+    provider: str
+    size: str
+    context_tokens: int
+    input_price: float
+    output_price: float
+
+
+MODELS = {
+    spec.id: spec for spec in (
+        ModelSpec("llama-3.1-8b-instant", "groq", "small", 131072, 0.05, 0.08),
+        ModelSpec("gemma2-9b-it", "groq", "small", 8192, 0.20, 0.20),
+        ModelSpec("meta-llama/llama-4-scout-17b-16e-instruct", "groq", "large", 131072, 0.11, 0.34),
+        ModelSpec("qwen-qwq-32b", "groq", "large", 131072, 0.29, 0.39),
+        ModelSpec("llama-3.3-70b-versatile", "groq", "large", 131072, 0.59, 0.79),
+        ModelSpec("deepseek-r1-distill-llama-70b", "groq", "large", 131072, 0.75, 0.99),
+    )
+}
+
+
+@dataclass(frozen=True)
+class TaskPolicy:
+    """
+    Routing policy for one task.
+
+    Args:
+        candidates (tuple): Acceptable model ids in order of preference.
+        slo_p95 (float): Target p95 latency in seconds.
+        size_aware (bool): Whether small inputs may go to small models.
+    """
+    candidates: tuple
+    slo_p95: float
+    size_aware: bool = True
+
+
+TASKS = {
+    "generate": TaskPolicy(("llama-3.3-70b-versatile", "meta-llama/llama-4-scout-17b-16e-instruct",
+                            "llama-3.1-8b-instant"), slo_p95=10.0),
+    "fix": TaskPolicy(("meta-llama/llama-4-scout-17b-16e-instruct", "llama-3.3-70b-versatile",
+                       "llama-3.1-8b-instant"), slo_p95=10.0),
+    "convert": TaskPolicy(("qwen-qwq-32b", "gemma2-9b-it", "llama-3.3-70b-versatile"), slo_p95=15.0),
+    # JSON-mode reasoning over code: small models are not good enough
+    "security_scan": TaskPolicy(("qwen-qwq-32b", "llama-3.3-70b-versatile"), slo_p95=20.0, size_aware=False),
+    "flow_diagram": TaskPolicy(("deepseek-r1-distill-llama-70b", "llama-3.3-70b-versatile"), slo_p95=20.0,
+                               size_aware=False),
+    "debug": TaskPolicy(("llama-3.1-8b-instant", "meta-llama/llama-4-scout-17b-16e-instruct"), slo_p95=6.0),
+    "assistant": TaskPolicy(("meta-llama/llama-4-scout-17b-16e-instruct", "llama-3.1-8b-instant",
+                             "llama-3.3-70b-versatile"), slo_p95=8.0),
+}
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class ModelStats:
+    """Sliding window of recent latencies, first-token times and outcomes per model."""
+
+    def __init__(self, window=WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._first_tokens = {}
+        self._outcomes = {}
+        self.window = window
+
+    def record(self, model, latency=None, ok=True):
+        with self._lock:
+            if latency is not None:
+                self._latencies.setdefault(model, deque(maxlen=self.window)).append(latency)
+            self._outcomes.setdefault(model, deque(maxlen=self.window)).append(ok)
+
+    def record_first_token(self, model, seconds):
+        with self._lock:
+            self._first_tokens.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def models(self):
+        """Models with at least one recorded call."""
+        with self._lock:
+            return sorted(set(self._outcomes) | set(self._latencies))
+
+    def summary(self, model):
+        """
+        Returns:
+            dict: p50/p95 latency and p95 time to first token (None without
+            data), error_rate and sample counts.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(model, ()))
+            first_tokens = sorted(self._first_tokens.get(model, ()))
+            outcomes = list(self._outcomes.get(model, ()))
+        return {
+            "p50": _percentile(latencies, 0.50) if latencies else None,
+            "p95": _percentile(latencies, 0.95) if latencies else None,
+            "ttft_p95": _percentile(first_tokens, 0.95) if first_tokens else None,
+            "ttft_samples": len(first_tokens),
+            "error_rate": outcomes.count(False) / len(outcomes) if outcomes else 0.0,
+            "latency_samples": len(latencies),
+            "calls": len(outcomes),
+        }
+
+
+_stats = ModelStats()
+
+
+def get_model_stats():
+    """Return the process-wide model statistics."""
+    return _stats
+
+
+def record(model, latency=None, ok=True):
+    """Record the outcome of one provider call (latency in seconds, None if unknown)."""
+    _stats.record(model, latency, ok)
+    if not ok:
+        metrics.increment("llm_errors", model=model)
+    if latency is not None:
+        metrics.observe("llm_latency_seconds", latency, model=model)
+
+
+def record_first_token(model, seconds):
+    """Record the time a streamed call took to produce its first chunk."""
+    _stats.record_first_token(model, seconds)
+    metrics.observe("llm_first_token_seconds", seconds, model=model)
+
+
+def expected_cost(spec, input_tokens, output_tokens):
+    """Price of one call in USD."""
+    return (input_tokens * spec.input_price + output_tokens * spec.output_price) / 1_000_000
+
+
+def route(task, text="", max_tokens=1024, preferred=None):
+    """
+    Order the candidate models for ``task``.
+
+    Args:
+        task (str): Key of ``TASKS``.
+        text (str): Prompt or input the call is built from (sizes the request).
+        max_tokens (int): Output budget of the call.
+        preferred (str, optional): Model pinned by the user; always tried first.
+
+    Returns:
+        list[str]: Model ids, best first.
+    """
+    policy = TASKS[task]
+    input_tokens = estimate_tokens(prompt=text)
+    small_input = input_tokens <= SMALL_INPUT_TOKENS
+
+    ranked = []
+    for rank, model in enumerate(policy.candidates):
+        spec = MODELS[model]
+        if input_tokens + max_tokens > spec.context_tokens:
+            continue
+        if not get_breaker(spec.provider, model).available():
+            continue
+        stats = _stats.summary(model)
+        penalty = 0
+        if stats["error_rate"] > MAX_ERROR_RATE:
+            penalty = 2
+        elif stats["p95"] is not None and stats["p95"] > policy.slo_p95:
+            penalty = 1
+        size_mismatch = 0
+        if policy.size_aware:
+            size_mismatch = int((spec.size == "small") != small_input)
+        cost = expected_cost(spec, input_tokens, max_tokens) * (1 + stats["error_rate"])
+        ranked.append(((penalty, size_mismatch, cost, rank), model))
+
+    # Every candidate unusable: try them anyway rather than fail without a call
+    models = [model for _, model in sorted(ranked)] or list(policy.candidates)
+    if preferred:
+        models = [preferred] + [model for model in models if model != preferred]
+    metrics.increment("router_decisions", task=task, model=models[0])
+    return models
+
+
+def describe(task):
+    """Live view of a task's candidates for the diagnostics UI."""
+    policy = TASKS[task]
+    rows = []
+    for model in policy.candidates:
+        spec = MODELS[model]
+        rows.append({
+            "model": model,
+            "size": spec.size,
+            "slo_p95": policy.slo_p95,
+            **_stats.summary(model),
+            "usd_per_1k_calls": round(expected_cost(spec, 1000, 1000) * 1000, 3),
+        })
+    return rows
+
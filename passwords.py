@@ -0,0 +1,171 @@
+"""
+Salted password hashing for the user store.
+
+Hashes are self-describing strings so the cost can be raised later without
+breaking existing accounts:
+    scrypt$<n>$<r>$<p>$<salt>$<hash>
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+(salt and hash are base64). Legacy rows hold a bare, unsalted SHA-256 hex
+digest; they still verify, and ``needs_rehash`` reports them (and hashes
+made with an outdated cost) so the caller can upgrade them on login.
+
+A KDF deliberately costs tens of milliseconds of CPU. ``hashlib`` releases
+the GIL while it runs, so hashing is done on a small bounded thread pool:
+a login burst is limited to ``FIXIFOX_HASH_WORKERS`` hashes at a time
+instead of saturating every core the Streamlit server needs.
+
+Configuration (environment variables):
+    FIXIFOX_PASSWORD_KDF        "scrypt" (default) or "pbkdf2"
+    FIXIFOX_SCRYPT_N            scrypt CPU/memory cost (default 16384)
+    FIXIFOX_PBKDF2_ITERATIONS   PBKDF2-SHA256 iterations (default 600000)
+    FIXIFOX_HASH_WORKERS        Concurrent hashes (default 4)
+"""
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+KDF = os.environ.get("FIXIFOX_PASSWORD_KDF", "scrypt")
+SCRYPT_N = int(os.environ.get("FIXIFOX_SCRYPT_N", "16384"))
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = int(os.environ.get("FIXIFOX_PBKDF2_ITERATIONS", "600000"))
+SALT_BYTES = 16
+
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r + 1024 * 1024, dklen=32,
+    )
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def hash_password_sync(password, kdf=None, cost=None):
+    """
+    Hash ``password`` on the calling thread.
+
+    Args:
+        password (str): Plain-text password.
+        kdf (str, optional): "scrypt" or "pbkdf2". Defaults to KDF.
+        cost (int, optional): scrypt ``n`` or PBKDF2 iterations. Defaults to
+            the configured cost.
+
+    Returns:
+        str: Encoded hash.
+    """
+    kdf = kdf or KDF
+    salt = os.urandom(SALT_BYTES)
+    if kdf == "scrypt":
+        n = cost or SCRYPT_N
+        digest = _scrypt(password, salt, n, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${n}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    if kdf == "pbkdf2":
+        iterations = cost or PBKDF2_ITERATIONS
+        return f"pbkdf2_sha256${iterations}${_b64(salt)}${_b64(_pbkdf2(password, salt, iterations))}"
+    raise ValueError(f"Unknown password KDF: {kdf}")
+
+
+def verify_password_sync(password, encoded):
+    """Check ``password`` against an encoded (or legacy SHA-256) hash on the calling thread."""
+    if _LEGACY_SHA256.match(encoded):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, encoded)
+
+    parts = encoded.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            candidate = _scrypt(password, _unb64(parts[4]), n, r, p)
+            return hmac.compare_digest(candidate, _unb64(parts[5]))
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            candidate = _pbkdf2(password, _unb64(parts[2]), int(parts[1]))
+            return hmac.compare_digest(candidate, _unb64(parts[3]))
+    except (ValueError, TypeError):
+        pass
+    return False
+
+
+def needs_rehash(encoded):
+    """True for legacy SHA-256 rows and hashes made with a different KDF or cost."""
+    parts = encoded.split("$")
+    if KDF == "scrypt":
+        return parts[0] != "scrypt" or len(parts) != 6 or parts[1:4] != [str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+    return parts[0] != "pbkdf2_sha256" or len(parts) != 4 or parts[1] != str(PBKDF2_ITERATIONS)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor():
+    """Bounded pool that runs every KDF computation."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("FIXIFOX_HASH_WORKERS", "4")),
+                    thread_name_prefix="fixifox-hash",
+                )
+    return _executor
+
+
+def _timed(operation, func, *args):
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        metrics.observe("password_hash_seconds", time.perf_counter() - started, operation=operation)
+
+
+def hash_password(password):
+    """Hash ``password`` on the bounded pool and wait for the result."""
+    return get_hash_executor().submit(_timed, "hash", hash_password_sync, password).result()
+
+
+def verify_password(password, encoded):
+    """Verify ``password`` on the bounded pool and wait for the result."""
+    return get_hash_executor().submit(_timed, "verify", verify_password_sync, password, encoded).result()
+
+
+_dummy_hash = None
+
+
+def dummy_verify(password):
+    """
+    Spend the same time as a real verification. Called for unknown usernames
+    so response times do not reveal which accounts exist.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password_sync("fixifox-dummy-password")
+    verify_password(password, _dummy_hash)
+    return False
+
+
+def rehash_in_background(password, callback):
+    """Compute a fresh hash on the pool and pass it to ``callback`` without waiting."""
+    def rehash():
+        callback(_timed("rehash", hash_password_sync, password))
+
+    return get_hash_executor().submit(rehash)
@@ -0,0 +1,356 @@
+"""
+Provider-aware rate limiting and retry scheduling.
+
+Every LLM call goes through ``call_with_retry``, which
+    1. waits for request and token budget in per-provider and per-model
+       token buckets (callers queue instead of failing),
+    2. runs the call,
+    3. on a rate-limit error, returns the tokens it reserved (the provider
+       rejected the request), then honours the provider's ``retry-after`` by
+       pausing that model for everyone, and on transient errors
+       (timeouts, 5xx, dropped connections) retries with jittered
+       exponential backoff.
+
+Token budget is reserved up front from ``estimate_tokens``, which counts the
+whole ``max_tokens`` because the answer length is unknown. Once the provider
+reports the real usage, ``settle`` returns the difference (clients.py does
+this for every completed call, streamed or not), so the budget tracks the
+tokens actually spent instead of the worst case.
+
+Budgets are per minute and configured through environment variables:
+    FIXIFOX_<PROVIDER>_RPM / FIXIFOX_<PROVIDER>_TPM
+        Requests / tokens per minute for each model (providers enforce
+        their limits per model).
+    FIXIFOX_<PROVIDER>_TOTAL_RPM / FIXIFOX_<PROVIDER>_TOTAL_TPM
+        Optional provider-wide caps across all models (0 = unlimited).
+    FIXIFOX_RATE_LIMIT_MAX_WAIT
+        Longest a request may queue before ``RateLimitExceeded`` is raised.
+
+Metrics: ``rate_limit_queue_depth`` (gauge), ``rate_limit_wait_seconds``
+(summary) and ``rate_limit_retries`` (counter), labelled by provider and model.
+"""
+import os
+import random
+import re
+import threading
+import time
+
+import metrics
+
+DEFAULT_LIMITS = {
+    "groq": {"rpm": 30, "tpm": 6000},
+    "gemini": {"rpm": 15, "tpm": 1000000},
+}
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to queue longer than the allowed wait."""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    ``wait_time`` tells a caller how long until an amount is available and
+    ``take`` spends it; the limiter checks and takes under one lock.
+
+    Args:
+        per_minute (float): Refill rate; 0 or less means unlimited.
+        capacity (float, optional): Burst size. Defaults to ``per_minute``.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self):
+        return self.rate <= 0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until ``amount`` would be available, without reserving it."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        # A request larger than the whole bucket only needs a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount, now):
+        if not self.unlimited:
+            self._refill(now)
+            self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount):
+        if not self.unlimited:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _Budget:
+    """Request and token buckets plus a cool-down for one scope (provider or model)."""
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.blocked_until = 0.0
+
+    def wait_time(self, tokens, now):
+        return max(
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+            self.blocked_until - now,
+        )
+
+    def take(self, tokens, now):
+        self.requests.take(1, now)
+        self.tokens.take(tokens, now)
+
+
+def _env_number(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class RateLimiter:
+    """
+    Per-provider and per-model budgets shared by every thread in the process.
+
+    Args:
+        limits (dict, optional): ``{provider: {"rpm": ..., "tpm": ...}}``.
+            Defaults to DEFAULT_LIMITS overridden by the environment.
+        max_wait (float, optional): Longest time a request may queue.
+    """
+
+    def __init__(self, limits=None, max_wait=None):
+        self.limits = limits or {
+            provider: {
+                "rpm": _env_number(f"FIXIFOX_{provider.upper()}_RPM", values["rpm"]),
+                "tpm": _env_number(f"FIXIFOX_{provider.upper()}_TPM", values["tpm"]),
+                "total_rpm": _env_number(f"FIXIFOX_{provider.upper()}_TOTAL_RPM", 0),
+                "total_tpm": _env_number(f"FIXIFOX_{provider.upper()}_TOTAL_TPM", 0),
+            }
+            for provider, values in DEFAULT_LIMITS.items()
+        }
+        self.max_wait = max_wait if max_wait is not None else _env_number("FIXIFOX_RATE_LIMIT_MAX_WAIT", 60.0)
+        self._lock = threading.Lock()
+        self._budgets = {}
+        self._queued = {}
+
+    def _budget(self, provider, model):
+        key = (provider, model)
+        budget = self._budgets.get(key)
+        if budget is None:
+            limits = self.limits.get(provider, {})
+            if model is None:
+                budget = _Budget(limits.get("total_rpm", 0), limits.get("total_tpm", 0))
+            else:
+                budget = _Budget(limits.get("rpm", 0), limits.get("tpm", 0))
+            self._budgets[key] = budget
+        return budget
+
+    def _set_queue_depth(self, provider, model, delta):
+        key = (provider, model)
+        self._queued[key] = self._queued.get(key, 0) + delta
+        metrics.set_gauge("rate_limit_queue_depth", self._queued[key], provider=provider, model=model)
+
+    def acquire(self, provider, model, tokens=0):
+        """
+        Block until one request of ``tokens`` estimated tokens fits the budgets.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed ``max_wait``.
+        """
+        started = time.monotonic()
+        with self._lock:
+            self._set_queue_depth(provider, model, 1)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    scopes = [self._budget(provider, None), self._budget(provider, model)]
+                    wait = max(scope.wait_time(tokens, now) for scope in scopes)
+                    if wait <= 0:
+                        for scope in scopes:
+                            scope.take(tokens, now)
+                        break
+                if now - started + wait > self.max_wait:
+                    raise RateLimitExceeded(
+                        f"{provider}/{model} is rate limited; retry in {wait:.0f}s"
+                    )
+                # Re-check after sleeping: other threads may have taken the budget
+                time.sleep(min(wait, 1.0))
+        finally:
+            with self._lock:
+                self._set_queue_depth(provider, model, -1)
+        waited = time.monotonic() - started
+        metrics.observe("rate_limit_wait_seconds", waited, provider=provider, model=model)
+        return waited
+
+    def refund(self, provider, model, tokens):
+        """Return reserved tokens (``tokens`` may be negative to charge more)."""
+        with self._lock:
+            for scope in (self._budget(provider, None), self._budget(provider, model)):
+                if tokens >= 0:
+                    scope.tokens.refund(tokens)
+                else:
+                    scope.tokens.take(-tokens, time.monotonic())
+
+    def pause(self, provider, model, seconds):
+        """Stop handing out budget for ``provider``/``model`` for ``seconds``."""
+        with self._lock:
+            budget = self._budget(provider, model)
+            budget.blocked_until = max(budget.blocked_until, time.monotonic() + seconds)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide rate limiter."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+def estimate_tokens(messages=None, prompt=None, max_tokens=0):
+    """Rough token estimate (4 characters per token) for budgeting."""
+    if messages:
+        text_length = sum(len(str(message.get("content", ""))) for message in messages)
+    else:
+        text_length = len(prompt or "")
+    return text_length // 4 + (max_tokens or 0)
+
+
+def _status_code(error):
+    for source in (error, getattr(error, "response", None)):
+        for attribute in ("status_code", "code"):
+            value = getattr(source, attribute, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def retry_after(error):
+    """Seconds the provider asked us to wait, if the error says so."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    # Gemini reports "retry_delay { seconds: N }" / "Please retry in Ns" in the message
+    for pattern in (r"retry_delay\s*\{\s*seconds:\s*(\d+)", r"retry in (\d+(?:\.\d+)?)\s*s"):
+        match = re.search(pattern, str(error), re.IGNORECASE)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def classify_error(error):
+    """
+    Sort an exception into "rate_limit", "transient" or "fatal".
+    """
+    status = _status_code(error)
+    message = str(error).lower()
+    if status == 429 or "rate limit" in message or "rate_limit" in message \
+            or "resource exhausted" in message or "resource_exhausted" in message or "quota" in message:
+        return "rate_limit"
+    if (status is not None and status >= 500) or "timeout" in message or "timed out" in message \
+            or "connection" in message or "unavailable" in message or "overloaded" in message:
+        return "transient"
+    return "fatal"
+
+
+def is_model_failure(error):
+    """
+    Whether ``error`` says the model itself is unhealthy: a transient error,
+    or a model that is unknown or decommissioned. Rate limits and errors
+    caused by the request (bad request, context length exceeded, ...) are not.
+    """
+    if classify_error(error) == "transient":
+        return True
+    message = str(error).lower()
+    return _status_code(error) == 404 or "decommissioned" in message or "model_not_found" in message \
+        or ("model" in message and ("does not exist" in message or "not found" in message))
+
+
+def settle(provider, model, estimated, usage):
+    """
+    Reconcile the budget reserved for a completed call with its real usage.
+
+    Args:
+        estimated (int): Tokens reserved by ``call_with_retry``.
+        usage (tuple | None): ``(prompt_tokens, completion_tokens)`` reported by
+            the provider. None (usage unknown) keeps the reservation.
+    """
+    if usage is None:
+        return
+    actual = sum(count or 0 for count in usage)
+    get_rate_limiter().refund(provider, model, estimated - actual)
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for retry number ``attempt`` (1-based)."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def call_with_retry(provider, model, func, tokens=0, max_retries=3):
+    """
+    Run ``func()`` under the rate limiter, retrying rate-limit and transient errors.
+
+    Args:
+        provider (str): "groq" or "gemini".
+        model (str): Model id (budgets and pauses are per model).
+        func (callable): Performs the provider call.
+        tokens (int): Estimated tokens used by the call.
+        max_retries (int): Retries after the first attempt.
+
+    Returns:
+        Whatever ``func`` returns.
+
+    Raises:
+        The last error once retries are exhausted or if the error is fatal,
+        or RateLimitExceeded when the queue wait is too long.
+    """
+    limiter = get_rate_limiter()
+    attempt = 0
+    while True:
+        limiter.acquire(provider, model, tokens)
+        try:
+            return func()
+        except Exception as e:
+            kind = classify_error(e)
+            if kind == "rate_limit":
+                # Rejected requests spend no tokens
+                limiter.refund(provider, model, tokens)
+            attempt += 1
+            if kind == "fatal" or attempt > max_retries:
+                raise
+            delay = retry_after(e) if kind == "rate_limit" else None
+            if delay is None:
+                delay = backoff_delay(attempt)
+            if kind == "rate_limit":
+                # Everyone waiting on this model waits too, instead of hammering it
+                limiter.pause(provider, model, delay)
+            else:
+                time.sleep(delay)
+            metrics.increment("rate_limit_retries", provider=provider, model=model, reason=kind)
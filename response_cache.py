@@ -0,0 +1,345 @@
+"""
+Content-addressed cache for FixiFox LLM responses.
+
+Every AI entry point in app.py is wrapped with ``cached_response`` so that
+pasting the same snippet twice (or re-clicking a button) is answered from
+memory instead of calling Groq/Gemini again. Entries are keyed on a SHA-256
+of the normalized code, the feature name, the model and every other
+prompt-shaping argument.
+
+Two tiers are used:
+    - an in-memory LRU with size and TTL eviction (always on)
+    - an optional SQLite tier that survives restarts (enabled by setting
+      FIXIFOX_CACHE_DB to a file path)
+
+Entry points decorated with ``near_duplicates=True`` also match code that
+differs only in formatting, comments or identifier names: on an exact miss
+the code's fingerprint (fingerprint.py, a digest of its canonical token
+stream) is looked up among earlier requests with the same parameters. Any
+other difference, down to a single operator or literal, is a miss, because
+the corrected code must not get the answer written for the buggy one. The
+fingerprint index lives in memory only. FIXIFOX_SEMANTIC_CACHE=0 turns it off.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import instrumentation
+import metrics
+from fingerprint import fingerprint
+from streaming import TextStream
+
+SEMANTIC_CACHE = os.environ.get("FIXIFOX_SEMANTIC_CACHE", "1") != "0"
+
+
+def normalize_code(code):
+    """
+    Normalize source text so that cosmetic differences do not defeat the cache.
+
+    Line endings are unified, trailing whitespace is stripped from every line
+    and leading/trailing blank lines are removed. Indentation is preserved
+    because it is significant in Python.
+    """
+    if not isinstance(code, str):
+        return code
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def make_cache_key(feature, model, code, params=None):
+    """
+    Build the content address for a request.
+
+    Args:
+        feature (str): Name of the entry point (e.g. "explain").
+        model (str): Model that will answer the request.
+        code (str): The code/text the prompt is built from.
+        params (dict, optional): All remaining prompt-shaping parameters.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = json.dumps(
+        {
+            "feature": feature,
+            "model": model,
+            "code": normalize_code(code),
+            "params": params or {},
+        },
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _SQLiteTier:
+    """Persistent second tier backed by a single SQLite table."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            latency REAL NOT NULL,
+            created_at REAL NOT NULL
+        )
+        ''')
+        self._conn.commit()
+
+    def get(self, key, ttl_seconds):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, latency, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if ttl_seconds and time.time() - row[2] > ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, key, value, latency, created_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, latency, created_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), latency, created_at),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + optional SQLite) response cache with hit/miss counters.
+
+    Args:
+        max_entries (int): Maximum number of entries kept in memory.
+        ttl_seconds (float): Entry lifetime in seconds. 0 disables expiry.
+        db_path (str, optional): SQLite file for the persistent tier.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, latency, created_at)
+        self._disk = _SQLiteTier(db_path) if db_path else None
+        self._similar = OrderedDict()  # (context, fingerprint) -> key
+        self._counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "near_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "saved_seconds": 0.0,
+        }
+
+    def _expired(self, created_at):
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
+
+    def _fetch(self, key):
+        """Entry for ``key`` from memory or disk (counting which tier answered), else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[2]):
+                    del self._entries[key]
+                    self._counters["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry
+
+        if self._disk is not None:
+            entry = self._disk.get(key, self.ttl_seconds)
+            if entry is not None:
+                with self._lock:
+                    self._store_in_memory(key, entry)
+                    self._counters["disk_hits"] += 1
+                return entry
+        return None
+
+    def get(self, key, similar_to=None):
+        """
+        Return the cached value for ``key`` or None on a miss.
+
+        Args:
+            key (str): Exact cache key.
+            similar_to (tuple, optional): ``(context, fingerprint)``; on an exact
+                miss, the answer to an earlier request in the same context
+                with the same fingerprint is returned.
+        """
+        entry = self._fetch(key)
+        if entry is not None:
+            instrumentation.note_cache("hit")
+        elif similar_to is not None and similar_to[1] is not None:
+            with self._lock:
+                match = self._similar.get(similar_to)
+            if match is not None:
+                entry = self._fetch(match)
+                if entry is not None:
+                    with self._lock:
+                        self._counters["near_hits"] += 1
+                    metrics.increment("semantic_cache_hits")
+                    instrumentation.note_cache("near_hit")
+
+        with self._lock:
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._counters["saved_seconds"] += entry[1]
+        return entry[0]
+
+    def set(self, key, value, latency=0.0, similar_to=None):
+        """
+        Store ``value`` together with the latency it took to produce.
+        ``similar_to`` (``(context, fingerprint)``) makes it findable by near-duplicates.
+        """
+        created_at = time.time()
+        with self._lock:
+            self._store_in_memory(key, (value, latency, created_at))
+            self._counters["stores"] += 1
+            if similar_to is not None and similar_to[1] is not None:
+                self._similar[similar_to] = key
+                self._similar.move_to_end(similar_to)
+                while len(self._similar) > self.max_entries:
+                    self._similar.popitem(last=False)
+        if self._disk is not None:
+            self._disk.set(key, value, latency, created_at)
+
+    def _store_in_memory(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def clear(self):
+        """Drop every entry from both tiers (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._similar.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self):
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            dict: hits (near_hits of them served for near-duplicates), misses,
+                  hit_ratio, provider_calls_saved,
+                  saved_seconds, memory/disk/fingerprint sizes and eviction counts.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._entries)
+            stats["fingerprints"] = len(self._similar)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["provider_calls_saved"] = stats["hits"]
+        stats["saved_seconds"] = round(stats["saved_seconds"], 3)
+        stats["disk_entries"] = len(self._disk) if self._disk is not None else None
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide cache, configured from the environment on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    max_entries=int(os.environ.get("FIXIFOX_CACHE_MAX_ENTRIES", "512")),
+                    ttl_seconds=float(os.environ.get("FIXIFOX_CACHE_TTL", "3600")),
+                    db_path=os.environ.get("FIXIFOX_CACHE_DB") or None,
+                )
+    return _cache
+
+
+def cached_response(feature, model=None, code_arg="code", cache_if=None, near_duplicates=False):
+    """
+    Decorator that puts the response cache in front of an LLM entry point.
+
+    Args:
+        feature (str): Name used in the cache key (one per entry point).
+        model (str, optional): Model name for functions that do not take one as
+            an argument. If the function has a ``model`` or ``model_name``
+            argument, that value is used instead.
+        code_arg (str): Name of the argument holding the code/text. It is
+            normalized before hashing; all other arguments are hashed as-is.
+        cache_if (callable, optional): Predicate on the result; results for
+            which it returns False (e.g. error messages) are not stored.
+        near_duplicates (bool): Also serve answers to earlier requests whose
+            code differs only in formatting, comments or names (see fingerprint.py).
+
+    A ``stream`` argument is not part of the key. When the wrapped function
+    returns a ``TextStream``, the final text is stored once the stream ends;
+    cache hits for streaming calls are returned as a one-chunk ``TextStream``.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            code = params.pop(code_arg, "")
+            # Streaming only changes how the answer is delivered, not the answer itself
+            streaming = bool(params.pop("stream", False))
+            model_name = params.get("model") or params.get("model_name") or model
+            key = make_cache_key(feature, model_name, code, params)
+
+            similar_to = None
+            if near_duplicates and SEMANTIC_CACHE and isinstance(code, str):
+                # Same feature, model and parameters; only the code may differ
+                similar_to = (make_cache_key(feature, model_name, None, params), fingerprint(code))
+
+            cache = get_response_cache()
+            cached = cache.get(key, similar_to)
+            if cached is not None:
+                return TextStream.from_text(cached) if streaming else cached
+
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+
+            if isinstance(result, TextStream):
+                def store(stream):
+                    final = stream.result()
+                    if not stream.failed and (cache_if is None or cache_if(final)):
+                        cache.set(key, final, time.perf_counter() - start, similar_to)
+                result.add_done_callback(store)
+            elif cache_if is None or cache_if(result):
+                cache.set(key, result, time.perf_counter() - start, similar_to)
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
@@ -0,0 +1,379 @@
+"""
+Local execution backend for the Interactive Debugging Tool's "Run" mode.
+
+Instead of asking an LLM to imagine the output, code is executed in a
+subprocess with ``program_input`` as stdin. Every run is bounded by:
+    - CPU time (RLIMIT_CPU)
+    - memory (RLIMIT_AS, or RLIMIT_DATA for runtimes that reserve large
+      virtual address ranges such as Go and Node.js)
+    - file size (RLIMIT_FSIZE) and no core dumps
+    - total stdout+stderr size (the process is killed past the limit)
+    - wall-clock time (the whole process group is killed)
+
+The child runs in its own session, in an empty temporary directory, with a
+scrubbed environment. This limits resource abuse only; it is NOT isolation.
+The program runs as the server's user with its network access, so it can
+read anything that user can: the repository, ``.env``, the user database
+and the server's own environment (including API keys) via
+``/proc/<ppid>/environ``. Local execution is therefore off unless
+FIXIFOX_SANDBOX_ENABLED=1; only enable it where the server itself is
+isolated (a dedicated container or VM without secrets, or trusted users
+only). When it is off, the "Run" mode falls back to a simulated run.
+
+Python runs on a warm pool of pre-started interpreters that already paid
+for interpreter start-up; a worker receives the code and stdin over its
+control pipe, runs once and exits, and the pool is refilled in the
+background. C, C++, Go and JavaScript are supported when their toolchains
+are installed. Compiled runs get their temporary directory as ``HOME``; Go
+keeps its build cache in a dedicated directory shared by all runs
+(FIXIFOX_SANDBOX_GO_CACHE), so the standard library is compiled only once.
+"""
+import json
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+
+# Running user code is opt-in: see the module docstring
+ENABLED = os.environ.get("FIXIFOX_SANDBOX_ENABLED", "0") == "1"
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, only wall-clock and output limits apply
+    resource = None
+
+
+@dataclass
+class ExecutionLimits:
+    """Resource limits for one run."""
+    cpu_seconds: int = 5
+    memory_mb: int = 256
+    wall_seconds: float = 10.0
+    output_bytes: int = 64 * 1024
+    file_size_mb: int = 10
+
+
+@dataclass
+class ExecutionResult:
+    """Outcome of a run. ``stdout``/``stderr`` hold everything that was streamed."""
+    language: str
+    exit_code: int = None
+    stdout: str = ""
+    stderr: str = ""
+    duration: float = 0.0
+    timed_out: bool = False
+    output_truncated: bool = False
+    compile_error: bool = False
+    notes: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return self.exit_code == 0 and not self.timed_out and not self.compile_error
+
+
+_SAFE_ENV = {
+    "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+    "LANG": "C.UTF-8",
+    "PYTHONIOENCODING": "utf-8",
+    "PYTHONDONTWRITEBYTECODE": "1",
+}
+
+GO_CACHE = os.environ.get("FIXIFOX_SANDBOX_GO_CACHE") or os.path.join(tempfile.gettempdir(), "fixifox-go-cache")
+
+# Extra environment per toolchain; the go command refuses to build without a cache
+# directory and must not try to download another toolchain
+_TOOLCHAIN_ENV = {
+    "go": {"GOCACHE": GO_CACHE, "GOTOOLCHAIN": "local"},
+}
+
+# The warm worker waits for one JSON line on stdin: {"code": ..., "stdin": ...}
+_PYTHON_BOOTSTRAP = r"""
+import io, json, sys, traceback
+request = json.loads(sys.stdin.readline())
+sys.stdin = io.StringIO(request["stdin"])
+sys.argv = ["main.py"]
+namespace = {"__name__": "__main__", "__file__": "main.py", "__builtins__": __builtins__}
+try:
+    exec(compile(request["code"], "main.py", "exec"), namespace)
+except SystemExit:
+    sys.stdout.flush()
+    raise
+except BaseException:
+    traceback.print_exc()
+    sys.stdout.flush()
+    sys.exit(1)
+"""
+
+
+def _limit_setter(limits, memory_resource="RLIMIT_AS"):
+    """Build the ``preexec_fn`` that applies ``limits`` in the child."""
+    def apply():
+        os.setsid()
+        if resource is None:
+            return
+        memory = limits.memory_mb * 1024 * 1024
+        file_size = limits.file_size_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_CPU, (limits.cpu_seconds, limits.cpu_seconds + 1))
+        resource.setrlimit(getattr(resource, memory_resource), (memory, memory))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (file_size, file_size))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    return apply
+
+
+def _spawn(command, limits, cwd, memory_resource="RLIMIT_AS", env=None):
+    return subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        env={**_SAFE_ENV, **(env or {})},
+        preexec_fn=_limit_setter(limits, memory_resource) if os.name == "posix" else None,
+    )
+
+
+def _kill(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, AttributeError, OSError):
+        process.kill()
+
+
+class _PythonWorkerPool:
+    """Keeps ``size`` idle Python interpreters ready to accept one program each."""
+
+    def __init__(self, size, limits):
+        self.size = size
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def _start_worker(self):
+        workdir = tempfile.mkdtemp(prefix="fixifox-run-")
+        process = _spawn([sys.executable, "-I", "-u", "-c", _PYTHON_BOOTSTRAP], self.limits, workdir)
+        return process, workdir
+
+    def _refill(self):
+        while True:
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+            worker = self._start_worker()
+            with self._lock:
+                self._idle.append(worker)
+
+    def acquire(self):
+        """Take a warm worker (or start one if the pool is empty) and refill in the background."""
+        with self._lock:
+            worker = None
+            while self._idle:
+                candidate = self._idle.pop(0)
+                if candidate[0].poll() is None:
+                    worker = candidate
+                    break
+                shutil.rmtree(candidate[1], ignore_errors=True)
+        if worker is None:
+            worker = self._start_worker()
+        threading.Thread(target=self._refill, daemon=True).start()
+        return worker
+
+    def warm_up(self):
+        threading.Thread(target=self._refill, daemon=True).start()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_python_pool():
+    """Return the process-wide warm Python pool (size from FIXIFOX_SANDBOX_WARM_WORKERS)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _PythonWorkerPool(int(os.environ.get("FIXIFOX_SANDBOX_WARM_WORKERS", "2")), ExecutionLimits())
+                _pool.warm_up()
+    return _pool
+
+
+def _stream_process(process, stdin_data, limits, result, started):
+    """Feed stdin and yield ("stdout"|"stderr", text) events until the process ends."""
+    def feed():
+        try:
+            process.stdin.write(stdin_data)
+            process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+    threading.Thread(target=feed, daemon=True).start()
+
+    selector = selectors.DefaultSelector()
+    selector.register(process.stdout, selectors.EVENT_READ, "stdout")
+    selector.register(process.stderr, selectors.EVENT_READ, "stderr")
+    decoders = {"stdout": [], "stderr": []}
+    total = 0
+    deadline = started + limits.wall_seconds
+    try:
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                result.timed_out = True
+                result.notes.append(f"Killed after {limits.wall_seconds:g}s wall-clock limit.")
+                _kill(process)
+                break
+            for key, _ in selector.select(timeout=min(remaining, 0.1)):
+                data = os.read(key.fileobj.fileno(), 4096)
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+                if total + len(data) > limits.output_bytes:
+                    data = data[:max(limits.output_bytes - total, 0)]
+                    result.output_truncated = True
+                total += len(data)
+                text = data.decode("utf-8", errors="replace")
+                decoders[key.data].append(text)
+                if text:
+                    yield key.data, text
+                if result.output_truncated:
+                    result.notes.append(f"Output exceeded {limits.output_bytes} bytes; process killed.")
+                    _kill(process)
+                    return
+    finally:
+        selector.close()
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            _kill(process)
+            process.wait()
+        result.stdout += "".join(decoders["stdout"])
+        result.stderr += "".join(decoders["stderr"])
+        result.exit_code = process.returncode
+        if process.returncode is not None and process.returncode < 0 and not result.timed_out:
+            signal_name = signal.Signals(-process.returncode).name
+            if signal_name == "SIGXCPU" or (signal_name == "SIGKILL" and not result.output_truncated):
+                result.notes.append(f"Terminated by {signal_name} (CPU limit {limits.cpu_seconds}s).")
+            else:
+                result.notes.append(f"Terminated by {signal_name}.")
+
+
+# language -> (source file, compile command or None, run command, memory rlimit)
+_TOOLCHAINS = {
+    "c": ("main.c", ["cc", "-O2", "-o", "main", "main.c", "-lm"], ["./main"], "RLIMIT_AS"),
+    "c++": ("main.cpp", ["c++", "-O2", "-std=c++17", "-o", "main", "main.cpp"], ["./main"], "RLIMIT_AS"),
+    "go": ("main.go", ["go", "build", "-o", "main", "main.go"], ["./main"], "RLIMIT_DATA"),
+    "javascript": ("main.js", None, ["node", "main.js"], "RLIMIT_DATA"),
+}
+
+
+def supports(language):
+    """True when local execution is enabled and ``language`` can be executed on this machine."""
+    if not ENABLED:
+        return False
+    language = language.lower()
+    if language == "python":
+        return True
+    toolchain = _TOOLCHAINS.get(language)
+    if toolchain is None:
+        return False
+    tool = (toolchain[1] or toolchain[2])[0]
+    return shutil.which(tool) is not None
+
+
+def run_code(language, code, stdin="", limits=None):
+    """
+    Execute ``code`` and stream its output.
+
+    Args:
+        language (str): "Python", "C", "C++", "Go" or "JavaScript".
+        code (str): Program source.
+        stdin (str): Data passed to the program's standard input.
+        limits (ExecutionLimits, optional): Resource limits. Defaults to ExecutionLimits().
+
+    Yields:
+        tuple[str, str]: ("stdout" | "stderr", text) as output is produced.
+
+    Returns:
+        ExecutionResult: As the generator's return value (``StopIteration.value``);
+        use ``execute`` to get it directly.
+    """
+    if not ENABLED:
+        raise RuntimeError("Local execution is disabled (set FIXIFOX_SANDBOX_ENABLED=1 to enable it)")
+    limits = limits or ExecutionLimits()
+    language = language.lower()
+    result = ExecutionResult(language=language)
+    started = time.monotonic()
+
+    if language == "python":
+        pool = get_python_pool()
+        if limits == pool.limits:
+            process, workdir = pool.acquire()
+        else:
+            workdir = tempfile.mkdtemp(prefix="fixifox-run-")
+            process = _spawn([sys.executable, "-I", "-u", "-c", _PYTHON_BOOTSTRAP], limits, workdir)
+        payload = (json.dumps({"code": code, "stdin": stdin}) + "\n").encode("utf-8")
+        try:
+            yield from _stream_process(process, payload, limits, result, started)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        result.duration = time.monotonic() - started
+        return result
+
+    if not supports(language):
+        raise ValueError(f"Local execution is not available for {language}")
+
+    source_name, compile_command, run_command, memory_resource = _TOOLCHAINS[language]
+    workdir = tempfile.mkdtemp(prefix="fixifox-run-")
+    env = {"HOME": workdir, **_TOOLCHAIN_ENV.get(language, {})}
+    try:
+        with open(os.path.join(workdir, source_name), "w", encoding="utf-8") as source_file:
+            source_file.write(code)
+
+        if compile_command:
+            # Compilers write object files and package archives far beyond the run's file limit
+            compile_limits = ExecutionLimits(cpu_seconds=60, memory_mb=2048, wall_seconds=60,
+                                             output_bytes=limits.output_bytes, file_size_mb=512)
+            compiler = _spawn(compile_command, compile_limits, workdir, "RLIMIT_DATA", env)
+            compile_result = ExecutionResult(language=language)
+            for stream_name, text in _stream_process(compiler, b"", compile_limits, compile_result, time.monotonic()):
+                yield "stderr", text
+            if compile_result.exit_code != 0:
+                result.compile_error = True
+                result.exit_code = compile_result.exit_code
+                result.stderr = compile_result.stdout + compile_result.stderr
+                result.notes.extend(compile_result.notes)
+                result.duration = time.monotonic() - started
+                return result
+
+        process = _spawn(run_command, limits, workdir, memory_resource, env)
+        yield from _stream_process(process, stdin.encode("utf-8"), limits, result, time.monotonic())
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    result.duration = time.monotonic() - started
+    return result
+
+
+def execute(language, code, stdin="", limits=None, on_output=None):
+    """
+    Run ``code`` to completion.
+
+    Args:
+        on_output (callable, optional): Called as ``on_output(stream_name, text)``
+            for every piece of output as it arrives.
+
+    Returns:
+        ExecutionResult
+    """
+    events = run_code(language, code, stdin, limits)
+    while True:
+        try:
+            stream_name, text = next(events)
+        except StopIteration as finished:
+            return finished.value
+        if on_output is not None:
+            on_output(stream_name, text)
@@ -0,0 +1,361 @@
+"""
+Local static security pre-scanner.
+
+Runs before (or instead of) the LLM security scan. Python code is analysed
+through its AST with import aliases resolved (``import subprocess as sp`` is
+still caught); any other language, or Python that does not parse, falls back
+to line-based regex rules. Findings use the same issue schema as the LLM
+report (type, severity, description, explanation, fix) plus the line number.
+
+``focus_excerpt`` turns the findings into a line-numbered excerpt of only the
+flagged regions (with context), which is what gets sent to the model for
+large inputs instead of the whole file.
+"""
+import ast
+import re
+from dataclasses import asdict, dataclass
+
+SEVERITY_ORDER = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
+
+SECRET_NAME_PATTERN = re.compile(r"(?i)(passw(or)?d|passwd|secret|api_?key|access_?key|private_?key|auth_?token|token)")
+PASSWORD_CONTEXT_PATTERN = re.compile(r"(?i)passw(or)?d|passwd|pwd")
+
+
+@dataclass
+class Finding:
+    """One issue found by the static scanner."""
+    rule_id: str
+    type: str
+    severity: str
+    line: int
+    description: str
+    explanation: str
+    fix: str
+
+    def to_issue(self):
+        """Convert to the JSON report issue schema used by ``run_security_scan``."""
+        issue = asdict(self)
+        issue["source"] = "static analysis"
+        return issue
+
+
+# rule_id -> (type, severity, explanation, fix)
+RULES = {
+    "eval-exec": (
+        "Code Injection", "High",
+        "eval()/exec() run arbitrary Python code. If any part of the argument comes from user input, an attacker can execute code on the server.",
+        "Avoid eval/exec. Use ast.literal_eval() for literals, or a dispatch table of allowed operations.",
+    ),
+    "shell-command": (
+        "Command Injection", "High",
+        "Passing a command string to a shell lets metacharacters such as ; | && inject extra commands.",
+        "Call subprocess.run([...], shell=False) with an argument list, and validate any user-supplied values.",
+    ),
+    "sql-formatting": (
+        "SQL Injection", "Critical",
+        "Building SQL with string formatting or concatenation lets user input change the query structure.",
+        "Use parameterized queries, e.g. cursor.execute(\"SELECT * FROM users WHERE id = ?\", (user_id,)).",
+    ),
+    "insecure-deserialization": (
+        "Insecure Deserialization", "High",
+        "pickle/marshal/dill can execute arbitrary code while loading untrusted data.",
+        "Only deserialize trusted data, or switch to a data-only format such as JSON.",
+    ),
+    "yaml-load": (
+        "Insecure Deserialization", "High",
+        "yaml.load() without a safe Loader can construct arbitrary Python objects.",
+        "Use yaml.safe_load(data) or yaml.load(data, Loader=yaml.SafeLoader).",
+    ),
+    "weak-hash": (
+        "Weak Cryptography", "Medium",
+        "MD5 and SHA-1 are broken for collision resistance and must not be used for security purposes.",
+        "Use hashlib.sha256()/sha3_256() for integrity, and hmac.compare_digest() for comparisons.",
+    ),
+    "password-hash": (
+        "Insecure Password Storage", "High",
+        "A single unsalted fast hash lets attackers crack leaked password hashes with precomputed tables and GPUs.",
+        "Use a salted, slow KDF: hashlib.scrypt(password, salt=os.urandom(16), n=2**14, r=8, p=1) or hashlib.pbkdf2_hmac.",
+    ),
+    "hardcoded-secret": (
+        "Hardcoded Credentials", "High",
+        "Secrets committed to source code leak through version control, logs and screenshots.",
+        "Load secrets from environment variables or a secrets manager, e.g. os.environ[\"API_KEY\"].",
+    ),
+    "tls-verify-disabled": (
+        "Insecure Transport", "Medium",
+        "verify=False disables TLS certificate checks and allows man-in-the-middle attacks.",
+        "Remove verify=False, or point verify to a trusted CA bundle.",
+    ),
+    "insecure-tempfile": (
+        "Insecure File Operation", "Low",
+        "tempfile.mktemp() is race-prone: another process can create the file first.",
+        "Use tempfile.mkstemp() or tempfile.NamedTemporaryFile().",
+    ),
+    "debug-enabled": (
+        "Security Misconfiguration", "Medium",
+        "Running with debug=True exposes an interactive debugger that allows code execution.",
+        "Disable debug mode in production, e.g. app.run(debug=False).",
+    ),
+    "unsafe-c-function": (
+        "Memory Safety", "High",
+        "gets/strcpy/strcat/sprintf do not check buffer sizes and can overflow the destination.",
+        "Use bounded alternatives: fgets, strncpy/strlcpy, strncat, snprintf.",
+    ),
+    "dom-xss": (
+        "Cross-Site Scripting", "High",
+        "Writing untrusted data as HTML lets attackers inject scripts into the page.",
+        "Use textContent instead of innerHTML, or sanitize the HTML first.",
+    ),
+}
+
+SHELL_FUNCTIONS = {
+    "subprocess.call", "subprocess.run", "subprocess.Popen", "subprocess.check_output",
+    "subprocess.check_call",
+}
+ALWAYS_SHELL_FUNCTIONS = {"os.system", "os.popen", "subprocess.getoutput", "subprocess.getstatusoutput", "commands.getoutput"}
+DESERIALIZATION_FUNCTIONS = {
+    "pickle.loads", "pickle.load", "cPickle.loads", "cPickle.load", "dill.loads", "dill.load",
+    "marshal.loads", "marshal.load", "shelve.open", "jsonpickle.decode",
+}
+WEAK_HASHES = {"hashlib.md5", "hashlib.sha1"}
+FAST_HASHES = {
+    "hashlib.sha224", "hashlib.sha256", "hashlib.sha384", "hashlib.sha512",
+    "hashlib.sha3_256", "hashlib.sha3_512", "hashlib.blake2b", "hashlib.blake2s",
+}
+SQL_METHODS = {"execute", "executemany", "executescript", "raw", "read_sql", "read_sql_query"}
+SQL_KEYWORDS = re.compile(r"(?i)\b(select|insert|update|delete|replace|create|drop|alter)\b")
+
+# (rule_id, pattern) applied line by line when the AST is not available
+REGEX_RULES = [
+    # Bare calls only: ``child_process.exec(`` is a shell command and ``regex.exec(`` is harmless
+    ("eval-exec", re.compile(r"(?<![\w.])(eval|exec)\s*\(")),
+    ("shell-command", re.compile(r"\b(os\.system|os\.popen|Runtime\.getRuntime\(\)\.exec|child_process\.exec(Sync)?|shell_exec|passthru|system|popen)\s*\(|shell\s*=\s*True")),
+    ("sql-formatting", re.compile(r"(?i)[\"'`]\s*(select|insert|update|delete)\b[^\"'`]*[\"'`]\s*(\+|%|\.\s*format\b)|\$\{[^}]*\}[^`]*\b(from|where|values)\b")),
+    ("insecure-deserialization", re.compile(r"\b(pickle|cPickle|dill|marshal)\.loads?\s*\(|\bunserialize\s*\(|ObjectInputStream\b")),
+    ("yaml-load", re.compile(r"\byaml\.load\s*\((?![^)]*SafeLoader)")),
+    ("weak-hash", re.compile(r"(?i)\b(md5|sha1)\s*\(|MessageDigest\.getInstance\(\s*\"(MD5|SHA-?1)\"")),
+    ("unsafe-c-function", re.compile(r"\b(gets|strcpy|strcat|sprintf)\s*\(")),
+    ("dom-xss", re.compile(r"\.(innerHTML|outerHTML)\s*=|document\.write\s*\(|dangerouslySetInnerHTML")),
+    ("tls-verify-disabled", re.compile(r"verify\s*=\s*False|rejectUnauthorized\s*:\s*false|InsecureSkipVerify\s*:\s*true")),
+]
+SECRET_VALUE_PATTERNS = [
+    re.compile(r"(?i)\b[\w.]*(passw(or)?d|passwd|secret|api_?key|access_?key|auth_?token)\w*\s*[:=]\s*[\"'][^\"'\s]{4,}[\"']"),
+    re.compile(r"\bAKIA[0-9A-Z]{16}\b"),
+    re.compile(r"\bAIza[0-9A-Za-z_\-]{35}\b"),
+    re.compile(r"\bgsk_[A-Za-z0-9]{20,}\b"),
+    re.compile(r"\bsk-[A-Za-z0-9]{20,}\b"),
+    re.compile(r"-----BEGIN (RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----"),
+]
+PLACEHOLDER_VALUES = re.compile(r"(?i)^(x+|\*+|changeme|your[_\- ].*|<.*>|\$\{.*\}|example|dummy|test|none|null)$")
+
+
+def _finding(rule_id, line, description):
+    rule_type, severity, explanation, fix = RULES[rule_id]
+    return Finding(rule_id, rule_type, severity, line, description, explanation, fix)
+
+
+class _PythonScanner(ast.NodeVisitor):
+    """AST visitor implementing the Python rules."""
+
+    def __init__(self):
+        self.findings = []
+        self.aliases = {}
+        self._functions = []
+
+    def _qualname(self, node):
+        if isinstance(node, ast.Name):
+            return self.aliases.get(node.id, node.id)
+        if isinstance(node, ast.Attribute):
+            base = self._qualname(node.value)
+            return f"{base}.{node.attr}" if base else node.attr
+        return None
+
+    def _add(self, rule_id, node, description):
+        self.findings.append(_finding(rule_id, getattr(node, "lineno", 1), description))
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.aliases[alias.asname or alias.name.split(".")[0]] = alias.name if alias.asname else alias.name.split(".")[0]
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}" if node.module else alias.name
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node):
+        self._functions.append(node)
+        self.generic_visit(node)
+        self._functions.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def _in_password_context(self, call):
+        if self._functions:
+            function = self._functions[-1]
+            if PASSWORD_CONTEXT_PATTERN.search(function.name):
+                return True
+        return any(
+            isinstance(n, ast.Name) and PASSWORD_CONTEXT_PATTERN.search(n.id)
+            for arg in call.args for n in ast.walk(arg)
+        )
+
+    def visit_Call(self, node):
+        name = self._qualname(node.func) or ""
+        keywords = {kw.arg: kw.value for kw in node.keywords if kw.arg}
+
+        if name in ("eval", "exec"):
+            self._add("eval-exec", node, f"Call to {name}() executes dynamically built code.")
+        elif name in ALWAYS_SHELL_FUNCTIONS:
+            self._add("shell-command", node, f"{name}() runs its argument through the system shell.")
+        elif name in SHELL_FUNCTIONS:
+            shell = keywords.get("shell")
+            if isinstance(shell, ast.Constant) and shell.value is True:
+                self._add("shell-command", node, f"{name}() is called with shell=True.")
+        elif name in DESERIALIZATION_FUNCTIONS:
+            self._add("insecure-deserialization", node, f"{name}() deserializes data that may be untrusted.")
+        elif name in ("yaml.load", "yaml.load_all", "yaml.unsafe_load", "yaml.full_load"):
+            loader = self._qualname(keywords["Loader"]) if "Loader" in keywords else ""
+            if name == "yaml.unsafe_load" or not loader or "Safe" not in loader:
+                self._add("yaml-load", node, f"{name}() is called without yaml.SafeLoader.")
+        elif name in WEAK_HASHES or (name == "hashlib.new" and node.args
+                                     and isinstance(node.args[0], ast.Constant)
+                                     and str(node.args[0].value).lower() in ("md5", "sha1")):
+            self._add("weak-hash", node, f"{name}() uses a broken hash algorithm.")
+        elif name in FAST_HASHES and self._in_password_context(node):
+            self._add("password-hash", node, f"Passwords are hashed with a single unsalted {name.split('.')[-1]}() call.")
+        elif name == "tempfile.mktemp":
+            self._add("insecure-tempfile", node, "tempfile.mktemp() creates a predictable temporary file name.")
+        elif name.split(".")[-1] in SQL_METHODS and node.args and self._is_formatted_sql(node.args[0]):
+            self._add("sql-formatting", node, f"SQL passed to {name.split('.')[-1]}() is built with string formatting.")
+
+        verify = keywords.get("verify")
+        if isinstance(verify, ast.Constant) and verify.value is False:
+            self._add("tls-verify-disabled", node, f"{name or 'Request'}() is called with verify=False.")
+        debug = keywords.get("debug")
+        if name.endswith(".run") and isinstance(debug, ast.Constant) and debug.value is True:
+            self._add("debug-enabled", node, f"{name}() is started with debug=True.")
+        self.generic_visit(node)
+
+    def _is_formatted_sql(self, node):
+        if isinstance(node, ast.JoinedStr):
+            text = "".join(v.value for v in node.values if isinstance(v, ast.Constant) and isinstance(v.value, str))
+            return bool(SQL_KEYWORDS.search(text))
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Mod, ast.Add)):
+            return any(
+                isinstance(n, ast.Constant) and isinstance(n.value, str) and SQL_KEYWORDS.search(n.value)
+                for n in ast.walk(node)
+            )
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format":
+            base = node.func.value
+            return isinstance(base, ast.Constant) and isinstance(base.value, str) and bool(SQL_KEYWORDS.search(base.value))
+        return False
+
+    def _check_secret(self, target, value, node):
+        name = target.id if isinstance(target, ast.Name) else getattr(target, "attr", None)
+        if (name and SECRET_NAME_PATTERN.search(name) and isinstance(value, ast.Constant)
+                and isinstance(value.value, str) and len(value.value) >= 4
+                and not PLACEHOLDER_VALUES.match(value.value)):
+            self._add("hardcoded-secret", node, f"'{name}' is assigned a hardcoded string literal.")
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            self._check_secret(target, node.value, node)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node):
+        if node.value is not None:
+            self._check_secret(node.target, node.value, node)
+        self.generic_visit(node)
+
+
+def _scan_secrets_by_value(lines, findings, skip_assignments):
+    seen = {(f.line, f.rule_id) for f in findings}
+    for number, line in enumerate(lines, 1):
+        for index, pattern in enumerate(SECRET_VALUE_PATTERNS):
+            if index == 0 and skip_assignments:
+                continue  # Name-based detection is done precisely on the AST
+            if pattern.search(line) and (number, "hardcoded-secret") not in seen:
+                findings.append(_finding("hardcoded-secret", number, "A credential-like value is hardcoded in the source."))
+                seen.add((number, "hardcoded-secret"))
+                break
+
+
+def _scan_with_regex(lines):
+    findings = []
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if stripped.startswith(("#", "//", "*", "/*")):
+            continue
+        for rule_id, pattern in REGEX_RULES:
+            if pattern.search(line):
+                findings.append(_finding(rule_id, number, f"Line {number} matches the '{rule_id}' rule: {stripped[:80]}"))
+    return findings
+
+
+def scan_code(code, language=None):
+    """
+    Run every local rule over ``code``.
+
+    Args:
+        code (str): Source code to scan.
+        language (str, optional): Language name. Python (or unknown language
+            that parses as Python) is scanned via the AST; everything else
+            with regex rules.
+
+    Returns:
+        list[Finding]: Findings sorted by severity, then line.
+    """
+    lines = code.splitlines()
+    findings = None
+    if language is None or language.lower() == "python":
+        try:
+            scanner = _PythonScanner()
+            scanner.visit(ast.parse(code))
+            findings = scanner.findings
+            _scan_secrets_by_value(lines, findings, skip_assignments=True)
+        except (SyntaxError, ValueError, RecursionError):
+            findings = None
+    if findings is None:
+        findings = _scan_with_regex(lines)
+        _scan_secrets_by_value(lines, findings, skip_assignments=False)
+
+    findings.sort(key=lambda f: (SEVERITY_ORDER.get(f.severity, 9), f.line))
+    return findings
+
+
+def flagged_regions(findings, total_lines, context=5):
+    """
+    Merge the lines around every finding into non-overlapping regions.
+
+    Returns:
+        list[tuple[int, int]]: Inclusive, 1-based (start, end) line ranges.
+    """
+    regions = []
+    for line in sorted({f.line for f in findings}):
+        start, end = max(1, line - context), min(total_lines, line + context)
+        if regions and start <= regions[-1][1] + 1:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def focus_excerpt(code, findings, context=5):
+    """
+    Build a line-numbered excerpt containing only the flagged regions.
+
+    Returns:
+        str: Excerpt with "... lines a-b omitted ..." markers between regions.
+    """
+    lines = code.splitlines()
+    parts = []
+    previous_end = 0
+    for start, end in flagged_regions(findings, len(lines), context):
+        if start > previous_end + 1:
+            parts.append(f"... lines {previous_end + 1}-{start - 1} omitted ...")
+        parts.extend(f"{number:>5} | {lines[number - 1]}" for number in range(start, end + 1))
+        previous_end = end
+    if previous_end < len(lines):
+        parts.append(f"... lines {previous_end + 1}-{len(lines)} omitted ...")
+    return "\n".join(parts)
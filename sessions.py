@@ -0,0 +1,234 @@
+"""
+Signed session tokens for FixiFox logins.
+
+After a successful login the user gets a token
+``<payload>.<signature>`` where the payload (base64 JSON) holds the
+username, a random session id and the expiry time, and the signature is an
+HMAC-SHA256 over the payload with a server secret. Validating a token needs
+no database access and no password hash: the signature, expiry and the
+revocation list are checked, and tokens that passed are remembered in an
+in-memory LRU so page reloads are answered with one dictionary lookup.
+
+Revoked session ids (logout) are kept in memory and persisted in the user
+store, so a revocation survives restarts until the token would have
+expired anyway.
+
+The app carries the token in the page URL (Streamlit has no server-side
+cookies), where it can leak through browser history, shared links and
+Referer headers. Tokens are therefore short-lived and renewed while the
+user is active (``renew``). They can also be bound to the browser: a
+hash of its User-Agent and Accept-Language headers is signed into the
+token, and the token is rejected when another browser presents it.
+
+Configuration (environment variables):
+    FIXIFOX_SESSION_SECRET        HMAC key. When unset a random key is used
+                                  and sessions do not survive a restart.
+    FIXIFOX_SESSION_TTL           Token lifetime in seconds (default 1800);
+                                  active sessions are renewed after half of it
+    FIXIFOX_SESSION_CACHE_SIZE    Validated tokens kept in memory (default 1024)
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+from user_store import get_user_store
+
+logger = logging.getLogger("fixifox.sessions")
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _binding_hash(binding):
+    return _b64encode(hashlib.sha256(binding.encode("utf-8")).digest()[:12]) if binding else None
+
+
+class SessionManager:
+    """
+    Issues, validates and revokes signed session tokens.
+
+    Args:
+        secret (bytes | str, optional): HMAC key. Defaults to FIXIFOX_SESSION_SECRET.
+        ttl (float, optional): Token lifetime in seconds.
+        cache_size (int, optional): Size of the validated-token LRU.
+        store (UserStore, optional): Persists revocations. None keeps them in memory only.
+    """
+
+    def __init__(self, secret=None, ttl=None, cache_size=None, store=None):
+        secret = secret or os.environ.get("FIXIFOX_SESSION_SECRET")
+        if not secret:
+            logger.warning("FIXIFOX_SESSION_SECRET is not set; sessions will not survive a restart.")
+            secret = secrets.token_bytes(32)
+        self._secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.ttl = ttl or float(os.environ.get("FIXIFOX_SESSION_TTL", "1800"))
+        self.cache_size = cache_size or int(os.environ.get("FIXIFOX_SESSION_CACHE_SIZE", "1024"))
+        self._store = store
+        self._lock = threading.Lock()
+        self._validated = OrderedDict()  # token -> (username, session_id, expires_at, binding hash)
+        self._revoked = store.revoked_sessions(time.time()) if store is not None else {}
+
+    def _sign(self, payload):
+        return _b64encode(hmac.new(self._secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, username, binding=None):
+        """
+        Create a token for ``username``.
+
+        Args:
+            username (str): The signed-in user.
+            binding (str, optional): Browser identity (e.g. its User-Agent) the
+                token is bound to; ``validate`` must then be given the same value.
+
+        Returns:
+            str: The signed token.
+        """
+        return self._issue(username, binding, secrets.token_urlsafe(12))
+
+    def _issue(self, username, binding, session_id):
+        claims = {"u": username, "sid": session_id, "exp": int(time.time() + self.ttl)}
+        bound = _binding_hash(binding)
+        if bound:
+            claims["b"] = bound
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        token = f"{payload}.{self._sign(payload)}"
+        self._remember(token, (username, claims["sid"], claims["exp"], bound))
+        metrics.increment("sessions_issued")
+        return token
+
+    def _remember(self, token, session):
+        with self._lock:
+            self._validated[token] = session
+            self._validated.move_to_end(token)
+            while len(self._validated) > self.cache_size:
+                self._validated.popitem(last=False)
+
+    def _decode(self, token):
+        """
+        Return ``(username, session_id, expires_at, binding hash)`` for a
+        correctly signed token, else None.
+        """
+        # Tokens only ever contain base64url characters and a dot; anything
+        # else (e.g. a crafted ``?session=é.x``) is rejected before hashing
+        if not isinstance(token, str) or not token.isascii():
+            return None
+        try:
+            payload, signature = token.split(".")
+        except ValueError:
+            return None
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+            return claims["u"], claims["sid"], float(claims["exp"]), claims.get("b")
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def validate(self, token, binding=None):
+        """
+        Check a token.
+
+        Args:
+            token (str): The token presented by the browser.
+            binding (str, optional): The presenting browser's identity (see ``issue``).
+
+        Returns:
+            str | None: The username, or None if the token is invalid,
+            expired, revoked or bound to another browser.
+        """
+        session = self._check(token, binding)
+        return session[0] if session is not None else None
+
+    def renew(self, token, binding=None):
+        """
+        Sliding expiry for active users.
+
+        Returns:
+            str | None: ``token`` itself while more than half of its lifetime
+            is left, a fresh token for the same session after that (so
+            logging out revokes both), or None if ``token`` is not valid.
+        """
+        session = self._check(token, binding)
+        if session is None:
+            return None
+        if session[2] - time.time() > self.ttl / 2:
+            return token
+        return self._issue(session[0], binding, session[1])
+
+    def _check(self, token, binding):
+        if not token:
+            return None
+        now = time.time()
+        with self._lock:
+            session = self._validated.get(token)
+            if session is not None:
+                self._validated.move_to_end(token)
+        result = "cache_hit"
+        if session is None:
+            session = self._decode(token)
+            if session is None:
+                metrics.increment("session_validations", result="invalid")
+                return None
+            result = "verified"
+            self._remember(token, session)
+
+        username, session_id, expires_at, bound = session
+        if expires_at <= now:
+            result = "expired"
+        elif session_id in self._revoked:
+            result = "revoked"
+        elif bound and bound != _binding_hash(binding):
+            # Leaked token (history, shared link, Referer) presented by another browser
+            metrics.increment("session_validations", result="unbound")
+            return None
+        metrics.increment("session_validations", result=result)
+        if result in ("expired", "revoked"):
+            with self._lock:
+                self._validated.pop(token, None)
+            return None
+        return session
+
+    def revoke(self, token):
+        """Invalidate a token (logout). Unknown or malformed tokens are ignored."""
+        session = self._decode(token) if token else None
+        if session is None:
+            return
+        _, session_id, expires_at, _ = session
+        with self._lock:
+            self._revoked[session_id] = expires_at
+            self._validated.pop(token, None)
+            # Forget revocations of sessions that have expired anyway
+            now = time.time()
+            for stale in [sid for sid, expiry in self._revoked.items() if expiry <= now]:
+                del self._revoked[stale]
+        if self._store is not None:
+            self._store.revoke_session(session_id, expires_at)
+        metrics.increment("sessions_revoked")
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager():
+    """Return the process-wide session manager (revocations persisted in the user store)."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                store = get_user_store()
+                store.init_schema()
+                _manager = SessionManager(store=store)
+    return _manager
@@ -0,0 +1,446 @@
+"""
+Token streaming for Groq and Gemini.
+
+``stream_groq_chat`` and ``stream_gemini`` expose both providers through the
+same interface: a generator of text chunks. Entry points wrap that generator
+in a ``TextStream`` so the UI can render tokens as they arrive while the
+entry point still gets to post-process the complete text (code-block
+extraction, bold highlighting, ...) once the stream ends.
+
+With FIXIFOX_HEDGING=1, ``stream_groq_with_fallback`` hedges: when the first
+model has not produced a token by its p95 time to first token, the next
+model is started in parallel and whichever answers first is used.
+"""
+import contextvars
+import io
+import logging
+import os
+import queue
+import threading
+import time
+
+import instrumentation
+import metrics
+import model_router
+from clients import gemini_generate_content, groq_chat_completion
+
+logger = logging.getLogger("fixifox.streaming")
+
+HEDGING = os.environ.get("FIXIFOX_HEDGING", "0") == "1"
+# Hedge deadline while a model has too few first-token samples for a p95
+HEDGE_DEFAULT_DELAY = float(os.environ.get("FIXIFOX_HEDGE_DELAY", "2.0"))
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.25
+
+
+def stream_groq_chat(model, messages, on_open=None, **params):
+    """
+    Stream a Groq chat completion.
+
+    Args:
+        model (str): Groq model id.
+        messages (list): Chat messages.
+        on_open (callable, optional): Called with the provider stream once the
+            request is sent. Its ``close()`` may be called from another thread
+            to abort a read that is waiting for the next chunk.
+        **params: Extra completion parameters (temperature, max_tokens, ...).
+
+    Yields:
+        str: Text chunks as they are produced.
+    """
+    started = time.perf_counter()
+    completion = groq_chat_completion(
+        model=model,
+        messages=messages,
+        stream=True,
+        **params
+    )
+    if on_open is not None:
+        on_open(completion)
+    first = True
+    try:
+        for chunk in completion:
+            usage = instrumentation.usage_of(chunk)
+            if usage is not None:
+                # Groq reports usage on the last chunk
+                instrumentation.note_usage(model, *usage)
+            if chunk.choices:
+                content = chunk.choices[0].delta.content
+                if content:
+                    if first:
+                        model_router.record_first_token(model, time.perf_counter() - started)
+                        first = False
+                    yield content
+    finally:
+        # Closing the generator early (cancelled hedge, stopped UI) releases the HTTP stream
+        close = getattr(completion, "close", None)
+        if close is not None:
+            close()
+
+
+def hedge_delay(model):
+    """Seconds to wait for ``model``'s first token before hedging: its p95, or a default."""
+    stats = model_router.get_model_stats().summary(model)
+    if stats["ttft_samples"] < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, stats["ttft_p95"])
+
+
+def stream_groq_with_fallback(models, messages, hedge=None, **params):
+    """
+    Stream from the first model in ``models`` that starts producing output.
+
+    A model that fails before its first chunk is skipped in favour of the next
+    one. Once output has been yielded, errors are re-raised because the
+    partial answer cannot be taken back.
+
+    Args:
+        models (list): Model ids, preferred first.
+        messages (list): Chat messages.
+        hedge (bool, optional): Hedge slow first tokens (see ``stream_groq_hedged``).
+            Defaults to FIXIFOX_HEDGING.
+        **params: Extra completion parameters.
+
+    Yields:
+        str: Text chunks as they are produced.
+    """
+    if (HEDGING if hedge is None else hedge) and len(models) > 1:
+        yield from stream_groq_hedged(models, messages, **params)
+        return
+    last_error = None
+    for model in models:
+        started = False
+        try:
+            for chunk in stream_groq_chat(model, messages, **params):
+                started = True
+                yield chunk
+            return
+        except Exception as e:
+            if started:
+                raise
+            logger.warning("Model %s failed with error: %s", model, e)
+            last_error = e
+    if last_error is not None:
+        raise last_error
+
+
+def stream_groq_hedged(models, messages, **params):
+    """
+    Stream from ``models`` with at most two attempts in flight.
+
+    The first model starts alone. If it has not produced a chunk within
+    ``hedge_delay`` seconds, the next model is started in parallel (the
+    hedge); the first attempt to produce a chunk wins and every other attempt
+    is cancelled: its provider stream is closed, so a loser that is stalled
+    waiting for a chunk stops at once instead of holding its connection. An
+    attempt that fails before anyone has won is replaced by the next model
+    right away.
+
+    Recorded metrics: ``hedge_requests`` (every call), ``hedges_fired``,
+    ``hedge_wins`` (labelled ``winner=primary|hedge``) and
+    ``hedge_latency_saved_seconds`` (how much later the loser produced its
+    first chunk than the winner, when that chunk arrived before it was closed).
+
+    Yields:
+        str: Text chunks of the winning attempt.
+    """
+    events = queue.Queue()
+    state = {"winner_ttft": None}
+    attempts = []
+    responses = {}
+    started = time.perf_counter()
+
+    def close(response):
+        if hasattr(response, "close"):
+            response.close()
+
+    def opened(index, cancel, response):
+        responses[index] = response
+        if cancel.is_set():
+            # Lost the race while the request was being sent
+            close(response)
+
+    def run(index, model, cancel):
+        chunks = stream_groq_chat(model, messages, on_open=lambda response: opened(index, cancel, response), **params)
+        try:
+            for chunk in chunks:
+                ttft = time.perf_counter() - started
+                if cancel.is_set():
+                    # Lost the race: the loser's own first chunk tells how much the hedge saved
+                    if state["winner_ttft"] is not None:
+                        metrics.observe("hedge_latency_saved_seconds", max(0.0, ttft - state["winner_ttft"]))
+                    return
+                events.put((index, "chunk", chunk))
+            events.put((index, "done", None))
+        except Exception as e:
+            # Includes the read error of a loser whose stream was closed; it is ignored
+            events.put((index, "error", e))
+        finally:
+            chunks.close()
+
+    def launch():
+        index = len(attempts)
+        cancel = threading.Event()
+        attempts.append(cancel)
+        # The attempt reports into the caller's request record
+        threading.Thread(
+            target=contextvars.copy_context().run, args=(run, index, models[index], cancel),
+            name="fixifox-hedge", daemon=True
+        ).start()
+
+    def cancel_others(keep=None):
+        for other, cancel in enumerate(attempts):
+            if other != keep:
+                cancel.set()
+                close(responses.get(other))
+
+    metrics.increment("hedge_requests")
+    launch()
+    live = 1
+    hedge_at = started + hedge_delay(models[0])
+    winner = None
+    last_error = None
+    try:
+        while True:
+            timeout = None
+            if winner is None and hedge_at is not None and len(attempts) < len(models):
+                timeout = max(0.0, hedge_at - time.perf_counter())
+            try:
+                index, kind, payload = events.get(timeout=timeout)
+            except queue.Empty:
+                hedge_at = None
+                metrics.increment("hedges_fired")
+                launch()
+                live += 1
+                continue
+
+            if winner is None:
+                if kind == "chunk":
+                    winner = index
+                    state["winner_ttft"] = time.perf_counter() - started
+                    metrics.increment("hedge_wins", winner="primary" if index == 0 else "hedge")
+                    cancel_others(keep=index)
+                elif kind == "error":
+                    logger.warning("Model %s failed with error: %s", models[index], payload)
+                    last_error = payload
+                    live -= 1
+                    if len(attempts) < len(models):
+                        launch()
+                        live += 1
+                    elif live == 0:
+                        raise last_error
+                    continue
+                else:
+                    # Finished without output: treat like the sequential fallback does
+                    return
+            if index != winner:
+                continue
+            if kind == "chunk":
+                yield payload
+            elif kind == "error":
+                raise payload
+            else:
+                return
+    finally:
+        # Also reached when the consumer stops reading: cancel whatever is still running
+        cancel_others()
+
+
+def stream_gemini(model_name, prompt, generation_config=None, safety_settings=None):
+    """
+    Stream a Gemini ``generate_content`` call.
+
+    Args:
+        model_name (str): Gemini model name.
+        prompt (str): Prompt text.
+        generation_config (dict, optional): Generation parameters.
+        safety_settings (list, optional): Safety settings.
+
+    Yields:
+        str: Text chunks as they are produced.
+    """
+    response = gemini_generate_content(
+        model_name,
+        prompt,
+        generation_config=generation_config,
+        safety_settings=safety_settings,
+        stream=True
+    )
+    usage = None
+    for chunk in response:
+        usage = instrumentation.usage_of(chunk) or usage
+        text = getattr(chunk, "text", "")
+        if text:
+            yield text
+    if usage is not None:
+        # Gemini's usage is cumulative; the last chunk holds the totals
+        instrumentation.note_usage(model_name, *usage)
+
+
+class TextStream:
+    """
+    Iterable of text chunks with a post-processed final result.
+
+    Iterating yields raw chunks. Once the underlying generator is exhausted,
+    ``postprocess`` is applied to the full text to produce ``result()``.
+    If the generator raises, ``on_error`` turns the exception into a message
+    which is yielded as the last chunk and becomes the result; ``failed`` is
+    then True.
+
+    Args:
+        chunks (iterable): Source of text chunks.
+        postprocess (callable, optional): Applied to the full text at the end.
+        on_error (callable, optional): Maps an exception to an error message.
+            If omitted, exceptions propagate to the caller.
+    """
+
+    def __init__(self, chunks, postprocess=None, on_error=None):
+        self._chunks = chunks
+        self._postprocess = postprocess
+        self._on_error = on_error
+        self._parts = []
+        self._callbacks = []
+        self._result = None
+        self.done = False
+        self.failed = False
+
+    @classmethod
+    def from_text(cls, text):
+        """Wrap an already complete response (e.g. a cache hit) as a one-chunk stream."""
+        return cls([text] if text else [])
+
+    def add_done_callback(self, callback):
+        """Call ``callback(stream)`` once the final result is available."""
+        if self.done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def __iter__(self):
+        if self.done:
+            return
+        try:
+            for chunk in self._chunks:
+                self._parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            if self._on_error is None:
+                raise
+            message = self._on_error(e)
+            self.failed = True
+            self._parts = [message]
+            self._result = message
+            yield message
+        self._finish()
+
+    def _finish(self):
+        if self.done:
+            return
+        if self._result is None:
+            text = "".join(self._parts)
+            self._result = self._postprocess(text) if self._postprocess else text
+        self.done = True
+        for callback in self._callbacks:
+            callback(self)
+        self._callbacks = []
+
+    @property
+    def text(self):
+        """Raw text received so far."""
+        return "".join(self._parts)
+
+    def result(self):
+        """Consume any remaining chunks and return the post-processed text."""
+        if not self.done:
+            for _ in self:
+                pass
+        return self._result
+
+    def close(self):
+        """Stop reading from the provider (closes the underlying generator)."""
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+
+class StreamRenderer:
+    """
+    Throttled incremental renderer for streamed markdown.
+
+    Chunks are appended to a StringIO buffer (no quadratic string
+    concatenation) and the placeholder is only re-rendered when
+    ``interval`` seconds have passed or ``max_bytes`` of new text are
+    pending, plus once more on ``close()``. Render, chunk and byte counts are
+    recorded in the metrics registry under the ``feature`` label.
+
+    Args:
+        placeholder: Streamlit placeholder (``st.empty()``) to render into.
+        feature (str): Label used for the metrics.
+        interval (float): Minimum seconds between two renders.
+        max_bytes (int): Pending characters that force a render regardless of time.
+        render (callable, optional): Called with the text to display. Defaults
+            to ``placeholder.markdown``.
+    """
+
+    def __init__(self, placeholder, feature="stream", interval=None, max_bytes=None, render=None):
+        self.placeholder = placeholder
+        self.render = render or placeholder.markdown
+        self.feature = feature
+        self.interval = interval if interval is not None else float(os.environ.get("FIXIFOX_STREAM_RENDER_INTERVAL", "0.075"))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.environ.get("FIXIFOX_STREAM_RENDER_BYTES", "2048"))
+        self._buffer = io.StringIO()
+        self._pending = 0
+        self._last_render = time.monotonic()
+        self.renders = 0
+        self.chunks = 0
+
+    def write(self, chunk):
+        """Buffer ``chunk`` and render if the time or size budget is used up."""
+        if not chunk:
+            return
+        self._buffer.write(chunk)
+        self._pending += len(chunk)
+        self.chunks += 1
+        if self._pending >= self.max_bytes or time.monotonic() - self._last_render >= self.interval:
+            self.flush()
+
+    def flush(self, text=None):
+        """Render the buffered text (or ``text`` if given) now."""
+        self.render(self._buffer.getvalue() if text is None else text)
+        self._pending = 0
+        self._last_render = time.monotonic()
+        self.renders += 1
+
+    def close(self, final_text=None):
+        """
+        Final flush. Renders ``final_text`` if it differs from the buffer,
+        otherwise only renders when there is unflushed output.
+        """
+        if final_text is not None and final_text != self._buffer.getvalue():
+            self.flush(final_text)
+        elif self._pending:
+            self.flush()
+        metrics.increment("stream_renders", self.renders, feature=self.feature)
+        metrics.increment("stream_chunks", self.chunks, feature=self.feature)
+        metrics.increment("stream_chars", self._buffer.tell(), feature=self.feature)
+        metrics.increment("streams_completed", feature=self.feature)
+
+    @property
+    def text(self):
+        """Everything written so far."""
+        return self._buffer.getvalue()
+
+
+def render_stream(stream, placeholder, feature="stream"):
+    """
+    Render ``stream`` into a Streamlit placeholder as chunks arrive.
+
+    Returns:
+        str: The post-processed final text.
+    """
+    renderer = StreamRenderer(placeholder, feature=feature)
+    for chunk in stream:
+        renderer.write(chunk)
+    result = stream.result()
+    renderer.close(result)
+    return result
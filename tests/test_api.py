@@ -0,0 +1,63 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+import api
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = api.create_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, path, body):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    connection.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    connection.close()
+    return response.status, payload
+
+
+@pytest.mark.parametrize("path, body, message", [
+    ("/v1/fix", {"code": 123}, "field code must be a string"),
+    ("/v1/generate", {"text": "sort a list", "temperature": "hot"}, "field temperature must be a number"),
+    ("/v1/generate", {"text": "sort a list", "max_tokens": True}, "field max_tokens must be an integer"),
+    ("/v1/explain", {"code": "x = 1", "is_error": "yes"}, "field is_error must be a boolean"),
+    ("/v1/assist", {"code": "x = 1", "question": "why?", "stream": 1}, "field stream must be a boolean"),
+    ("/v1/scan", {"code": "x = 1", "stream": True}, "/v1/scan does not support streaming"),
+])
+def test_invalid_bodies_are_rejected(server, path, body, message):
+    status, payload = post(server, path, body)
+    assert status == 400
+    assert payload["error"] == message
+
+
+def test_every_field_has_a_type():
+    for endpoint in api.ENDPOINTS.values():
+        for name in endpoint.required + endpoint.optional:
+            assert name in api.FIELD_TYPES
+
+
+def test_nullable_and_numeric_fields():
+    endpoint = api.ENDPOINTS["/v1/generate"]
+    body = {"text": "sort a list", "language": None, "temperature": 0, "max_tokens": 256}
+    assert endpoint.arguments(body) == body
+
+
+def test_generate_streams_tokens(monkeypatch):
+    import ai_features
+
+    def tokens(models, messages, **params):
+        yield from ["```python\n", "print(", "'streamed')", "\n```"]
+
+    monkeypatch.setattr(ai_features, "stream_groq_with_fallback", tokens)
+    result = ai_features.generate_code_from_text("print streamed, test_generate_streams_tokens", stream=True)
+    assert list(result) == ["```python\n", "print(", "'streamed')", "\n```"]
+    assert result.result() == "print('streamed')"
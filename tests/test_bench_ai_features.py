@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import bench_ai_features  # noqa: E402
+from passwords import verify_password_sync  # noqa: E402
+from user_store import UserStore  # noqa: E402
+
+
+def test_seed_users_creates_schema_on_a_fresh_database(tmp_path):
+    store = UserStore(str(tmp_path / "users.db"), pool_size=2)
+    try:
+        bench_ai_features.seed_users(store, 3, "Benchmark123")
+        user = store.get_credentials("bench2")
+        assert user is not None
+        assert verify_password_sync("Benchmark123", user[1])
+    finally:
+        store.close()
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+import chunking
+from chunking import Chunk, is_large_input, map_chunks, map_line, numbered, split_source
+
+
+def python_module(functions, body_lines=20):
+    parts = []
+    for index in range(functions):
+        body = "\n".join(f"    value_{line} = {line}" for line in range(body_lines))
+        parts.append(f"# Helper {index}\ndef function_{index}():\n{body}\n    return value_0\n")
+    return "\n".join(parts)
+
+
+def check_coverage(code, chunks):
+    lines = code.split("\n")
+    assert chunks[0].start_line == 1 and chunks[-1].end_line == len(lines)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start_line == previous.end_line + 1
+    assert "\n".join(chunk.text for chunk in chunks) == code
+
+
+def test_large_input_threshold():
+    assert not is_large_input("x = 1\n" * (chunking.LARGE_INPUT_LINES - 1))
+    assert is_large_input("x = 1\n" * chunking.LARGE_INPUT_LINES)
+
+
+def test_python_is_split_between_definitions_with_their_comments():
+    code = python_module(30)
+    chunks = split_source(code, "Python", max_lines=100)
+    check_coverage(code, chunks)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.text.startswith("# Helper")
+        assert chunk.line_count <= 200
+
+
+def test_brace_languages_are_split_where_depth_returns_to_zero():
+    function = "function f{n}() {{\n  const s = '}}';  // }}\n" + "  work();\n" * 30 + "}}\n"
+    code = "".join(function.format(n=n) for n in range(20))
+    chunks = split_source(code, "JavaScript", max_lines=100)
+    check_coverage(code, chunks)
+    assert all(chunk.text.startswith("function f") for chunk in chunks)
+
+
+def test_a_single_huge_unit_is_cut_at_fixed_intervals():
+    code = "def huge():\n" + "    x = 1\n" * 999
+    chunks = split_source(code, "Python", max_lines=200)
+    check_coverage(code, chunks)
+    assert [chunk.line_count for chunk in chunks][:4] == [200, 200, 200, 200]
+
+
+def test_line_mapping_and_numbering():
+    chunk = Chunk(101, 110, "\n".join(f"line {n}" for n in range(101, 111)))
+    assert map_line(105, chunk) == 105  # already a file line number
+    assert map_line(3, chunk) == 103  # chunk-relative
+    assert map_line(50, chunk) is None
+    assert map_line("n/a", chunk) is None
+    assert numbered(chunk).splitlines()[0] == "  101 | line 101"
+
+
+def test_map_chunks_yields_in_source_order():
+    chunks = [Chunk(n, n, str(n)) for n in range(1, 6)]
+
+    def slow_first(chunk):
+        time.sleep(0.05 if chunk.start_line == 1 else 0)
+        return int(chunk.text) * 10
+
+    assert [(chunk.start_line, result) for chunk, result in map_chunks(chunks, slow_first)] == \
+        [(1, 10), (2, 20), (3, 30), (4, 40), (5, 50)]
+
+
+def test_map_chunks_reraises():
+    def fail(chunk):
+        raise ValueError(chunk.text)
+
+    with pytest.raises(ValueError):
+        list(map_chunks([Chunk(1, 1, "boom")], fail))
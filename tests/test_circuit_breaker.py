@@ -0,0 +1,114 @@
+import pytest
+
+import circuit_breaker
+import clients
+import model_router
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def teardown_function():
+    circuit_breaker.reset_all()
+
+
+def test_opens_after_consecutive_failures_and_probes_after_cooldown(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("groq", "unit", failure_threshold=3, cooldown=30)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure(RuntimeError("boom"))
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] += 30
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_opens_again(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("groq", "unit", failure_threshold=1, cooldown=10)
+    breaker.record_failure()
+    now[0] += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def guarded_errors(model, error, count):
+    def call():
+        raise error
+    for _ in range(count):
+        with pytest.raises(type(error)):
+            clients._guarded("groq", model, call)
+    return circuit_breaker.get_breaker("groq", model)
+
+
+@pytest.mark.parametrize("error", [
+    ProviderError(400, "Please reduce the length of the messages (context_length_exceeded)"),
+    ProviderError(400, "invalid_request_error: 'messages' must be a list"),
+    ProviderError(429, "Rate limit reached for model, please retry in 2s"),
+], ids=["context-length", "bad-request", "rate-limit"])
+def test_request_errors_do_not_open_the_breaker(error):
+    breaker = guarded_errors("breaker-client-error", error, circuit_breaker.FAILURE_THRESHOLD + 1)
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+@pytest.mark.parametrize("error", [
+    ProviderError(503, "Service unavailable"),
+    ProviderError(404, "The model `old-model` does not exist or you do not have access to it."),
+    ProviderError(400, "The model `old-model` has been decommissioned"),
+], ids=["unavailable", "not-found", "decommissioned"])
+def test_model_failures_open_the_breaker(error):
+    breaker = guarded_errors("breaker-model-error", error, circuit_breaker.FAILURE_THRESHOLD)
+    assert breaker.state == OPEN
+
+
+def test_error_rate_opens_the_breaker():
+    breaker = CircuitBreaker("groq", "unit", failure_threshold=100, error_rate_threshold=0.5)
+    for ok in [True, False] * 3 + [False] * 4:
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+    assert breaker.state == OPEN  # 7 failures in 10 calls, never 5 in a row
+
+
+def test_router_skips_open_breakers(monkeypatch):
+    monkeypatch.setattr(model_router, "_stats", model_router.ModelStats())
+    small = "llama-3.1-8b-instant"
+    for _ in range(circuit_breaker.FAILURE_THRESHOLD):
+        circuit_breaker.get_breaker("groq", small).record_failure()
+    assert small not in model_router.route("assistant", "x = 1")
+
+    circuit_breaker.reset_all()
+    assert model_router.route("assistant", "x = 1")[0] == small
+
+
+def test_snapshot_reports_open_breakers(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    breaker = circuit_breaker.get_breaker("groq", "breaker-snapshot")
+    breaker.record_failure(ProviderError(503, "Service unavailable"))
+    for _ in range(circuit_breaker.FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    now[0] += 10
+    snapshot = next(s for s in circuit_breaker.breaker_states() if s["model"] == "breaker-snapshot")
+    assert snapshot["state"] == OPEN
+    assert snapshot["retry_in"] == pytest.approx(circuit_breaker.COOLDOWN - 10)
+    assert snapshot["last_error"] == "Service unavailable"
+    assert snapshot["error_rate"] == 1.0
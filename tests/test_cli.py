@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+import cli
+from cli import GitIgnore, find_files
+
+
+@pytest.mark.parametrize("lines, path, is_dir, expected", [
+    (["*.log"], "app.log", False, True),
+    (["*.log"], "logs/deep/app.log", False, True),
+    (["*.log", "!keep.log"], "keep.log", False, False),
+    (["build/"], "build", True, True),
+    (["build/"], "build", False, None),  # directory-only rule, a file named build
+    (["/dist"], "dist", True, True),
+    (["/dist"], "src/dist", True, None),  # anchored to the .gitignore's directory
+    (["docs/*.md"], "docs/a.md", False, True),
+    (["docs/*.md"], "docs/api/a.md", False, None),
+    (["docs/**/*.md"], "docs/api/a.md", False, True),
+    (["**/fixtures"], "tests/unit/fixtures", True, True),
+    (["file?.[ch]"], "file1.c", False, True),
+    (["# comment", "", "\\#notes"], "#notes", False, True),
+], ids=[
+    "glob", "glob-nested", "negation", "dir-only", "dir-only-file", "anchored", "anchored-nested",
+    "single-star", "single-star-deep", "double-star", "leading-double-star", "class", "comment-escape",
+])
+def test_gitignore_match(lines, path, is_dir, expected):
+    assert GitIgnore(lines).match(path, is_dir) == expected
+
+
+def write(root, path, text=""):
+    target = root / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(text)
+
+
+def test_find_files_respects_nested_gitignores(tmp_path):
+    for path in ("main.py", "README.md", "build/out.py", "generated.py", ".venv/lib/site.py",
+                 "src/app.js", "src/vendor/lib.js", "src/keep.gen.js", "src/skip.gen.js"):
+        write(tmp_path, path)
+    write(tmp_path, ".gitignore", "build/\ngenerated.py\n*.gen.js\n")
+    write(tmp_path, "src/.gitignore", "vendor/\n!keep.gen.js\n")
+
+    assert find_files(str(tmp_path), {".py", ".js"}) == ["main.py", "src/app.js", "src/keep.gen.js"]
+    assert find_files(str(tmp_path), {".py"}, use_gitignore=False) == ["build/out.py", "generated.py", "main.py"]
+
+
+def test_nested_gitignore_only_applies_below_its_directory(tmp_path):
+    write(tmp_path, "a/.gitignore", "*.py\n")
+    write(tmp_path, "a/x.py")
+    write(tmp_path, "b/x.py")
+    assert find_files(str(tmp_path), {".py"}) == ["b/x.py"]
+
+
+def test_load_checkpoint_skips_truncated_lines_and_keeps_the_latest(tmp_path):
+    checkpoint = tmp_path / "state.jsonl"
+    checkpoint.write_text(
+        json.dumps({"path": "a.py", "sha256": "1"}) + "\n"
+        + json.dumps({"path": "a.py", "sha256": "2"}) + "\n"
+        + '{"path": "b.py", "sha'
+    )
+    assert cli.load_checkpoint(str(checkpoint)) == {"a.py": {"path": "a.py", "sha256": "2"}}
+    assert cli.load_checkpoint(str(tmp_path / "missing.jsonl")) == {}
+
+
+def test_write_sarif(tmp_path):
+    records = [{"path": "app.py", "issues": [
+        {"type": "SQL Injection", "severity": "Critical", "line": 3, "description": "Query built from input"},
+        {"type": "Weak Hash", "severity": "low", "explanation": "MD5"},
+    ]}, {"path": "clean.py", "issues": []}]
+    report = tmp_path / "report.sarif"
+    cli.write_sarif(str(report), records)
+
+    run = json.loads(report.read_text())["runs"][0]
+    assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == ["sql-injection", "weak-hash"]
+    first, second = run["results"]
+    assert first["level"] == "error"
+    assert first["locations"][0]["physicalLocation"]["region"] == {"startLine": 3}
+    assert first["message"]["text"] == "Query built from input"
+    assert second["level"] == "note"
+    assert "region" not in second["locations"][0]["physicalLocation"]
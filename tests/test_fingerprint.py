@@ -0,0 +1,43 @@
+import pytest
+
+from fingerprint import fingerprint, generic_tokens, python_tokens
+
+
+def test_python_formatting_comments_docstrings_and_local_names_are_ignored():
+    original = '''
+def add(a, b):
+    """Add two numbers."""
+    return a + b
+'''
+    variant = "def plus(x,y):  # sum\n    return x+y\n"
+    assert fingerprint(original) == fingerprint(variant)
+
+
+def test_python_builtins_attributes_and_operators_are_kept():
+    assert fingerprint("n = len(items) // 2") != fingerprint("n = sum(items) // 2")
+    assert fingerprint("n = len(items) // 2") != fingerprint("n = len(items) / 2")
+    assert fingerprint("path.strip()") != fingerprint("path.split()")
+    assert fingerprint("x = 1") != fingerprint("x = 2")
+
+
+def test_python_tokens_rejects_invalid_python():
+    with pytest.raises(SyntaxError):
+        python_tokens("function f() { return 1; }")
+
+
+def test_declared_names_are_renamed_in_other_languages():
+    original = "function total(items) { // sum\n  let sum = 0;\n  return sum + items.length;\n}"
+    variant = "function count(items) {\n  let acc = 0; /* start */ return acc + items.length;\n}"
+    assert fingerprint(original) == fingerprint(variant)
+    assert generic_tokens("int count = 0;") == ["int", "v0", "=", "0", ";"]
+
+
+def test_other_identifiers_and_operators_are_kept_in_other_languages():
+    assert fingerprint("let n = Math.floor(x);") != fingerprint("let n = Math.ceil(x);")
+    assert fingerprint("while (i <= n) { i++; }") != fingerprint("while (i < n) { i++; }")
+
+
+def test_empty_input_has_no_fingerprint():
+    assert fingerprint("") is None
+    assert fingerprint(None) is None
+    assert fingerprint("   # only a comment\n") is None
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from flow_diagram import python_to_mermaid
+
+CODE = '''def check(n):
+    if n < 0:
+        raise ValueError("neg")
+    for i in range(n):
+        if i == 3:
+            break
+    return helper(n)
+
+def helper(n):
+    return n * 2
+
+x = check(5)
+print(x)
+'''
+
+
+def test_functions_get_subgraphs_and_calls_are_linked():
+    diagram = python_to_mermaid(CODE)
+    lines = [line.strip() for line in diagram.splitlines()]
+    assert lines[0] == "flowchart TD"
+    assert 'subgraph s7["def check(n)"]' in lines
+    assert 'subgraph s13["def helper(n)"]' in lines
+    # Module-level call into check() and check's return into helper()
+    assert "n4 -.-> f1" in lines
+    assert "n12 -.-> f2" in lines
+
+
+def test_branches_and_loops_are_labelled():
+    diagram = python_to_mermaid(CODE)
+    assert 'n8{"if n #lt; 0?"}' in diagram
+    assert 'n8 -->|"Yes"| n9' in diagram
+    assert 'n10 -->|"loop"| n11' in diagram
+    assert 'n10 -->|"done"| n12' in diagram
+    # break leaves the loop
+    assert 'n11 -->|"Yes"| n12' in diagram
+
+
+def test_simple_statements_are_merged():
+    diagram = python_to_mermaid("a = 1\nb = 2\nc = 3\n")
+    process_nodes = re.findall(r'n\d+\["(.*)"\]', diagram)
+    assert process_nodes == ["a = 1; b = 2; c = 3"]
+
+
+def test_labels_are_escaped_and_shortened():
+    diagram = python_to_mermaid('message = "<b>" + "&" * 200 + "' + "x" * 80 + '"\n')
+    label = next(line for line in diagram.splitlines() if "message" in line)
+    assert "<" not in label and "#lt;" in label and "#amp;" in label
+    assert label.endswith('..."]')
+
+
+def test_try_and_match_are_supported():
+    code = '''try:
+    value = load()
+except KeyError:
+    value = None
+finally:
+    close()
+match value:
+    case None:
+        print("missing")
+    case _:
+        print(value)
+'''
+    diagram = python_to_mermaid(code)
+    assert "except KeyError" in diagram
+    assert "case None" in diagram and "case _" in diagram
+
+
+def test_invalid_python_raises_syntax_error():
+    with pytest.raises(SyntaxError):
+        python_to_mermaid("def broken(:")
@@ -0,0 +1,60 @@
+import pytest
+
+import model_router
+from model_router import ModelStats, route
+
+SMALL = "llama-3.1-8b-instant"
+SCOUT = "meta-llama/llama-4-scout-17b-16e-instruct"
+LARGE = "llama-3.3-70b-versatile"
+
+
+@pytest.fixture(autouse=True)
+def stats(monkeypatch):
+    stats = ModelStats()
+    monkeypatch.setattr(model_router, "_stats", stats)
+    return stats
+
+
+def test_small_inputs_prefer_small_models_and_large_inputs_large_ones():
+    assert route("assistant", "x = 1")[0] == SMALL
+    large_input = "x = 1\n" * 2000  # well above SMALL_INPUT_TOKENS
+    assert route("assistant", large_input)[0] == SCOUT  # cheapest large candidate
+    assert route("assistant", large_input)[-1] == SMALL
+
+
+def test_error_prone_models_are_demoted(stats):
+    for _ in range(10):
+        stats.record(SMALL, 0.2, ok=False)
+    assert route("assistant", "x = 1")[-1] == SMALL
+
+
+def test_models_breaking_the_slo_are_demoted(stats):
+    for _ in range(20):
+        stats.record(SMALL, model_router.TASKS["assistant"].slo_p95 + 5)
+    models = route("assistant", "x = 1")
+    assert models[0] != SMALL
+    assert SMALL in models
+
+
+def test_preferred_model_is_tried_first():
+    assert route("assistant", "x = 1", preferred=LARGE)[0] == LARGE
+    assert route("fix", "x = 1", preferred="custom-model")[:1] == ["custom-model"]
+
+
+def test_models_without_enough_context_are_skipped():
+    # gemma2-9b-it has an 8k context window
+    assert "gemma2-9b-it" in route("convert", "x = 1", max_tokens=1000)
+    assert "gemma2-9b-it" not in route("convert", "x = 1", max_tokens=9000)
+
+
+def test_stats_summary():
+    stats = ModelStats(window=4)
+    assert stats.summary("m")["p95"] is None
+    for latency, ok in ((1.0, True), (2.0, True), (3.0, False), (4.0, True), (5.0, True)):
+        stats.record("m", latency, ok)
+    stats.record_first_token("m", 0.5)
+    summary = stats.summary("m")
+    assert (summary["p50"], summary["p95"], summary["calls"]) == (4.0, 5.0, 4)  # the oldest call has left the window
+    assert summary["error_rate"] == 0.25
+    assert summary["ttft_p95"] == 0.5
+    assert stats.models() == ["m"]
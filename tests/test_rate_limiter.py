@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import pytest
+
+import clients
+import rate_limiter
+
+TPM = 6000
+
+
+class StubCompletions:
+    def __init__(self, failures=0):
+        self.failures = failures
+
+    def create(self, model, messages, stream=False, **params):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Rate limit reached, please retry in 0s")
+        usage = SimpleNamespace(prompt_tokens=20, completion_tokens=10)
+        if not stream:
+            return SimpleNamespace(choices=[], usage=usage)
+        chunk = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="ok"))])
+        return iter([chunk, SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=usage))])
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = rate_limiter.RateLimiter(limits={"groq": {"rpm": 1000, "tpm": TPM}}, max_wait=5)
+    monkeypatch.setattr(rate_limiter, "_limiter", limiter)
+    return limiter
+
+
+def use_completions(monkeypatch, completions):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(clients, "get_groq_client", lambda: client)
+
+
+def spent(limiter, model):
+    return TPM - limiter._budget("groq", model).tokens.tokens
+
+
+def test_unused_max_tokens_are_returned(limiter, monkeypatch):
+    use_completions(monkeypatch, StubCompletions())
+    clients.groq_chat_completion("budget-test", [{"role": "user", "content": "hi"}], max_tokens=4000)
+    assert spent(limiter, "budget-test") == pytest.approx(30, abs=1)
+
+
+def test_stream_is_settled_when_read_to_the_end(limiter, monkeypatch):
+    use_completions(monkeypatch, StubCompletions())
+    stream = clients.groq_chat_completion("budget-stream", [{"role": "user", "content": "hi"}],
+                                          max_tokens=4000, stream=True)
+    assert spent(limiter, "budget-stream") > 4000
+    list(stream)
+    assert spent(limiter, "budget-stream") == pytest.approx(30, abs=1)
+
+
+def test_rate_limited_attempt_costs_no_tokens(limiter, monkeypatch):
+    use_completions(monkeypatch, StubCompletions(failures=1))
+    clients.groq_chat_completion("budget-429", [{"role": "user", "content": "hi"}], max_tokens=1000)
+    assert spent(limiter, "budget-429") == pytest.approx(30, abs=1)
+
+
+class ProviderError(Exception):
+    def __init__(self, message, status_code=None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def test_token_bucket_refills_over_time():
+    bucket = rate_limiter.TokenBucket(60, capacity=10)  # one token per second
+    start = bucket.updated
+    bucket.take(10, start)
+    assert bucket.wait_time(3, start) == pytest.approx(3)
+    assert bucket.wait_time(3, start + 2) == pytest.approx(1)
+    assert bucket.wait_time(50, start + 10) == 0  # larger than the bucket: a full one is enough
+    assert rate_limiter.TokenBucket(0).wait_time(10 ** 6, start) == 0
+
+
+def test_acquire_fails_fast_past_max_wait():
+    limiter = rate_limiter.RateLimiter(limits={"groq": {"rpm": 1, "tpm": 0}}, max_wait=5)
+    limiter.acquire("groq", "queue-test")
+    with pytest.raises(rate_limiter.RateLimitExceeded):
+        limiter.acquire("groq", "queue-test")
+
+
+def test_pause_blocks_the_model():
+    limiter = rate_limiter.RateLimiter(limits={"groq": {"rpm": 1000, "tpm": 0}}, max_wait=1)
+    limiter.pause("groq", "paused", 30)
+    with pytest.raises(rate_limiter.RateLimitExceeded):
+        limiter.acquire("groq", "paused")
+    assert limiter.acquire("groq", "other") == pytest.approx(0, abs=0.1)
+
+
+@pytest.mark.parametrize("error, kind", [
+    (ProviderError("Too many requests", status_code=429), "rate_limit"),
+    (ProviderError("429 Resource exhausted: quota exceeded"), "rate_limit"),
+    (ProviderError("Bad gateway", status_code=502), "transient"),
+    (TimeoutError("Request timed out"), "transient"),
+    (ProviderError("context_length_exceeded", status_code=400), "fatal"),
+])
+def test_classify_error(error, kind):
+    assert rate_limiter.classify_error(error) == kind
+
+
+def test_retry_after_from_header_or_message():
+    assert rate_limiter.retry_after(ProviderError("slow down", 429, {"retry-after": "7"})) == 7
+    assert rate_limiter.retry_after(ProviderError("Please retry in 12.5s")) == 12.5
+    assert rate_limiter.retry_after(ProviderError("retry_delay { seconds: 3 }")) == 3
+    assert rate_limiter.retry_after(ProviderError("no hint")) is None
+
+
+def test_transient_errors_are_retried_and_fatal_ones_are_not(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, "sleep", lambda seconds: None)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ProviderError("Service unavailable", status_code=503)
+        return "ok"
+
+    assert rate_limiter.call_with_retry("groq", "retry-test", flaky) == "ok"
+    assert len(attempts) == 3
+
+    def bad_request():
+        attempts.append(1)
+        raise ProviderError("invalid request", status_code=400)
+
+    attempts.clear()
+    with pytest.raises(ProviderError):
+        rate_limiter.call_with_retry("groq", "retry-test", bad_request)
+    assert len(attempts) == 1
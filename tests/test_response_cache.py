@@ -0,0 +1,156 @@
+import pytest
+
+import response_cache
+from fingerprint import fingerprint
+from response_cache import ResponseCache, cached_response, get_response_cache, make_cache_key, normalize_code
+from streaming import TextStream
+
+PAGINATE = """function paginate(items, page, size) {
+  const start = page * size;
+  const result = [];
+  for (let i = start; i <= start + size; i++) {
+    if (i >= items.length) {
+      break;
+    }
+    result.push(items[i]);
+  }
+  return { page: page, total: items.length, items: result };
+}
+
+function summarize(orders) {
+  const totals = {};
+  for (const order of orders) {
+    const key = order.customer.id;
+    if (!totals[key]) {
+      totals[key] = { name: order.customer.name, amount: 0, count: 0 };
+    }
+    totals[key].amount += order.amount;
+    totals[key].count += 1;
+  }
+  return Object.values(totals).sort((a, b) => b.amount - a.amount);
+}
+"""
+REVIEWS = """def average_rating(reviews):
+    total = 0
+    count = 0
+    for review in reviews:
+        if review.get("rating") is None:
+            continue
+        total += review["rating"]
+        count += 1
+    if count == 0:
+        return 0
+    return total / count
+
+
+def top_products(reviews, limit=5):
+    scores = {}
+    for review in reviews:
+        product = review["product"]
+        scores.setdefault(product, []).append(review.get("rating") or 0)
+    ranked = sorted(scores.items(), key=lambda item: sum(item[1]) / len(item[1]), reverse=True)
+    return [name for name, _ in ranked[:limit]]
+"""
+
+calls = []
+
+
+@cached_response("near_duplicate_test", model="test", near_duplicates=True)
+def answer(code, question="why?"):
+    calls.append(code)
+    return f"answer #{len(calls)}"
+
+
+def setup_function():
+    get_response_cache().clear()
+    calls.clear()
+
+
+def near_hits():
+    return get_response_cache().stats()["near_hits"]
+
+
+# Fixes of a single operator or call; their old MinHash similarity was above 0.9
+@pytest.mark.parametrize("buggy, fixed", [
+    (PAGINATE, PAGINATE.replace("i <= start", "i < start")),
+    (REVIEWS, REVIEWS.replace("total / count", "total // count")),
+    (PAGINATE, PAGINATE.replace("b.amount - a.amount", "a.amount - b.amount")),
+], ids=["js-comparison", "py-division", "js-sort-order"])
+def test_one_token_change_misses_the_cache(buggy, fixed):
+    assert fingerprint(buggy) != fingerprint(fixed)
+    before = near_hits()
+    first = answer(buggy)
+    assert answer(fixed) != first
+    assert len(calls) == 2
+    assert near_hits() == before
+
+
+@pytest.mark.parametrize("original, variant", [
+    ("def half(total):\n    return total / 2\n",
+     "# Split the bill\ndef halve(amount):\n    \"\"\"Half of it.\"\"\"\n    return amount/2\n"),
+    ("let count = items.length; // how many\n", "let   n = items.length;\n"),
+], ids=["python", "js"])
+def test_formatting_comments_and_names_hit(original, variant):
+    before = near_hits()
+    first = answer(original)
+    assert answer(variant) == first
+    assert len(calls) == 1
+    assert near_hits() == before + 1
+
+
+def test_other_parameters_miss():
+    answer("print(1)\n")
+    answer("print(1)  # again\n", question="how?")
+    assert len(calls) == 2
+
+
+def test_cosmetic_whitespace_shares_a_key():
+    assert normalize_code("\n\nx = 1   \r\n    y = 2\r\n\n") == "x = 1\n    y = 2"
+    assert make_cache_key("fix", "m", "x = 1\n") == make_cache_key("fix", "m", "x = 1   \r\n\n")
+    assert make_cache_key("fix", "m", "x = 1") != make_cache_key("fix", "m", "    x = 1")
+    assert make_cache_key("fix", "m", "x = 1") != make_cache_key("fix", "other", "x = 1")
+    assert make_cache_key("fix", "m", "x = 1", {"mode": "fast"}) != make_cache_key("fix", "m", "x = 1", {"mode": "full"})
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"  # "a" is now the most recently used
+    cache.set("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+    now[0] += 61
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["evictions"], stats["expirations"]) == (1, 1)
+
+
+def test_sqlite_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResponseCache(db_path=path).set("key", {"answer": 42}, latency=1.5)
+    cache = ResponseCache(db_path=path)
+    assert cache.get("key") == {"answer": 42}
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["saved_seconds"]) == (1, 1.5)
+
+
+def test_errors_are_not_cached_and_streams_are_stored_when_done():
+    results = iter(["Error: provider down", "fine", "streamed"])
+
+    @cached_response("cache_if_test", model="test", cache_if=lambda text: not text.startswith("Error"))
+    def feature(code, stream=False):
+        text = next(results)
+        return TextStream(iter([text[:3], text[3:]])) if stream else text
+
+    assert feature("x") == "Error: provider down"
+    assert feature("x") == "fine"
+    assert feature("x") == "fine"  # served from the cache
+
+    stream = feature("y", stream=True)
+    assert "".join(stream) == "streamed"
+    cached = feature("y", stream=True)
+    assert isinstance(cached, TextStream) and cached.result() == "streamed"
@@ -0,0 +1,31 @@
+import shutil
+
+import pytest
+
+import sandbox
+
+
+def test_local_execution_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("FIXIFOX_SANDBOX_ENABLED", raising=False)
+    monkeypatch.setattr(sandbox, "ENABLED", False)
+    assert not sandbox.supports("Python")
+    with pytest.raises(RuntimeError):
+        sandbox.execute("Python", "print('hi')")
+
+
+def test_enabled_run_has_no_api_keys_in_its_environment(monkeypatch):
+    monkeypatch.setattr(sandbox, "ENABLED", True)
+    limits = sandbox.ExecutionLimits(wall_seconds=20)
+    result = sandbox.execute("Python", "import os\nprint(sorted(k for k in os.environ if 'KEY' in k))", limits=limits)
+    assert result.ok
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.skipif(shutil.which("go") is None, reason="go is not installed")
+def test_go_hello_world(monkeypatch):
+    monkeypatch.setattr(sandbox, "ENABLED", True)
+    assert sandbox.supports("Go")
+    code = 'package main\n\nimport "fmt"\n\nfunc main() {\n\tfmt.Println("hello from go")\n}\n'
+    result = sandbox.execute("Go", code)
+    assert result.ok, result.stderr
+    assert result.stdout == "hello from go\n"
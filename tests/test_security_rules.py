@@ -0,0 +1,52 @@
+import pytest
+
+from security_rules import flagged_regions, focus_excerpt, scan_code
+
+
+def rule_ids(code, language=None):
+    return [(finding.rule_id, finding.line) for finding in scan_code(code, language)]
+
+
+def test_child_process_exec_is_one_command_injection():
+    code = "const { exec } = require('child_process');\nconst child_process = require('child_process');\nchild_process.exec(cmd);\n"
+    assert rule_ids(code, "JavaScript") == [("shell-command", 3)]
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("eval(userInput);", ["eval-exec"]),
+    ("const match = /a+/.exec(text);", []),
+    ("Runtime.getRuntime().exec(command);", ["shell-command"]),
+])
+def test_eval_exec_skips_method_calls(line, expected):
+    assert [finding.rule_id for finding in scan_code(line, "JavaScript")] == expected
+
+
+def test_python_findings_come_from_the_ast():
+    code = (
+        "import subprocess\n"
+        "\n"
+        "def run(cmd, cursor, user_id):\n"
+        "    # eval(cmd) in a comment is not a call\n"
+        "    subprocess.run(cmd, shell=True)\n"
+        "    cursor.execute(f\"SELECT * FROM users WHERE id = {user_id}\")\n"
+        "    return eval(cmd)\n"
+    )
+    findings = scan_code(code)
+    assert [(finding.type, finding.line) for finding in findings] == [
+        ("SQL Injection", 6), ("Command Injection", 5), ("Code Injection", 7),
+    ]
+    assert findings[0].to_issue()["source"] == "static analysis"
+
+
+def test_clean_code_has_no_findings():
+    assert scan_code("def add(a, b):\n    return a + b\n") == []
+
+
+def test_regions_merge_overlapping_context():
+    lines = ["x = 1"] * 42
+    for number in (21, 27, 42):
+        lines[number - 1] = "eval(x)"
+    findings = scan_code("\n".join(lines))
+    assert flagged_regions(findings, 42, context=5) == [(16, 32), (37, 42)]
+    excerpt = focus_excerpt("a = 1\neval(a)\nb = 2\n", scan_code("a = 1\neval(a)\nb = 2\n"), context=0)
+    assert "eval(a)" in excerpt
@@ -0,0 +1,40 @@
+import ai_features
+from response_cache import get_response_cache
+
+SAFE = '''import json
+import subprocess
+
+
+def load_config(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def build_command(config):
+    command = [config["binary"]]
+    for name, value in sorted(config.get("flags", {}).items()):
+        command.append(f"--{name}={value}")
+    return command
+
+
+def run(config_path):
+    config = load_config(config_path)
+    result = subprocess.run(build_command(config), shell=False, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return result.stdout.splitlines()
+'''
+VULNERABLE = SAFE.replace("shell=False", "shell=True")
+
+
+def setup_function():
+    get_response_cache().clear()
+
+
+def test_near_duplicate_scan_is_not_served_from_cache():
+    near_hits = get_response_cache().stats()["near_hits"]
+    assert "Command Injection" not in ai_features.run_security_scan(SAFE, mode="fast")
+    report = ai_features.run_security_scan(VULNERABLE, mode="fast")
+    assert "SECURITY VULNERABILITIES DETECTED" in report
+    assert "shell=True" in report
+    assert get_response_cache().stats()["near_hits"] == near_hits
@@ -0,0 +1,44 @@
+import pytest
+
+from sessions import SessionManager
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/125.0|en-GB"
+
+
+@pytest.fixture
+def manager():
+    return SessionManager(secret="test-secret", ttl=60, store=None)
+
+
+@pytest.mark.parametrize("token", ["é.x", "x.é", "é", "a.b.c", ".", " . "])
+def test_malformed_tokens_are_invalid(manager, token):
+    assert manager.validate(token) is None
+    manager.revoke(token)
+
+
+def test_issued_token_validates(manager):
+    assert manager.validate(manager.issue("ada")) == "ada"
+
+
+def test_bound_token_is_rejected_in_another_browser(manager):
+    token = manager.issue("ada", BROWSER)
+    assert manager.validate(token, BROWSER) == "ada"
+    assert manager.validate(token, "curl/8.5.0|") is None
+    assert manager.validate(token) is None
+
+
+def test_renew_keeps_the_session_and_logout_revokes_both(manager, monkeypatch):
+    token = manager.issue("ada", BROWSER)
+    assert manager.renew(token, BROWSER) == token
+
+    import sessions
+
+    later = sessions.time.time() + 45
+    monkeypatch.setattr(sessions.time, "time", lambda: later)
+    renewed = manager.renew(token, BROWSER)
+    assert renewed not in (None, token)
+    assert manager.validate(renewed, BROWSER) == "ada"
+
+    manager.revoke(renewed)
+    assert manager.validate(token, BROWSER) is None
+    assert manager.validate(renewed, BROWSER) is None
@@ -0,0 +1,35 @@
+import threading
+from types import SimpleNamespace
+
+import streaming
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class StalledStream:
+    """A provider stream that sends nothing until it is closed."""
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        self.closed.wait(5)
+        raise ConnectionError("stream closed")
+        yield
+
+    def close(self):
+        self.closed.set()
+
+
+def test_losing_attempt_is_closed_while_stalled(monkeypatch):
+    stalled = StalledStream()
+    streams = {"hedge-slow": stalled, "hedge-fast": iter([chunk("a"), chunk("b")])}
+    monkeypatch.setattr(streaming, "groq_chat_completion", lambda model, messages, **params: streams[model])
+    monkeypatch.setattr(streaming, "HEDGE_DEFAULT_DELAY", 0.05)
+
+    text = list(streaming.stream_groq_hedged(["hedge-slow", "hedge-fast"], [{"role": "user", "content": "hi"}]))
+
+    assert text == ["a", "b"]
+    assert stalled.closed.wait(1)
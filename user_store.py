@@ -0,0 +1,327 @@
+"""
+Pooled SQLite access layer for the FixiFox user store.
+
+Opening a connection per login pays for file opening, schema parsing and
+locking on every call, and the default rollback journal lets only one
+connection touch the file while a write is in progress. ``UserStore`` keeps
+a small pool of long-lived connections configured with:
+    - journal_mode=WAL: readers never block on the writer and vice versa
+    - synchronous=NORMAL: no fsync per commit (safe with WAL; the last
+      commits may be lost on power failure, never corrupted)
+    - cache_size: a larger page cache per connection
+    - busy_timeout: concurrent writers wait instead of failing with
+      "database is locked"
+Every query uses a constant SQL string, so ``sqlite3``'s per-connection
+statement cache serves them as prepared statements.
+
+``last_login`` timestamps are not written on the login path: logins are
+recorded in memory and written by a background thread in one
+``executemany`` transaction per interval (or as soon as enough are
+pending), and once more at interpreter exit.
+
+Configuration (environment variables):
+    FIXIFOX_USER_DB                  SQLite file (default fixifox_users.db)
+    FIXIFOX_DB_POOL_SIZE             Pooled connections (default 8)
+    FIXIFOX_LAST_LOGIN_FLUSH_SECONDS Seconds between last_login flushes (default 5)
+    FIXIFOX_LAST_LOGIN_BATCH         Pending logins that trigger an early flush (default 100)
+"""
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import metrics
+
+logger = logging.getLogger("fixifox.user_store")
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",  # KiB, i.e. 8 MB per connection
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+_CREATE_USERS = '''
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+)
+'''
+_CREATE_REVOKED_SESSIONS = '''
+CREATE TABLE IF NOT EXISTS revoked_sessions (
+    session_id TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+)
+'''
+_INSERT_USER = "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)"
+_SELECT_CREDENTIALS = "SELECT id, password_hash FROM users WHERE username = ?"
+_UPDATE_LAST_LOGIN = "UPDATE users SET last_login = ? WHERE id = ?"
+_UPDATE_PASSWORD_HASH = "UPDATE users SET password_hash = ? WHERE id = ?"
+_INSERT_REVOKED_SESSION = "INSERT OR REPLACE INTO revoked_sessions (session_id, expires_at) VALUES (?, ?)"
+_SELECT_REVOKED_SESSIONS = "SELECT session_id, expires_at FROM revoked_sessions WHERE expires_at > ?"
+_DELETE_EXPIRED_REVOCATIONS = "DELETE FROM revoked_sessions WHERE expires_at <= ?"
+
+
+class ConnectionPool:
+    """
+    Fixed-size, thread-safe pool of SQLite connections.
+
+    Connections are created lazily up to ``size``; when all are in use,
+    callers wait for one to be returned.
+
+    Args:
+        db_path (str): SQLite database file.
+        size (int): Maximum number of connections.
+    """
+
+    def __init__(self, db_path, size=8):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=5.0,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for one unit of work.
+
+        The transaction is committed when the block exits normally and rolled
+        back when it raises.
+        """
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    @property
+    def in_use(self):
+        """Connections currently borrowed."""
+        return self._created - self._idle.qsize()
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for ``users.last_login``.
+
+    Only the latest timestamp per user is kept, so repeated logins between
+    two flushes cost a single row update.
+
+    Args:
+        store (UserStore): Store the batches are written to.
+        interval (float): Seconds between flushes.
+        max_pending (int): Pending users that wake the flusher early.
+    """
+
+    def __init__(self, store, interval=None, max_pending=None):
+        self.store = store
+        self.interval = interval or float(os.environ.get("FIXIFOX_LAST_LOGIN_FLUSH_SECONDS", "5"))
+        self.max_pending = max_pending or int(os.environ.get("FIXIFOX_LAST_LOGIN_BATCH", "100"))
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="fixifox-last-login", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, user_id, timestamp):
+        """Remember a login; returns immediately."""
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            self._pending[user_id] = timestamp
+            pending = len(self._pending)
+        metrics.set_gauge("last_login_pending_writes", pending)
+        if pending >= self.max_pending:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Write every pending timestamp in one transaction.
+
+        Returns:
+            int: Number of rows written.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        try:
+            self.store.update_last_logins((timestamp, user_id) for user_id, timestamp in batch.items())
+        except sqlite3.Error:
+            # Put the batch back (newer logins recorded meanwhile win) and retry next round
+            with self._lock:
+                for user_id, timestamp in batch.items():
+                    self._pending.setdefault(user_id, timestamp)
+            raise
+        finally:
+            with self._lock:
+                pending = len(self._pending)
+            metrics.set_gauge("last_login_pending_writes", pending)
+        metrics.increment("last_login_rows_flushed", len(batch))
+        return len(batch)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning("last_login flush failed: %s", e)
+
+    def close(self):
+        """Stop the flusher and write what is still pending."""
+        self._stopped = True
+        self._wake.set()
+        self.flush()
+
+
+class UserStore:
+    """
+    Data-access object for the ``users`` table.
+
+    Args:
+        db_path (str, optional): SQLite file. Defaults to FIXIFOX_USER_DB.
+        pool_size (int, optional): Pooled connections. Defaults to FIXIFOX_DB_POOL_SIZE.
+    """
+
+    def __init__(self, db_path=None, pool_size=None):
+        self.db_path = db_path or os.environ.get("FIXIFOX_USER_DB", "fixifox_users.db")
+        self.pool = ConnectionPool(
+            self.db_path,
+            size=pool_size or int(os.environ.get("FIXIFOX_DB_POOL_SIZE", "8")),
+        )
+        self.last_logins = LastLoginBuffer(self)
+
+    def init_schema(self):
+        """Create the ``users`` and ``revoked_sessions`` tables if they do not exist."""
+        with self.pool.connection() as conn:
+            conn.execute(_CREATE_USERS)
+            conn.execute(_CREATE_REVOKED_SESSIONS)
+
+    def create_user(self, username, email, password_hash):
+        """
+        Insert a user.
+
+        Returns:
+            int: The new user id.
+
+        Raises:
+            sqlite3.IntegrityError: If the username or email is taken.
+        """
+        with self.pool.connection() as conn:
+            return conn.execute(_INSERT_USER, (username, email, password_hash)).lastrowid
+
+    def get_credentials(self, username):
+        """
+        Returns:
+            tuple | None: ``(user_id, password_hash)`` or None if the user does not exist.
+        """
+        with self.pool.connection() as conn:
+            return conn.execute(_SELECT_CREDENTIALS, (username,)).fetchone()
+
+    def update_last_login(self, user_id, timestamp):
+        with self.pool.connection() as conn:
+            conn.execute(_UPDATE_LAST_LOGIN, (timestamp, user_id))
+
+    def update_last_logins(self, rows):
+        """Apply ``(timestamp, user_id)`` rows in a single transaction."""
+        with self.pool.connection() as conn:
+            conn.executemany(_UPDATE_LAST_LOGIN, rows)
+
+    def record_login(self, user_id, timestamp):
+        """Buffer a ``last_login`` update; it is written by the next batch flush."""
+        self.last_logins.record(user_id, timestamp)
+
+    def update_password_hash(self, user_id, password_hash):
+        with self.pool.connection() as conn:
+            conn.execute(_UPDATE_PASSWORD_HASH, (password_hash, user_id))
+
+    def revoke_session(self, session_id, expires_at):
+        """Persist a session revocation until the session would have expired anyway."""
+        with self.pool.connection() as conn:
+            conn.execute(_INSERT_REVOKED_SESSION, (session_id, expires_at))
+
+    def revoked_sessions(self, now):
+        """
+        Drop stale revocations and return the live ones.
+
+        Returns:
+            dict: ``{session_id: expires_at}``.
+        """
+        with self.pool.connection() as conn:
+            conn.execute(_DELETE_EXPIRED_REVOCATIONS, (now,))
+            return dict(conn.execute(_SELECT_REVOKED_SESSIONS, (now,)).fetchall())
+
+    def close(self):
+        self.last_logins.close()
+        self.pool.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """Return the process-wide user store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = UserStore()
+    return _store